@@ -20,6 +20,16 @@
 #include <stdint.h>
 #include <string.h>
 
+/* Force-inline for the hot helpers: recompiled code calls these once or
+ * more per lifted instruction, so a skipped inline (cold function, -O0,
+ * inlining budget exhausted by large recompiled functions) turns every
+ * flag update and memory access into a call. */
+#if defined(__GNUC__) || defined(__clang__)
+#define CPU_INLINE static inline __attribute__((always_inline))
+#else
+#define CPU_INLINE static inline
+#endif
+
 /* ---------- Flag bits ---------- */
 #define FLAG_CF  0x0001  /* Carry */
 #define FLAG_PF  0x0004  /* Parity */
@@ -77,29 +87,29 @@ typedef struct CPU {
 } CPU;
 
 /* ---------- Segment:offset → flat address ---------- */
-static inline uint32_t seg_off(uint16_t seg, uint16_t off)
+CPU_INLINE uint32_t seg_off(uint16_t seg, uint16_t off)
 {
     return ((uint32_t)seg << 4) + off;
 }
 
 /* ---------- Memory access ---------- */
-static inline uint8_t mem_read8(CPU *cpu, uint16_t seg, uint16_t off)
+CPU_INLINE uint8_t mem_read8(CPU *cpu, uint16_t seg, uint16_t off)
 {
     return cpu->mem[seg_off(seg, off)];
 }
 
-static inline uint16_t mem_read16(CPU *cpu, uint16_t seg, uint16_t off)
+CPU_INLINE uint16_t mem_read16(CPU *cpu, uint16_t seg, uint16_t off)
 {
     uint32_t addr = seg_off(seg, off);
     return (uint16_t)cpu->mem[addr] | ((uint16_t)cpu->mem[addr + 1] << 8);
 }
 
-static inline void mem_write8(CPU *cpu, uint16_t seg, uint16_t off, uint8_t val)
+CPU_INLINE void mem_write8(CPU *cpu, uint16_t seg, uint16_t off, uint8_t val)
 {
     cpu->mem[seg_off(seg, off)] = val;
 }
 
-static inline void mem_write16(CPU *cpu, uint16_t seg, uint16_t off, uint16_t val)
+CPU_INLINE void mem_write16(CPU *cpu, uint16_t seg, uint16_t off, uint16_t val)
 {
     uint32_t addr = seg_off(seg, off);
     cpu->mem[addr] = (uint8_t)(val & 0xFF);
@@ -107,34 +117,34 @@ static inline void mem_write16(CPU *cpu, uint16_t seg, uint16_t off, uint16_t va
 }
 
 /* Data segment shortcuts (most common) */
-static inline uint8_t ds_read8(CPU *cpu, uint16_t off)
+CPU_INLINE uint8_t ds_read8(CPU *cpu, uint16_t off)
 {
     return mem_read8(cpu, cpu->ds, off);
 }
 
-static inline uint16_t ds_read16(CPU *cpu, uint16_t off)
+CPU_INLINE uint16_t ds_read16(CPU *cpu, uint16_t off)
 {
     return mem_read16(cpu, cpu->ds, off);
 }
 
-static inline void ds_write8(CPU *cpu, uint16_t off, uint8_t val)
+CPU_INLINE void ds_write8(CPU *cpu, uint16_t off, uint8_t val)
 {
     mem_write8(cpu, cpu->ds, off, val);
 }
 
-static inline void ds_write16(CPU *cpu, uint16_t off, uint16_t val)
+CPU_INLINE void ds_write16(CPU *cpu, uint16_t off, uint16_t val)
 {
     mem_write16(cpu, cpu->ds, off, val);
 }
 
 /* Stack operations */
-static inline void push16(CPU *cpu, uint16_t val)
+CPU_INLINE void push16(CPU *cpu, uint16_t val)
 {
     cpu->sp -= 2;
     mem_write16(cpu, cpu->ss, cpu->sp, val);
 }
 
-static inline uint16_t pop16(CPU *cpu)
+CPU_INLINE uint16_t pop16(CPU *cpu)
 {
     uint16_t val = mem_read16(cpu, cpu->ss, cpu->sp);
     cpu->sp += 2;
@@ -144,7 +154,7 @@ static inline uint16_t pop16(CPU *cpu)
 /* ---------- Flags computation ---------- */
 
 /* Parity lookup table (1 if even number of set bits in low byte) */
-static inline int parity8(uint8_t v)
+CPU_INLINE int parity8(uint8_t v)
 {
     v ^= v >> 4;
     v ^= v >> 2;
@@ -153,7 +163,7 @@ static inline int parity8(uint8_t v)
 }
 
 /* Set SF, ZF, PF based on result (8-bit) */
-static inline void set_szp8(CPU *cpu, uint8_t result)
+CPU_INLINE void set_szp8(CPU *cpu, uint8_t result)
 {
     cpu->flags &= ~(FLAG_SF | FLAG_ZF | FLAG_PF);
     if (result == 0)           cpu->flags |= FLAG_ZF;
@@ -162,7 +172,7 @@ static inline void set_szp8(CPU *cpu, uint8_t result)
 }
 
 /* Set SF, ZF, PF based on result (16-bit) */
-static inline void set_szp16(CPU *cpu, uint16_t result)
+CPU_INLINE void set_szp16(CPU *cpu, uint16_t result)
 {
     cpu->flags &= ~(FLAG_SF | FLAG_ZF | FLAG_PF);
     if (result == 0)             cpu->flags |= FLAG_ZF;
@@ -171,7 +181,7 @@ static inline void set_szp16(CPU *cpu, uint16_t result)
 }
 
 /* Full flags for ADD (8-bit) */
-static inline uint8_t flags_add8(CPU *cpu, uint8_t a, uint8_t b)
+CPU_INLINE uint8_t flags_add8(CPU *cpu, uint8_t a, uint8_t b)
 {
     uint16_t r = (uint16_t)a + b;
     uint8_t result = (uint8_t)r;
@@ -187,7 +197,7 @@ static inline uint8_t flags_add8(CPU *cpu, uint8_t a, uint8_t b)
 }
 
 /* Full flags for ADD (16-bit) */
-static inline uint16_t flags_add16(CPU *cpu, uint16_t a, uint16_t b)
+CPU_INLINE uint16_t flags_add16(CPU *cpu, uint16_t a, uint16_t b)
 {
     uint32_t r = (uint32_t)a + b;
     uint16_t result = (uint16_t)r;
@@ -200,7 +210,7 @@ static inline uint16_t flags_add16(CPU *cpu, uint16_t a, uint16_t b)
 }
 
 /* Full flags for SUB (8-bit) */
-static inline uint8_t flags_sub8(CPU *cpu, uint8_t a, uint8_t b)
+CPU_INLINE uint8_t flags_sub8(CPU *cpu, uint8_t a, uint8_t b)
 {
     uint16_t r = (uint16_t)a - b;
     uint8_t result = (uint8_t)r;
@@ -213,7 +223,7 @@ static inline uint8_t flags_sub8(CPU *cpu, uint8_t a, uint8_t b)
 }
 
 /* Full flags for SUB (16-bit) */
-static inline uint16_t flags_sub16(CPU *cpu, uint16_t a, uint16_t b)
+CPU_INLINE uint16_t flags_sub16(CPU *cpu, uint16_t a, uint16_t b)
 {
     uint32_t r = (uint32_t)a - b;
     uint16_t result = (uint16_t)r;
@@ -226,66 +236,202 @@ static inline uint16_t flags_sub16(CPU *cpu, uint16_t a, uint16_t b)
 }
 
 /* Flags-only CMP (doesn't store result) */
-static inline void flags_cmp8(CPU *cpu, uint8_t a, uint8_t b)
+CPU_INLINE void flags_cmp8(CPU *cpu, uint8_t a, uint8_t b)
 {
     flags_sub8(cpu, a, b);
 }
 
-static inline void flags_cmp16(CPU *cpu, uint16_t a, uint16_t b)
+CPU_INLINE void flags_cmp16(CPU *cpu, uint16_t a, uint16_t b)
 {
     flags_sub16(cpu, a, b);
 }
 
+/* INC/DEC flags: add/sub 1 but CF is preserved (x86 semantics) */
+CPU_INLINE uint8_t flags_inc8(CPU *cpu, uint8_t v)
+{
+    uint8_t result = (uint8_t)(v + 1);
+    cpu->flags &= ~(FLAG_OF | FLAG_AF | FLAG_SF | FLAG_ZF | FLAG_PF);
+    if (result == 0x80)          cpu->flags |= FLAG_OF;
+    if ((result & 0x0F) == 0)    cpu->flags |= FLAG_AF;
+    set_szp8(cpu, result);
+    return result;
+}
+
+CPU_INLINE uint16_t flags_inc16(CPU *cpu, uint16_t v)
+{
+    uint16_t result = (uint16_t)(v + 1);
+    cpu->flags &= ~(FLAG_OF | FLAG_AF | FLAG_SF | FLAG_ZF | FLAG_PF);
+    if (result == 0x8000)        cpu->flags |= FLAG_OF;
+    if ((result & 0x0F) == 0)    cpu->flags |= FLAG_AF;
+    set_szp16(cpu, result);
+    return result;
+}
+
+CPU_INLINE uint8_t flags_dec8(CPU *cpu, uint8_t v)
+{
+    uint8_t result = (uint8_t)(v - 1);
+    cpu->flags &= ~(FLAG_OF | FLAG_AF | FLAG_SF | FLAG_ZF | FLAG_PF);
+    if (result == 0x7F)          cpu->flags |= FLAG_OF;
+    if ((result & 0x0F) == 0x0F) cpu->flags |= FLAG_AF;
+    set_szp8(cpu, result);
+    return result;
+}
+
+CPU_INLINE uint16_t flags_dec16(CPU *cpu, uint16_t v)
+{
+    uint16_t result = (uint16_t)(v - 1);
+    cpu->flags &= ~(FLAG_OF | FLAG_AF | FLAG_SF | FLAG_ZF | FLAG_PF);
+    if (result == 0x7FFF)        cpu->flags |= FLAG_OF;
+    if ((result & 0x0F) == 0x0F) cpu->flags |= FLAG_AF;
+    set_szp16(cpu, result);
+    return result;
+}
+
 /* Logical operation flags (CF=0, OF=0) */
-static inline void flags_logic8(CPU *cpu, uint8_t result)
+CPU_INLINE void flags_logic8(CPU *cpu, uint8_t result)
 {
     cpu->flags &= ~(FLAG_CF | FLAG_OF);
     set_szp8(cpu, result);
 }
 
-static inline void flags_logic16(CPU *cpu, uint16_t result)
+CPU_INLINE void flags_logic16(CPU *cpu, uint16_t result)
 {
     cpu->flags &= ~(FLAG_CF | FLAG_OF);
     set_szp16(cpu, result);
 }
 
 /* Shift/rotate flags (partial - CF set by caller) */
-static inline void flags_shift8(CPU *cpu, uint8_t result)
+CPU_INLINE void flags_shift8(CPU *cpu, uint8_t result)
 {
     set_szp8(cpu, result);
 }
 
-static inline void flags_shift16(CPU *cpu, uint16_t result)
+CPU_INLINE void flags_shift16(CPU *cpu, uint16_t result)
 {
     set_szp16(cpu, result);
 }
 
 /* ---------- Flag test helpers ---------- */
-static inline int cf(CPU *cpu) { return (cpu->flags & FLAG_CF) != 0; }
-static inline int zf(CPU *cpu) { return (cpu->flags & FLAG_ZF) != 0; }
-static inline int sf(CPU *cpu) { return (cpu->flags & FLAG_SF) != 0; }
-static inline int of(CPU *cpu) { return (cpu->flags & FLAG_OF) != 0; }
-static inline int pf(CPU *cpu) { return (cpu->flags & FLAG_PF) != 0; }
-static inline int af(CPU *cpu) { return (cpu->flags & FLAG_AF) != 0; }
-static inline int df(CPU *cpu) { return (cpu->flags & FLAG_DF) != 0; }
+CPU_INLINE int cf(CPU *cpu) { return (cpu->flags & FLAG_CF) != 0; }
+CPU_INLINE int zf(CPU *cpu) { return (cpu->flags & FLAG_ZF) != 0; }
+CPU_INLINE int sf(CPU *cpu) { return (cpu->flags & FLAG_SF) != 0; }
+CPU_INLINE int of(CPU *cpu) { return (cpu->flags & FLAG_OF) != 0; }
+CPU_INLINE int pf(CPU *cpu) { return (cpu->flags & FLAG_PF) != 0; }
+CPU_INLINE int af(CPU *cpu) { return (cpu->flags & FLAG_AF) != 0; }
+CPU_INLINE int df(CPU *cpu) { return (cpu->flags & FLAG_DF) != 0; }
 
 /* Condition code tests (matching x86 Jcc encodings) */
-static inline int cc_o(CPU *cpu)  { return of(cpu); }
-static inline int cc_no(CPU *cpu) { return !of(cpu); }
-static inline int cc_b(CPU *cpu)  { return cf(cpu); }         /* below / carry */
-static inline int cc_ae(CPU *cpu) { return !cf(cpu); }        /* above-or-equal */
-static inline int cc_e(CPU *cpu)  { return zf(cpu); }         /* equal / zero */
-static inline int cc_ne(CPU *cpu) { return !zf(cpu); }        /* not equal */
-static inline int cc_be(CPU *cpu) { return cf(cpu) || zf(cpu); } /* below-or-equal */
-static inline int cc_a(CPU *cpu)  { return !cf(cpu) && !zf(cpu); } /* above */
-static inline int cc_s(CPU *cpu)  { return sf(cpu); }         /* sign */
-static inline int cc_ns(CPU *cpu) { return !sf(cpu); }        /* not sign */
-static inline int cc_p(CPU *cpu)  { return pf(cpu); }         /* parity even */
-static inline int cc_np(CPU *cpu) { return !pf(cpu); }        /* parity odd */
-static inline int cc_l(CPU *cpu)  { return sf(cpu) != of(cpu); } /* less */
-static inline int cc_ge(CPU *cpu) { return sf(cpu) == of(cpu); } /* greater-or-equal */
-static inline int cc_le(CPU *cpu) { return zf(cpu) || (sf(cpu) != of(cpu)); } /* less-or-equal */
-static inline int cc_g(CPU *cpu)  { return !zf(cpu) && (sf(cpu) == of(cpu)); } /* greater */
+CPU_INLINE int cc_o(CPU *cpu)  { return of(cpu); }
+CPU_INLINE int cc_no(CPU *cpu) { return !of(cpu); }
+CPU_INLINE int cc_b(CPU *cpu)  { return cf(cpu); }         /* below / carry */
+CPU_INLINE int cc_ae(CPU *cpu) { return !cf(cpu); }        /* above-or-equal */
+CPU_INLINE int cc_e(CPU *cpu)  { return zf(cpu); }         /* equal / zero */
+CPU_INLINE int cc_ne(CPU *cpu) { return !zf(cpu); }        /* not equal */
+CPU_INLINE int cc_be(CPU *cpu) { return cf(cpu) || zf(cpu); } /* below-or-equal */
+CPU_INLINE int cc_a(CPU *cpu)  { return !cf(cpu) && !zf(cpu); } /* above */
+CPU_INLINE int cc_s(CPU *cpu)  { return sf(cpu); }         /* sign */
+CPU_INLINE int cc_ns(CPU *cpu) { return !sf(cpu); }        /* not sign */
+CPU_INLINE int cc_p(CPU *cpu)  { return pf(cpu); }         /* parity even */
+CPU_INLINE int cc_np(CPU *cpu) { return !pf(cpu); }        /* parity odd */
+CPU_INLINE int cc_l(CPU *cpu)  { return sf(cpu) != of(cpu); } /* less */
+CPU_INLINE int cc_ge(CPU *cpu) { return sf(cpu) == of(cpu); } /* greater-or-equal */
+CPU_INLINE int cc_le(CPU *cpu) { return zf(cpu) || (sf(cpu) != of(cpu)); } /* less-or-equal */
+CPU_INLINE int cc_g(CPU *cpu)  { return !zf(cpu) && (sf(cpu) == of(cpu)); } /* greater */
+
+/* ---------- REP string-op block helpers ----------
+ *
+ * Emitted by lift.py for rep movs/stos instead of a per-element while
+ * loop. The fast path lowers to memcpy/memset when the copy runs
+ * forward (DF clear), stays inside the 64 KB segment offsets, and the
+ * ranges do not overlap; anything else falls back to the faithful
+ * per-element loop (rep movsb over overlapping ranges deliberately
+ * replicates bytes, which memcpy must not be asked to do).
+ */
+static inline void rep_movsb(CPU *cpu)
+{
+    uint32_t cx = cpu->cx;
+    if (cx == 0) return;
+    if (!df(cpu)
+        && (uint32_t)cpu->si + cx <= 0x10000
+        && (uint32_t)cpu->di + cx <= 0x10000) {
+        uint8_t *src = cpu->mem + seg_off(cpu->ds, cpu->si);
+        uint8_t *dst = cpu->mem + seg_off(cpu->es, cpu->di);
+        if (src + cx <= dst || dst + cx <= src) {
+            memcpy(dst, src, cx);
+            cpu->si += (uint16_t)cx;
+            cpu->di += (uint16_t)cx;
+            cpu->cx = 0;
+            return;
+        }
+    }
+    do {
+        mem_write8(cpu, cpu->es, cpu->di, mem_read8(cpu, cpu->ds, cpu->si));
+        cpu->si += df(cpu) ? -1 : 1;
+        cpu->di += df(cpu) ? -1 : 1;
+    } while (--cpu->cx != 0);
+}
+
+static inline void rep_movsw(CPU *cpu)
+{
+    uint32_t bytes = (uint32_t)cpu->cx * 2;
+    if (bytes == 0) return;
+    if (!df(cpu)
+        && (uint32_t)cpu->si + bytes <= 0x10000
+        && (uint32_t)cpu->di + bytes <= 0x10000) {
+        uint8_t *src = cpu->mem + seg_off(cpu->ds, cpu->si);
+        uint8_t *dst = cpu->mem + seg_off(cpu->es, cpu->di);
+        if (src + bytes <= dst || dst + bytes <= src) {
+            memcpy(dst, src, bytes);
+            cpu->si += (uint16_t)bytes;
+            cpu->di += (uint16_t)bytes;
+            cpu->cx = 0;
+            return;
+        }
+    }
+    do {
+        mem_write16(cpu, cpu->es, cpu->di, mem_read16(cpu, cpu->ds, cpu->si));
+        cpu->si += df(cpu) ? -2 : 2;
+        cpu->di += df(cpu) ? -2 : 2;
+    } while (--cpu->cx != 0);
+}
+
+static inline void rep_stosb(CPU *cpu)
+{
+    uint32_t cx = cpu->cx;
+    if (cx == 0) return;
+    if (!df(cpu) && (uint32_t)cpu->di + cx <= 0x10000) {
+        memset(cpu->mem + seg_off(cpu->es, cpu->di), cpu->al, cx);
+        cpu->di += (uint16_t)cx;
+        cpu->cx = 0;
+        return;
+    }
+    do {
+        mem_write8(cpu, cpu->es, cpu->di, cpu->al);
+        cpu->di += df(cpu) ? -1 : 1;
+    } while (--cpu->cx != 0);
+}
+
+static inline void rep_stosw(CPU *cpu)
+{
+    uint32_t bytes = (uint32_t)cpu->cx * 2;
+    if (bytes == 0) return;
+    if (!df(cpu) && (uint32_t)cpu->di + bytes <= 0x10000) {
+        uint8_t *dst = cpu->mem + seg_off(cpu->es, cpu->di);
+        uint8_t lo = cpu->al, hi = cpu->ah;
+        uint32_t i;
+        for (i = 0; i < bytes; i += 2) {
+            dst[i] = lo;
+            dst[i + 1] = hi;
+        }
+        cpu->di += (uint16_t)bytes;
+        cpu->cx = 0;
+        return;
+    }
+    do {
+        mem_write16(cpu, cpu->es, cpu->di, cpu->ax);
+        cpu->di += df(cpu) ? -2 : 2;
+    } while (--cpu->cx != 0);
+}
 
 /* ---------- CPU lifecycle ---------- */
 
@@ -15,11 +15,241 @@ Microsoft C 5.x function conventions:
 Part of the Civ Recomp project (sp00nznet/civ)
 """
 
+import bisect
+import mmap
+import os
+import re
 import struct
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from array import array
+from collections import deque
 from dataclasses import dataclass, field
 from typing import Optional
-from decode16 import Decoder, Instruction, OpType
+from decode16 import Decoder
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Pure-Python fallbacks are used when NumPy is unavailable
+
+
+# Printable ASCII runs of 4+ bytes, for the non-NumPy string scan
+_PRINT_RUN_RE = re.compile(rb'[\x20-\x7e]{4,}')
+
+# Category keywords, in priority order: a string is assigned the first
+# category (in this order) for which any keyword occurs as a substring.
+CATEGORY_KEYWORDS = {
+    'gfx': ['.pic', '.pal', 'graphic', 'sprite', 'icon', 'VGA', 'EGA'],
+    'sound': ['.cvl', 'sound', 'AdLib', 'Blaster', 'Tandy'],
+    'input': ['Mouse', 'Keyboard', 'mouse', 'keyboard'],
+    'game': ['city', 'unit', 'build', 'combat', 'wonder', 'advance',
+             'Civilization', 'civilization', 'GAME OVER'],
+    'map': ['Map', 'map', 'terrain', 'continent', 'ocean'],
+    'diplo': ['king', 'President', 'Warlord', 'Emperor', 'treaty',
+              'peace', 'war'],
+    'save': ['Save', 'Load', 'CIVIL0', 'civil0', 'fame'],
+    'ui': ['menu', 'Menu', 'Status', 'screen', 'display'],
+    'init': ['Start', 'New Game', 'logo', 'credits', 'intro'],
+}
+
+
+def _build_keyword_automaton(categories):
+    """Build an Aho-Corasick automaton over all category keywords.
+
+    Returns (goto, fail, out) where goto is a list of per-state
+    transition dicts, fail the failure links, and out[state] the best
+    (rank, category) terminating at that state (lower rank = higher
+    priority, matching the CATEGORY_KEYWORDS declaration order).
+    """
+    goto = [{}]
+    fail = [0]
+    out = [None]
+
+    for rank, (cat, keywords) in enumerate(categories.items()):
+        for kw in keywords:
+            state = 0
+            for ch in kw:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    fail.append(0)
+                    out.append(None)
+                    nxt = len(goto) - 1
+                    goto[state][ch] = nxt
+                state = nxt
+            if out[state] is None or rank < out[state][0]:
+                out[state] = (rank, cat)
+
+    # Breadth-first pass to fill failure links and propagate outputs
+    queue = deque(goto[0].values())
+    while queue:
+        r = queue.popleft()
+        for ch, s in goto[r].items():
+            queue.append(s)
+            f = fail[r]
+            while f and ch not in goto[f]:
+                f = fail[f]
+            fail[s] = goto[f][ch] if ch in goto[f] and goto[f][ch] != s else 0
+            fo = out[fail[s]]
+            if fo is not None and (out[s] is None or fo[0] < out[s][0]):
+                out[s] = fo
+
+    return goto, fail, out
+
+
+def _compile_keyword_dfa(goto, fail, out):
+    """Flatten the Aho-Corasick automaton into one contiguous table.
+
+    Resolves every failure transition up front, producing a dense
+    states x 256 next-state array plus parallel per-state output
+    arrays. Matching then needs no dict lookups or fail-link chasing:
+    one indexed load per input byte.
+    """
+    nstates = len(goto)
+    next_tab = array('H', bytes(2 * nstates * 256))
+    for s in range(nstates):
+        base = s << 8
+        for byte in range(256):
+            ch = chr(byte)
+            t = s
+            while t and ch not in goto[t]:
+                t = fail[t]
+            next_tab[base + byte] = goto[t].get(ch, 0)
+    rank_tab = array('i', [o[0] if o is not None else -1 for o in out])
+    cat_tab = [o[1] if o is not None else '' for o in out]
+    return next_tab, rank_tab, cat_tab
+
+
+_DFA_NEXT, _DFA_RANK, _DFA_CAT = \
+    _compile_keyword_dfa(*_build_keyword_automaton(CATEGORY_KEYWORDS))
+
+# Pre-bound little-endian u16 reader shared by the header/overlay scans
+_LE16 = struct.Struct('<H')
+
+# MSC 5.x prologue byte patterns: PUSH BP (55) followed by MOV BP, SP
+# in either encoding (8B EC or 89 E5). Matching raw bytes avoids
+# inspecting the decoded operands of every instruction.
+_PROLOGUE_RE = re.compile(rb'\x55(?:\x8b\xec|\x89\xe5)')
+
+
+def _match_category(string):
+    """Return the highest-priority category whose keyword occurs in string."""
+    next_tab = _DFA_NEXT
+    rank_tab = _DFA_RANK
+    state = 0
+    best = -1
+    best_cat = ''
+    for byte in string.encode('ascii', errors='replace'):
+        state = next_tab[(state << 8) | byte]
+        r = rank_tab[state]
+        if r >= 0 and (best < 0 or r < best):
+            if r == 0:
+                return _DFA_CAT[state]  # top-priority category - can't improve
+            best = r
+            best_cat = _DFA_CAT[state]
+    return best_cat
+
+
+def _prologue_offsets(code):
+    """Set of candidate prologue positions in a code buffer."""
+    if np is not None and len(code) >= 3:
+        # Shifted-view comparisons: three aligned lanes over the
+        # same buffer find every 55 8B EC / 55 89 E5 triple at once.
+        arr = np.frombuffer(code, dtype=np.uint8)
+        a, b, c = arr[:-2], arr[1:-1], arr[2:]
+        hits = np.where((a == 0x55) & (((b == 0x8B) & (c == 0xEC)) |
+                                       ((b == 0x89) & (c == 0xE5))))[0]
+        return set(map(int, hits))
+    return {m.start() for m in _PROLOGUE_RE.finditer(code)}
+
+
+def _detect_functions_in_code(code, base, overlay_num=0):
+    """Detect function boundaries in one code buffer.
+
+    Module-level rather than a method so overlay code buffers can be
+    farmed out to worker processes during parallel analysis.
+    """
+    decoder = Decoder(code, base_offset=base)
+
+    # Structure-of-arrays scan: just instruction boundaries and
+    # opcode bytes, no Instruction/Operand objects. The few opcodes
+    # this pass cares about are re-read straight from the bytes.
+    offsets, opcodes, op_offs = decoder.scan_range(0, len(code))
+
+    # Candidate prologue positions from a single pass over the raw
+    # bytes. A candidate only counts when the decoded instruction
+    # stream has a boundary at that position, which rules out matches
+    # inside immediates or displacements.
+    prologue_offs = _prologue_offsets(code)
+
+    functions = []
+    current_func = None
+    n = len(code)
+
+    for k in range(len(offsets)):
+        addr = offsets[k]
+
+        # MSC 5.x prologue: PUSH BP (55) / MOV BP, SP (8B EC or 89 E5)
+        if addr in prologue_offs:
+            # Close previous function
+            if current_func:
+                current_func.end = base + addr
+                current_func.size = current_func.end - current_func.start
+                functions.append(current_func)
+
+            # Start new function
+            current_func = Function()
+            current_func.start = base + addr
+            current_func.overlay_num = overlay_num
+            current_func.is_overlay = overlay_num > 0
+
+            # Check for SUB SP, N (local frame allocation) right after
+            # the 3-byte prologue: 83 EC ib (sign-extended) or 81 EC iw
+            p = addr + 3
+            if p + 2 < n and code[p + 1] == 0xEC:
+                if code[p] == 0x83:
+                    v = code[p + 2]
+                    current_func.local_size = \
+                        v if v < 128 else (v - 256) & 0xFFFF
+                elif code[p] == 0x81 and p + 3 < n:
+                    current_func.local_size = code[p + 2] | (code[p + 3] << 8)
+
+        # Track calls within current function
+        if current_func:
+            current_func.inst_count += 1
+
+            op = opcodes[k]
+            if op == 0xE8:
+                # Near call - target is relative to the code range
+                o = op_offs[k]
+                rel = code[o + 1] | (code[o + 2] << 8)
+                if rel >= 0x8000:
+                    rel -= 0x10000
+                current_func.calls.append(base + o + 3 + rel)
+            elif op == 0x9A:
+                # Far call seg:off
+                o = op_offs[k]
+                off = code[o + 1] | (code[o + 2] << 8)
+                seg = code[o + 3] | (code[o + 4] << 8)
+                current_func.calls.append((seg, off))
+            elif op == 0xCD:
+                # Overlay call: INT 3Fh <ovl:u8> <off:u16>
+                o = op_offs[k]
+                if code[o + 1] == 0x3F and o + 4 < n:
+                    current_func.ovl_calls.append(
+                        (code[o + 2], code[o + 3] | (code[o + 4] << 8)))
+            elif op == 0xCA or op == 0xCB:
+                # Detect far returns (RETF)
+                current_func.is_far = True
+
+    # Close last function
+    if current_func:
+        current_func.end = base + len(code)
+        current_func.size = current_func.end - current_func.start
+        functions.append(current_func)
+
+    return functions
 
 
 @dataclass
@@ -72,109 +302,87 @@ class Analyzer:
         last_page = struct.unpack_from('<H', data, 2)[0]
         self.img_size = (pages - 1) * 512 + last_page if last_page else pages * 512
 
+    def _mz_candidates_np(self, scan):
+        """Offsets of 'MZ' signatures on 512-byte boundaries (NumPy scan)."""
+        n = len(self.data)
+        if scan + 28 >= n:
+            return []
+        arr = np.frombuffer(self.data, dtype=np.uint8)
+        # Strided views over every 512th byte - one comparison per lane
+        first = arr[scan::0x200]
+        second = arr[scan + 1::0x200]
+        m = min(len(first), len(second))
+        hits = np.where((first[:m] == 0x4D) & (second[:m] == 0x5A))[0]
+        return [scan + int(i) * 0x200 for i in hits
+                if scan + int(i) * 0x200 + 28 < n]
+
+    def _mz_candidates_py(self, scan):
+        """Pure-Python MZ signature scan (fallback when NumPy is unavailable)."""
+        data = self.data
+        limit = len(data) - 28
+        candidates = []
+        while scan < limit:
+            if data[scan] == 0x4D and data[scan+1] == 0x5A:
+                candidates.append(scan)
+            scan += 0x200
+        return candidates
+
     def find_overlays(self):
         """Locate all overlay modules in the file."""
         scan = (self.img_size + 0x1FF) & ~0x1FF
-        index = 0
 
-        while scan + 28 < len(self.data):
-            if self.data[scan] == 0x4D and self.data[scan+1] == 0x5A:
-                op = struct.unpack_from('<H', self.data, scan + 4)[0]
-                olp = struct.unpack_from('<H', self.data, scan + 2)[0]
-                ohp = struct.unpack_from('<H', self.data, scan + 8)[0]
-                if 0 < op < 500 and 0 < ohp < 100:
-                    index += 1
-                    hdr_sz = ohp * 16
-                    o_img = (op - 1) * 512 + olp if olp else op * 512
-                    code_sz = o_img - hdr_sz
-                    self.overlays.append(OverlayInfo(
-                        index=index,
-                        file_offset=scan,
-                        code_offset=scan + hdr_sz,
-                        code_size=code_sz,
-                    ))
-            scan += 0x200
+        if np is not None:
+            candidates = self._mz_candidates_np(scan)
+        else:
+            candidates = self._mz_candidates_py(scan)
+
+        data = self.data
+        u16 = _LE16.unpack_from
+        index = 0
+        for pos in candidates:
+            op = u16(data, pos + 4)[0]
+            olp = u16(data, pos + 2)[0]
+            ohp = u16(data, pos + 8)[0]
+            if 0 < op < 500 and 0 < ohp < 100:
+                index += 1
+                hdr_sz = ohp * 16
+                o_img = (op - 1) * 512 + olp if olp else op * 512
+                code_sz = o_img - hdr_sz
+                self.overlays.append(OverlayInfo(
+                    index=index,
+                    file_offset=pos,
+                    code_offset=pos + hdr_sz,
+                    code_size=code_sz,
+                ))
 
     def _detect_functions_in_range(self, start, end, overlay_num=0):
         """Detect function boundaries in a code range using prologue patterns."""
-        code = self.data[start:end]
-        decoder = Decoder(code, base_offset=start)
-        instructions = decoder.decode_all()
-
-        functions = []
-        current_func = None
-        i = 0
-
-        while i < len(instructions):
-            inst = instructions[i]
-
-            # MSC 5.x prologue: PUSH BP (55) / MOV BP, SP (8B EC or 89 E5)
-            is_prologue = False
-            if (inst.mnemonic == 'push' and inst.op1 and
-                inst.op1.type == OpType.REG16 and inst.op1.reg == 5):  # BP
-                # Check next instruction is MOV BP, SP
-                if i + 1 < len(instructions):
-                    next_inst = instructions[i + 1]
-                    if (next_inst.mnemonic == 'mov' and
-                        next_inst.op1 and next_inst.op1.type == OpType.REG16 and
-                        next_inst.op1.reg == 5 and  # BP
-                        next_inst.op2 and next_inst.op2.type == OpType.REG16 and
-                        next_inst.op2.reg == 4):    # SP
-                        is_prologue = True
-
-            if is_prologue:
-                # Close previous function
-                if current_func:
-                    current_func.end = inst.offset
-                    current_func.size = current_func.end - current_func.start
-                    functions.append(current_func)
-
-                # Start new function
-                current_func = Function()
-                current_func.start = inst.offset
-                current_func.overlay_num = overlay_num
-                current_func.is_overlay = overlay_num > 0
-
-                # Check for SUB SP, N (local frame allocation)
-                if i + 2 < len(instructions):
-                    sub_inst = instructions[i + 2]
-                    if (sub_inst.mnemonic == 'sub' and
-                        sub_inst.op1 and sub_inst.op1.type == OpType.REG16 and
-                        sub_inst.op1.reg == 4 and  # SP
-                        sub_inst.op2 and sub_inst.op2.type in (OpType.IMM8, OpType.IMM16)):
-                        current_func.local_size = sub_inst.op2.disp
-
-            # Track calls within current function
-            if current_func:
-                current_func.inst_count += 1
-
-                if inst.mnemonic == 'call':
-                    if inst.op1 and inst.op1.type == OpType.REL16:
-                        # Near call - target is relative to code range
-                        target = start + inst.op1.disp
-                        current_func.calls.append(target)
-                    elif inst.op1 and inst.op1.type == OpType.FAR:
-                        current_func.calls.append(
-                            (inst.op1.far_seg, inst.op1.disp))
-
-                # Overlay calls
-                if inst.mnemonic == 'int' and inst.overlay_num >= 0:
-                    current_func.ovl_calls.append(
-                        (inst.overlay_num, inst.overlay_off))
-
-                # Detect far returns
-                if inst.mnemonic in ('retf',):
-                    current_func.is_far = True
-
-            i += 1
-
-        # Close last function
-        if current_func:
-            current_func.end = end
-            current_func.size = current_func.end - current_func.start
-            functions.append(current_func)
-
-        return functions
+        return _detect_functions_in_code(self.data[start:end], start,
+                                         overlay_num)
+
+    def _analyze_overlays(self):
+        """Detect functions in every overlay, in parallel when possible.
+
+        Each overlay is an independent code buffer, so detection runs
+        across a process pool when there is more than one overlay and
+        more than one CPU. Falls back to a serial loop if the pool
+        cannot be created (restricted environments).
+        """
+        codes = [bytes(self.data[o.code_offset:o.code_offset + o.code_size])
+                 for o in self.overlays]
+        bases = [o.code_offset for o in self.overlays]
+        nums = [o.index for o in self.overlays]
+
+        workers = min(len(codes), os.cpu_count() or 1)
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    return list(pool.map(_detect_functions_in_code,
+                                         codes, bases, nums))
+            except OSError:
+                pass
+        return [_detect_functions_in_code(c, b, n)
+                for c, b, n in zip(codes, bases, nums)]
 
     def detect_all_functions(self):
         """Detect functions in resident code and all overlays."""
@@ -188,12 +396,8 @@ class Analyzer:
         self.functions.extend(resident_funcs)
         print(f"  Found {len(resident_funcs)} functions in resident code")
 
-        # Overlay modules
-        for ovl in self.overlays:
-            ovl_funcs = self._detect_functions_in_range(
-                ovl.code_offset, ovl.code_offset + ovl.code_size,
-                overlay_num=ovl.index)
-
+        # Overlay modules - analyzed independently, so farm them out
+        for ovl, ovl_funcs in zip(self.overlays, self._analyze_overlays()):
             for i, f in enumerate(ovl_funcs):
                 f.name = f'ovl{ovl.index:02d}_{f.start:06X}'
             ovl.functions = ovl_funcs
@@ -201,79 +405,114 @@ class Analyzer:
             print(f"  Overlay {ovl.index:2d}: {len(ovl_funcs)} functions "
                   f"({ovl.code_size} bytes)")
 
-        # Build call graph (map callee → list of callers)
+        # Build call graph (map callee → list of callers). Functions are
+        # non-overlapping, so locate the function containing each call
+        # target with a bisect over the sorted start offsets rather than
+        # a linear scan per target.
+        funcs = sorted(self.functions, key=lambda f: f.start)
+        starts = [f.start for f in funcs]
+
+        # Accumulate callers in sets (O(1) dedup instead of a list scan
+        # per edge), then convert once at the end.
+        callers = {f.name: set() for f in self.functions}
         for func in self.functions:
             for target in func.calls:
                 if isinstance(target, int):
-                    # Find function containing target
-                    for f2 in self.functions:
-                        if f2.start <= target < f2.end:
-                            if func.name not in f2.called_by:
-                                f2.called_by.append(func.name)
-                            break
+                    i = bisect.bisect_right(starts, target) - 1
+                    if i >= 0:
+                        f2 = funcs[i]
+                        if target < f2.end:
+                            callers[f2.name].add(func.name)
+        for f in self.functions:
+            f.called_by = sorted(callers[f.name])
 
     def extract_strings(self):
         """Extract strings from the data section."""
         # Data section is roughly between the last code and overlay area
         # Scan the entire resident image for strings
-        current = b''
-        str_start = 0
-
-        for i in range(self.hdr_size, self.img_size):
-            b = self.data[i]
-            if 32 <= b < 127:
-                if not current:
-                    str_start = i
-                current += bytes([b])
-            else:
-                if len(current) >= 4:
-                    self.strings[str_start] = current.decode('ascii', errors='replace')
-                current = b''
+        if np is not None:
+            self._extract_strings_np()
+        else:
+            self._extract_strings_py()
+
+    def _extract_strings_np(self):
+        """Vectorized string scan: printable-run detection via NumPy."""
+        count = self.img_size - self.hdr_size
+        arr = np.frombuffer(self.data, dtype=np.uint8,
+                            count=count, offset=self.hdr_size)
+        printable = (arr >= 32) & (arr < 127)
+        # Run boundaries: +1 where a printable run starts, -1 where it ends
+        edges = np.diff(printable.view(np.int8), prepend=np.int8(0),
+                        append=np.int8(0))
+        starts = np.where(edges == 1)[0]
+        ends = np.where(edges == -1)[0]
+        keep = (ends - starts) >= 4
+        for s, e in zip(starts[keep], ends[keep]):
+            self.strings[self.hdr_size + int(s)] = \
+                self.data[self.hdr_size + s:self.hdr_size + e].decode(
+                    'ascii', errors='replace')
+
+    def _extract_strings_py(self):
+        """Regex string scan (fallback when NumPy is unavailable).
+
+        One finditer pass over the resident image: the printable-run
+        detection happens inside the regex engine instead of a Python
+        per-byte loop. Unlike the old loop, a run ending exactly at the
+        image boundary is kept, matching the NumPy path.
+        """
+        region = self.data[self.hdr_size:self.img_size]
+        for m in _PRINT_RUN_RE.finditer(region):
+            self.strings[self.hdr_size + m.start()] = \
+                m.group().decode('ascii', errors='replace')
 
     def categorize_functions(self):
         """Attempt to categorize functions by the strings they reference."""
-        # Build a map of which address ranges contain interesting strings
-        categories = {
-            'gfx': ['.pic', '.pal', 'graphic', 'sprite', 'icon', 'VGA', 'EGA'],
-            'sound': ['.cvl', 'sound', 'AdLib', 'Blaster', 'Tandy'],
-            'input': ['Mouse', 'Keyboard', 'mouse', 'keyboard'],
-            'game': ['city', 'unit', 'build', 'combat', 'wonder', 'advance',
-                     'Civilization', 'civilization', 'GAME OVER'],
-            'map': ['Map', 'map', 'terrain', 'continent', 'ocean'],
-            'diplo': ['king', 'President', 'Warlord', 'Emperor', 'treaty',
-                      'peace', 'war'],
-            'save': ['Save', 'Load', 'CIVIL0', 'civil0', 'fame'],
-            'ui': ['menu', 'Menu', 'Status', 'screen', 'display'],
-            'init': ['Start', 'New Game', 'logo', 'credits', 'intro'],
-        }
-
-        for func in self.functions:
-            # Check strings in the function's address range
-            for addr, string in self.strings.items():
-                if func.start <= addr < func.end:
-                    for cat, keywords in categories.items():
-                        if any(kw in string for kw in keywords):
-                            func.category = cat
-                            break
+        if not self.functions:
+            return
+
+        # Functions are non-overlapping intervals, so each string address
+        # belongs to at most one function - find it by bisecting the
+        # sorted function start offsets instead of testing every
+        # (func, string) pair.
+        funcs = sorted(self.functions, key=lambda f: f.start)
+        starts = [f.start for f in funcs]
+
+        for addr, string in self.strings.items():
+            i = bisect.bisect_right(starts, addr) - 1
+            if i < 0:
+                continue
+            func = funcs[i]
+            if addr >= func.end:
+                continue
+            # Single pass over the string via the precompiled keyword
+            # automaton instead of 9 categories x up to 10 `in` scans.
+            cat = _match_category(string)
+            if cat:
+                func.category = cat
 
     def print_report(self, verbose=False):
         """Print analysis report."""
-        print()
-        print("=" * 70)
-        print("  Sid Meier's Civilization (1991) - Function Analysis")
-        print("=" * 70)
-
-        print(f"\n  Total functions detected:  {len(self.functions)}")
-        print(f"  Resident functions:        {sum(1 for f in self.functions if not f.is_overlay)}")
-        print(f"  Overlay functions:         {sum(1 for f in self.functions if f.is_overlay)}")
-        print(f"  Total instructions:        {sum(f.inst_count for f in self.functions)}")
-        print(f"  Strings extracted:         {len(self.strings)}")
+        # Build every line first and flush with a single write: one
+        # syscall instead of one per print call.
+        lines = []
+        out = lines.append
+
+        out("")
+        out("=" * 70)
+        out("  Sid Meier's Civilization (1991) - Function Analysis")
+        out("=" * 70)
+
+        out(f"\n  Total functions detected:  {len(self.functions)}")
+        out(f"  Resident functions:        {sum(1 for f in self.functions if not f.is_overlay)}")
+        out(f"  Overlay functions:         {sum(1 for f in self.functions if f.is_overlay)}")
+        out(f"  Total instructions:        {sum(f.inst_count for f in self.functions)}")
+        out(f"  Strings extracted:         {len(self.strings)}")
 
         # Overlay summary
-        print(f"\n  === Overlay Module Functions ===")
+        out(f"\n  === Overlay Module Functions ===")
         for ovl in self.overlays:
-            print(f"  OVL {ovl.index:2d}: {len(ovl.functions):3d} functions, "
-                  f"{ovl.code_size:6d} bytes")
+            out(f"  OVL {ovl.index:2d}: {len(ovl.functions):3d} functions, "
+                f"{ovl.code_size:6d} bytes")
 
         # Category summary
         cats = {}
@@ -283,31 +522,31 @@ class Analyzer:
                 cats[cat] = 0
             cats[cat] += 1
         if cats:
-            print(f"\n  === Function Categories ===")
+            out(f"\n  === Function Categories ===")
             for cat, count in sorted(cats.items(), key=lambda x: -x[1]):
-                print(f"    {cat:12s}: {count:4d} functions")
+                out(f"    {cat:12s}: {count:4d} functions")
 
         # Largest functions
         by_size = sorted(self.functions, key=lambda f: -f.size)
-        print(f"\n  === Largest Functions (top 20) ===")
-        print(f"  {'Name':<22s} {'Start':>8s} {'Size':>8s} {'Insts':>6s} "
-              f"{'Stack':>6s} {'Far':>4s} {'Cat':>8s}")
-        print(f"  {'-'*22} {'-'*8} {'-'*8} {'-'*6} {'-'*6} {'-'*4} {'-'*8}")
+        out(f"\n  === Largest Functions (top 20) ===")
+        out(f"  {'Name':<22s} {'Start':>8s} {'Size':>8s} {'Insts':>6s} "
+            f"{'Stack':>6s} {'Far':>4s} {'Cat':>8s}")
+        out(f"  {'-'*22} {'-'*8} {'-'*8} {'-'*6} {'-'*6} {'-'*4} {'-'*8}")
         for f in by_size[:20]:
-            print(f"  {f.name:<22s} {f.start:08X} {f.size:7d}B {f.inst_count:5d} "
-                  f"{f.local_size:5d}B {'Y' if f.is_far else 'N':>4s} "
-                  f"{f.category or '-':>8s}")
+            out(f"  {f.name:<22s} {f.start:08X} {f.size:7d}B {f.inst_count:5d} "
+                f"{f.local_size:5d}B {'Y' if f.is_far else 'N':>4s} "
+                f"{f.category or '-':>8s}")
 
         # Most-called functions
         by_callers = sorted(self.functions, key=lambda f: -len(f.called_by))
-        print(f"\n  === Most-Called Functions (top 20) ===")
-        print(f"  {'Name':<22s} {'Callers':>8s} {'Size':>8s} {'Cat':>8s}")
-        print(f"  {'-'*22} {'-'*8} {'-'*8} {'-'*8}")
+        out(f"\n  === Most-Called Functions (top 20) ===")
+        out(f"  {'Name':<22s} {'Callers':>8s} {'Size':>8s} {'Cat':>8s}")
+        out(f"  {'-'*22} {'-'*8} {'-'*8} {'-'*8}")
         for f in by_callers[:20]:
             if not f.called_by:
                 break
-            print(f"  {f.name:<22s} {len(f.called_by):7d}  {f.size:7d}B "
-                  f"{f.category or '-':>8s}")
+            out(f"  {f.name:<22s} {len(f.called_by):7d}  {f.size:7d}B "
+                f"{f.category or '-':>8s}")
 
         # Overlay call hotspots
         all_ovl_calls = []
@@ -315,47 +554,55 @@ class Analyzer:
             for oc in f.ovl_calls:
                 all_ovl_calls.append((oc, f.name))
         if all_ovl_calls:
-            print(f"\n  === Overlay Call Summary ===")
-            print(f"  Total overlay call sites: {len(all_ovl_calls)}")
+            out(f"\n  === Overlay Call Summary ===")
+            out(f"  Total overlay call sites: {len(all_ovl_calls)}")
             # Count per overlay
             ovl_counts = {}
             for (onum, ooff), fname in all_ovl_calls:
                 ovl_counts[onum] = ovl_counts.get(onum, 0) + 1
             for onum in sorted(ovl_counts.keys()):
-                print(f"    OVL {onum:02X}: {ovl_counts[onum]:3d} calls")
+                out(f"    OVL {onum:02X}: {ovl_counts[onum]:3d} calls")
 
         if verbose:
-            print(f"\n  === All Functions ===")
+            out(f"\n  === All Functions ===")
             for f in sorted(self.functions, key=lambda f: f.start):
                 ovl_tag = f' (OVL {f.overlay_num})' if f.is_overlay else ''
-                print(f"  {f.name:<22s} {f.start:08X}-{f.end:08X} "
-                      f"{f.size:6d}B {f.inst_count:5d} insts{ovl_tag}")
+                out(f"  {f.name:<22s} {f.start:08X}-{f.end:08X} "
+                    f"{f.size:6d}B {f.inst_count:5d} insts{ovl_tag}")
+
+        sys.stdout.write('\n'.join(lines) + '\n')
 
     def export_symbols(self, path):
         """Export function map to a TOML-like symbols file."""
-        with open(path, 'w') as out:
-            out.write("# Civilization function symbols\n")
-            out.write("# Auto-generated by analyze.py\n\n")
+        # Assemble the whole file in memory and write it once
+        lines = []
+        out = lines.append
+
+        out("# Civilization function symbols")
+        out("# Auto-generated by analyze.py\n")
+
+        out("[resident]")
+        for f in sorted(self.functions, key=lambda f: f.start):
+            if not f.is_overlay:
+                out(f'{f.name} = {{ '
+                    f'start = 0x{f.start:06X}, '
+                    f'end = 0x{f.end:06X}, '
+                    f'size = {f.size}, '
+                    f'far = {"true" if f.is_far else "false"}'
+                    f' }}')
 
-            out.write("[resident]\n")
-            for f in sorted(self.functions, key=lambda f: f.start):
-                if not f.is_overlay:
-                    out.write(f'{f.name} = {{ '
-                              f'start = 0x{f.start:06X}, '
-                              f'end = 0x{f.end:06X}, '
-                              f'size = {f.size}, '
-                              f'far = {"true" if f.is_far else "false"}'
-                              f' }}\n')
-
-            for ovl in self.overlays:
-                out.write(f'\n[overlay_{ovl.index:02d}]\n')
-                for f in sorted(ovl.functions, key=lambda f: f.start):
-                    out.write(f'{f.name} = {{ '
-                              f'start = 0x{f.start:06X}, '
-                              f'end = 0x{f.end:06X}, '
-                              f'size = {f.size}, '
-                              f'far = {"true" if f.is_far else "false"}'
-                              f' }}\n')
+        for ovl in self.overlays:
+            out(f'\n[overlay_{ovl.index:02d}]')
+            for f in sorted(ovl.functions, key=lambda f: f.start):
+                out(f'{f.name} = {{ '
+                    f'start = 0x{f.start:06X}, '
+                    f'end = 0x{f.end:06X}, '
+                    f'size = {f.size}, '
+                    f'far = {"true" if f.is_far else "false"}'
+                    f' }}')
+
+        with open(path, 'w') as fh:
+            fh.write('\n'.join(lines) + '\n')
 
 
 def main():
@@ -364,25 +611,27 @@ def main():
         print("\nDetects function boundaries and builds call graph.")
         sys.exit(1)
 
-    with open(sys.argv[1], 'rb') as f:
-        data = f.read()
-
     verbose = '-v' in sys.argv
     sym_path = None
     if '-symbols' in sys.argv:
         idx = sys.argv.index('-symbols')
         sym_path = sys.argv[idx + 1]
 
-    analyzer = Analyzer(data)
-    analyzer.find_overlays()
-    analyzer.detect_all_functions()
-    analyzer.extract_strings()
-    analyzer.categorize_functions()
-    analyzer.print_report(verbose=verbose)
-
-    if sym_path:
-        analyzer.export_symbols(sym_path)
-        print(f"\nSymbols exported to: {sym_path}")
+    # Map the file instead of reading it: the analyzer only ever takes
+    # small slices, so no full-file bytes copy is needed.
+    with open(sys.argv[1], 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        analyzer = Analyzer(data)
+        analyzer.find_overlays()
+        analyzer.detect_all_functions()
+        analyzer.extract_strings()
+        analyzer.categorize_functions()
+        analyzer.print_report(verbose=verbose)
+
+        if sym_path:
+            analyzer.export_symbols(sym_path)
+            print(f"\nSymbols exported to: {sym_path}")
 
 
 if __name__ == '__main__':
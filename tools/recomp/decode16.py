@@ -8,10 +8,17 @@ ModR/M byte decoding, and the MSC overlay manager INT 3Fh calls.
 Part of the Civ Recomp project (sp00nznet/civ)
 """
 
-from dataclasses import dataclass, field
+import struct
+
+from array import array
 from enum import Enum, auto
 from typing import Optional
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # ─── Operand types ───────────────────────────────────────────────
 
 class OpType(Enum):
@@ -39,18 +46,165 @@ EA_BASES = [
 # Default segment for each r/m value (mod != 11)
 EA_DEFAULT_SEG = ['ds', 'ds', 'ss', 'ss', 'ds', 'ds', 'ss', 'ds']
 
-@dataclass
+# Pre-bound word readers: one C-level unpack replaces the two indexed
+# byte loads plus shift/sign-extension branch in the old accessors
+_unpack_u16 = struct.Struct('<H').unpack_from
+_unpack_s16 = struct.Struct('<h').unpack_from
+
+def _build_modrm_mem():
+    """Precompute (base, index, default_seg, disp_width) for every
+    memory-form (mod, rm) pair. disp_width is 0 (no displacement),
+    1 (disp8), 2 (disp16) or 16 (direct [disp16], the mod=0 rm=6
+    special case). Collapses the branching in _decode_modrm's memory
+    path to one table fetch plus one displacement read.
+    """
+    table = []
+    for mod in range(3):
+        for rm in range(8):
+            base, idx = EA_BASES[rm]
+            seg = EA_DEFAULT_SEG[rm]
+            width = mod  # mod 1 -> disp8, mod 2 -> disp16
+            if mod == 0 and rm == 6:
+                base, idx, seg, width = '', '', 'ds', 16
+            table.append((base, idx or '', seg, width))
+    return tuple(table)
+
+
+_MODRM_MEM = _build_modrm_mem()
+
+# Prefix bytes recognized by decode_one
+PREFIX_BYTES = frozenset((0x26, 0x2E, 0x36, 0x3E, 0xF0, 0xF2, 0xF3))
+
+# Prefix classifier: kind 0 = not a prefix, 1 = segment override,
+# 2 = REP/REPNZ, 3 = LOCK (ignored). One table load replaces the
+# per-byte if/elif chain in decode_one's prefix loop.
+PREFIX_TABLE = [(0, '')] * 256
+PREFIX_TABLE[0x26] = (1, 'es')
+PREFIX_TABLE[0x2E] = (1, 'cs')
+PREFIX_TABLE[0x36] = (1, 'ss')
+PREFIX_TABLE[0x3E] = (1, 'ds')
+PREFIX_TABLE[0xF2] = (2, 'repnz')
+PREFIX_TABLE[0xF3] = (2, 'rep')
+PREFIX_TABLE[0xF0] = (3, '')
+
+# Mnemonic tables shared by the opcode handlers
+ALU_NAMES   = ('add', 'or', 'adc', 'sbb', 'and', 'sub', 'xor', 'cmp')
+CC_NAMES    = ('jo', 'jno', 'jb', 'jae', 'je', 'jne', 'jbe', 'ja',
+               'js', 'jns', 'jp', 'jnp', 'jl', 'jge', 'jle', 'jg')
+SHIFT_NAMES = ('rol', 'ror', 'rcl', 'rcr', 'shl', 'shr', 'sal', 'sar')
+GRP3_NAMES  = ('test', 'test', 'not', 'neg', 'mul', 'imul', 'div', 'idiv')
+# Group 4/5 and ESC names are fully precomputed (including the far
+# call/jmp variants and the esc_N/grp4_N fallbacks) so no handler ever
+# builds a mnemonic string at decode time
+GRP4_NAMES  = ('inc', 'dec') + tuple(f'grp4_{i}' for i in range(2, 8))
+GRP5_NAMES  = ('inc', 'dec', 'call', 'call far', 'jmp', 'jmp far', 'push', '?')
+ESC_NAMES   = tuple(f'esc_{i}' for i in range(8))
+
+# Master mnemonic table. Every mnemonic the decoder can emit appears
+# here exactly once; MNEM_ID gives downstream passes a stable small-int
+# encoding without changing Instruction.mnemonic away from the interned
+# strings the lifter compares against.
+MNEMONICS = tuple(dict.fromkeys(
+    ('db', 'push', 'pop', 'mov', 'xchg', 'test', 'lea', 'les', 'lds',
+     'imul', 'call', 'jmp', 'ret', 'retf', 'enter', 'leave', 'int',
+     'into', 'iret', 'aam', 'aad', 'in', 'out',
+     'loopnz', 'loopz', 'loop', 'jcxz',
+     'daa', 'das', 'aaa', 'aas', 'pusha', 'popa', 'nop', 'cbw', 'cwd',
+     'wait', 'pushf', 'popf', 'sahf', 'lahf',
+     'movsb', 'movsw', 'cmpsb', 'cmpsw', 'stosb', 'stosw',
+     'lodsb', 'lodsw', 'scasb', 'scasw',
+     'xlat', 'hlt', 'cmc', 'clc', 'stc', 'cli', 'sti', 'cld', 'std')
+    + ALU_NAMES + CC_NAMES + SHIFT_NAMES + GRP3_NAMES
+    + GRP4_NAMES + GRP5_NAMES + ESC_NAMES))
+MNEM_ID = {name: i for i, name in enumerate(MNEMONICS)}
+
+
+def _build_decode_shapes():
+    """Per-opcode decode shape tables for the fast length scanner.
+
+    Returns (has_modrm, imm_bytes): has_modrm[op] is True when the
+    opcode is followed by a ModR/M byte, imm_bytes[op] counts the
+    immediate/offset bytes after the opcode (and ModR/M displacement,
+    when present). Opcodes whose length depends on operand bytes
+    (0xCD INT, 0xF6/0xF7 group 3) get special handling in scan_range.
+    These tables must agree exactly with decode_one.
+    """
+    modrm = [False] * 256
+    imm = [0] * 256
+
+    # ALU block 0x00-0x3F: subcodes 0-3 take ModR/M, 4 imm8, 5 imm16
+    for op in range(0x40):
+        sub = op & 7
+        if sub <= 3:
+            modrm[op] = True
+        elif sub == 4:
+            imm[op] = 1
+        elif sub == 5:
+            imm[op] = 2
+
+    for op in (0x69, 0x6B, 0x80, 0x81, 0x82, 0x83,
+               0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x8A, 0x8B,
+               0x8C, 0x8D, 0x8E, 0x8F, 0xC0, 0xC1, 0xC4, 0xC5,
+               0xC6, 0xC7, 0xD0, 0xD1, 0xD2, 0xD3,
+               0xD8, 0xD9, 0xDA, 0xDB, 0xDC, 0xDD, 0xDE, 0xDF,
+               0xF6, 0xF7, 0xFE, 0xFF):
+        modrm[op] = True
+
+    for op in (0x6A, 0x6B, 0x80, 0x82, 0x83, 0xA8, 0xC0, 0xC1, 0xC6,
+               0xCD, 0xD4, 0xD5, 0xEB):
+        imm[op] = 1
+    for op in range(0x70, 0x80):    # Jcc rel8
+        imm[op] = 1
+    for op in range(0xB0, 0xB8):    # MOV reg8, imm8
+        imm[op] = 1
+    for op in range(0xE0, 0xE8):    # LOOPcc/JCXZ rel8, IN/OUT imm8
+        imm[op] = 1
+
+    for op in (0x68, 0x69, 0x81, 0xA0, 0xA1, 0xA2, 0xA3, 0xA9,
+               0xC2, 0xC7, 0xCA, 0xE8, 0xE9):
+        imm[op] = 2
+    for op in range(0xB8, 0xC0):    # MOV reg16, imm16
+        imm[op] = 2
+
+    imm[0xC8] = 3                   # ENTER imm16, imm8
+    imm[0x9A] = 4                   # CALL far seg:off
+    imm[0xEA] = 4                   # JMP far seg:off
+
+    return modrm, imm
+
+
+_HAS_MODRM, _IMM_BYTES = _build_decode_shapes()
+
+# Operand-size prefix for the memory-operand reprs
+_SZ_PREFIX = {1: 'byte ', 2: 'word '}
+
+
 class Operand:
-    type: OpType = OpType.NONE
-    reg: int = 0           # Register index
-    seg: str = ''          # Segment override or far segment
-    base: str = ''         # Base register name
-    index: str = ''        # Index register name
-    disp: int = 0          # Displacement or immediate value
-    size: int = 0          # Operand size in bytes (1 or 2)
-    far_seg: int = 0       # Far pointer segment value
+    """Decoded operand.
+
+    A plain __slots__ class rather than a dataclass: one Operand is
+    allocated per operand of every decoded instruction, and the
+    per-instance __dict__ a dataclass carries roughly doubles the
+    memory cost of a whole-binary disassembly.
+    """
+    __slots__ = ('type', 'reg', 'seg', 'base', 'index', 'disp', 'size',
+                 'far_seg', '_repr')
+
+    def __init__(self, type=OpType.NONE, reg=0, seg='', base='', index='',
+                 disp=0, size=0, far_seg=0):
+        self._repr = ''         # Cached repr (set on the interned singletons)
+        self.type = type
+        self.reg = reg          # Register index
+        self.seg = seg          # Segment override or far segment
+        self.base = base        # Base register name
+        self.index = index      # Index register name
+        self.disp = disp        # Displacement or immediate value
+        self.size = size        # Operand size in bytes (1 or 2)
+        self.far_seg = far_seg  # Far pointer segment value
 
     def __repr__(self):
+        if self._repr:
+            return self._repr
         if self.type == OpType.REG8:
             return REG8_NAMES[self.reg]
         elif self.type == OpType.REG16:
@@ -65,7 +219,7 @@ class Operand:
             return f'{self.far_seg:04X}:{self.disp:04X}'
         elif self.type == OpType.MEM:
             prefix = f'{self.seg}:' if self.seg else ''
-            sz = 'byte ' if self.size == 1 else 'word ' if self.size == 2 else ''
+            sz = _SZ_PREFIX.get(self.size, '')
             parts = []
             if self.base: parts.append(self.base)
             if self.index: parts.append(self.index)
@@ -77,29 +231,71 @@ class Operand:
             return f'{sz}{prefix}[{"+".join(parts)}]'
         elif self.type == OpType.MOFFS:
             prefix = f'{self.seg}:' if self.seg else 'ds:'
-            sz = 'byte ' if self.size == 1 else 'word ' if self.size == 2 else ''
+            sz = _SZ_PREFIX.get(self.size, '')
             return f'{sz}{prefix}[0x{self.disp & 0xFFFF:X}]'
         return '?'
 
 
-# ─── Instruction representation ──────────────────────────────────
+# Interned operands for the degenerate register cases. The whole ISA
+# has only 8+8+4 distinct register operands, so the decoder hands out
+# shared singletons instead of allocating a fresh Operand per
+# instruction. Nothing mutates operands after decode (the lifter only
+# reads them), so sharing is safe.
+REG8_OPS  = tuple(Operand(type=OpType.REG8, reg=i, size=1) for i in range(8))
+REG16_OPS = tuple(Operand(type=OpType.REG16, reg=i, size=2) for i in range(8))
+SREG_OPS  = tuple(Operand(type=OpType.SREG, reg=i, size=2) for i in range(4))
+
+AL_OP = REG8_OPS[0]
+CL_OP = REG8_OPS[1]
+AX_OP = REG16_OPS[0]
+DX_OP = REG16_OPS[2]
+IMM8_ONE = Operand(type=OpType.IMM8, disp=1, size=1)
+
+# The singletons' reprs are constant; cache the strings so repr() on a
+# register operand (~80% of all operands printed) is one attribute load
+for _ops, _names in ((REG8_OPS, REG8_NAMES), (REG16_OPS, REG16_NAMES),
+                     (SREG_OPS, SREG_NAMES)):
+    for _op, _name in zip(_ops, _names):
+        _op._repr = _name
+IMM8_ONE._repr = '0x1'
 
-@dataclass
-class Instruction:
-    offset: int = 0         # File offset of this instruction
-    address: int = 0        # Logical address (segment-relative)
-    length: int = 0         # Total instruction length in bytes
-    raw: bytes = b''        # Raw instruction bytes
 
-    mnemonic: str = ''      # Instruction mnemonic
-    op1: Optional[Operand] = None
-    op2: Optional[Operand] = None
-    prefix: str = ''        # REP/REPZ/REPNZ prefix
-    seg_override: str = ''  # Segment override prefix (es/cs/ss/ds)
+# ─── Instruction representation ──────────────────────────────────
 
-    # For overlay calls (INT 3Fh)
-    overlay_num: int = -1
-    overlay_off: int = 0
+class Instruction:
+    """A single decoded instruction (__slots__ for the same reason as
+    Operand: millions of these exist during a full disassembly)."""
+    __slots__ = ('offset', 'address', 'length', 'mnemonic',
+                 'op1', 'op2', 'prefix', 'seg_override',
+                 'overlay_num', 'overlay_off',
+                 '_data', '_raw_start', '_raw_end')
+
+    def __init__(self):
+        self.offset = 0         # File offset of this instruction
+        self.address = 0        # Logical address (segment-relative)
+        self.length = 0         # Total instruction length in bytes
+
+        # Raw bytes are materialized lazily by the .raw property; the
+        # decoder only records the source buffer and the slice bounds
+        self._data = b''
+        self._raw_start = 0
+        self._raw_end = 0
+
+        self.mnemonic = ''      # Instruction mnemonic
+        self.op1 = None
+        self.op2 = None
+        self.prefix = ''        # REP/REPZ/REPNZ prefix
+        self.seg_override = ''  # Segment override prefix (es/cs/ss/ds)
+
+        # For overlay calls (INT 3Fh)
+        self.overlay_num = -1
+        self.overlay_off = 0
+
+    @property
+    def raw(self) -> bytes:
+        """Raw instruction bytes, sliced from the source buffer on
+        first use so untouched instructions never allocate them."""
+        return self._data[self._raw_start:self._raw_end]
 
     def __repr__(self):
         parts = []
@@ -114,6 +310,502 @@ class Instruction:
         return ' '.join(parts)
 
 
+# ─── Opcode handlers ─────────────────────────────────────────────
+#
+# decode_one dispatches through a 256-entry table of these instead of
+# walking a linear elif chain, so every opcode pays one indexed call
+# rather than O(chain-depth) comparisons. Encodings that differ only
+# in width, direction or signedness share one archetype factory; the
+# per-opcode flags are bound into the closure when the table is built
+# rather than re-derived from the opcode byte on every decode. Each
+# handler fills in the mnemonic and operands; decode_one owns
+# prefixes, length and raw.
+
+def _op_db(dec, inst, seg_override, opcode):
+    inst.mnemonic = 'db'
+    inst.op1 = Operand(type=OpType.IMM8, disp=opcode, size=1)
+
+
+def _op_mnem(mnem):
+    """Handler factory for opcodes with no operands."""
+    def handler(dec, inst, seg_override, opcode):
+        inst.mnemonic = mnem
+    return handler
+
+
+def _op_rm_reg(mnem, wide, reg_first):
+    """Handler factory for the r/m,reg / reg,r/m archetype (the ALU
+    ModR/M forms plus TEST, XCHG and MOV)."""
+    def handler(dec, inst, seg_override, opcode):
+        reg, rm, _ = dec._decode_modrm(wide, seg_override)
+        inst.mnemonic = mnem
+        if reg_first:
+            inst.op1 = reg; inst.op2 = rm
+        else:
+            inst.op1 = rm; inst.op2 = reg
+    return handler
+
+
+def _op_acc_imm(mnem, wide):
+    """Handler factory for the AL,imm8 / AX,imm16 archetype (ALU
+    immediate forms plus TEST)."""
+    if wide:
+        def handler(dec, inst, seg_override, opcode):
+            inst.mnemonic = mnem
+            inst.op1 = AX_OP
+            inst.op2 = Operand(type=OpType.IMM16, disp=dec._u16(), size=2)
+    else:
+        def handler(dec, inst, seg_override, opcode):
+            inst.mnemonic = mnem
+            inst.op1 = AL_OP
+            inst.op2 = Operand(type=OpType.IMM8, disp=dec._u8(), size=1)
+    return handler
+
+
+def _op_sreg(mnem):
+    """Handler factory for PUSH/POP sreg."""
+    def handler(dec, inst, seg_override, opcode):
+        inst.mnemonic = mnem
+        inst.op1 = SREG_OPS[(opcode >> 3) & 3]
+    return handler
+
+
+def _op_reg16(mnem):
+    """Handler factory for the INC/DEC/PUSH/POP reg16 blocks."""
+    def handler(dec, inst, seg_override, opcode):
+        inst.mnemonic = mnem
+        inst.op1 = REG16_OPS[opcode & 7]
+    return handler
+
+
+def _op_push_imm(wide):
+    """Handler factory for PUSH imm16 / imm8-sign-extended (80186+)."""
+    if wide:
+        def handler(dec, inst, seg_override, opcode):
+            inst.mnemonic = 'push'
+            inst.op1 = Operand(type=OpType.IMM16, disp=dec._u16(), size=2)
+    else:
+        def handler(dec, inst, seg_override, opcode):
+            inst.mnemonic = 'push'
+            inst.op1 = Operand(type=OpType.IMM8, disp=dec._s8() & 0xFFFF, size=2)
+    return handler
+
+
+def _op_imul_imm(wide):
+    """Handler factory for IMUL r16, r/m16, imm (80186+)."""
+    if wide:
+        def handler(dec, inst, seg_override, opcode):
+            reg, rm, _ = dec._decode_modrm(True, seg_override)
+            inst.mnemonic = 'imul'
+            inst.op1 = reg
+            inst.op2 = Operand(type=OpType.IMM16, disp=dec._u16(), size=2)
+    else:
+        def handler(dec, inst, seg_override, opcode):
+            reg, rm, _ = dec._decode_modrm(True, seg_override)
+            inst.mnemonic = 'imul'
+            inst.op1 = reg
+            inst.op2 = Operand(type=OpType.IMM8, disp=dec._s8() & 0xFFFF, size=2)
+    return handler
+
+
+def _op_jcc_short(mnem):
+    """Handler factory for the short Jcc block: each of the sixteen
+    opcodes gets its own handler with the condition mnemonic bound in,
+    instead of one shared handler indexing CC_NAMES per decode."""
+    def handler(dec, inst, seg_override, opcode):
+        inst.mnemonic = mnem
+        rel = dec._s8()
+        target = dec.pos + rel
+        dec.branch_targets.add(target)
+        inst.op1 = Operand(type=OpType.REL8, disp=target, size=2)
+    return handler
+
+
+def _op_grp1(wide, sign_ext):
+    """Handler factory for group 1 (ALU r/m, imm)."""
+    def handler(dec, inst, seg_override, opcode):
+        reg, rm, alu_op = dec._decode_modrm(wide, seg_override)
+        inst.mnemonic = ALU_NAMES[alu_op]
+        inst.op1 = rm
+        if sign_ext and wide:
+            inst.op2 = Operand(type=OpType.IMM8, disp=dec._s8() & 0xFFFF, size=2)
+        elif wide:
+            inst.op2 = Operand(type=OpType.IMM16, disp=dec._u16(), size=2)
+        else:
+            inst.op2 = Operand(type=OpType.IMM8, disp=dec._u8(), size=1)
+    return handler
+
+
+def _op_mov_rm_sreg(dec, inst, seg_override, opcode):
+    reg, rm, rn = dec._decode_modrm(True, seg_override)
+    inst.mnemonic = 'mov'
+    inst.op1 = rm
+    inst.op2 = SREG_OPS[rn & 3]
+
+
+def _op_mov_sreg_rm(dec, inst, seg_override, opcode):
+    reg, rm, rn = dec._decode_modrm(True, seg_override)
+    inst.mnemonic = 'mov'
+    inst.op1 = SREG_OPS[rn & 3]
+    inst.op2 = rm
+
+
+def _op_load(mnem):
+    """Handler factory for LEA/LES/LDS reg16, mem."""
+    def handler(dec, inst, seg_override, opcode):
+        reg, rm, _ = dec._decode_modrm(True, seg_override)
+        inst.mnemonic = mnem
+        inst.op1 = reg; inst.op2 = rm
+    return handler
+
+
+def _op_pop_rm(dec, inst, seg_override, opcode):
+    _, rm, _ = dec._decode_modrm(True, seg_override)
+    inst.mnemonic = 'pop'; inst.op1 = rm
+
+
+def _op_xchg_ax_reg(dec, inst, seg_override, opcode):
+    inst.mnemonic = 'xchg'
+    inst.op1 = AX_OP
+    inst.op2 = REG16_OPS[opcode - 0x90]
+
+
+def _op_far(mnem):
+    """Handler factory for CALL/JMP far seg:off."""
+    def handler(dec, inst, seg_override, opcode):
+        off = dec._u16()
+        seg = dec._u16()
+        inst.mnemonic = mnem
+        inst.op1 = Operand(type=OpType.FAR, disp=off, far_seg=seg, size=4)
+    return handler
+
+
+def _op_mov_moffs(wide, to_mem):
+    """Handler factory for MOV AL/AX, moffs and MOV moffs, AL/AX."""
+    acc = AX_OP if wide else AL_OP
+    size = 2 if wide else 1
+    def handler(dec, inst, seg_override, opcode):
+        inst.mnemonic = 'mov'
+        mem = Operand(type=OpType.MOFFS, disp=dec._u16(),
+                      seg=seg_override or 'ds', size=size)
+        if to_mem:
+            inst.op1 = mem; inst.op2 = acc
+        else:
+            inst.op1 = acc; inst.op2 = mem
+    return handler
+
+
+def _op_mov_reg8_imm(dec, inst, seg_override, opcode):
+    inst.mnemonic = 'mov'
+    inst.op1 = REG8_OPS[opcode - 0xB0]
+    inst.op2 = Operand(type=OpType.IMM8, disp=dec._u8(), size=1)
+
+
+def _op_mov_reg16_imm(dec, inst, seg_override, opcode):
+    inst.mnemonic = 'mov'
+    inst.op1 = REG16_OPS[opcode - 0xB8]
+    inst.op2 = Operand(type=OpType.IMM16, disp=dec._u16(), size=2)
+
+
+def _op_shift_imm(wide):
+    """Handler factory for the shift r/m, imm8 group (80186+)."""
+    def handler(dec, inst, seg_override, opcode):
+        reg, rm, shift_op = dec._decode_modrm(wide, seg_override)
+        inst.mnemonic = SHIFT_NAMES[shift_op]
+        inst.op1 = rm
+        inst.op2 = Operand(type=OpType.IMM8, disp=dec._u8(), size=1)
+    return handler
+
+
+def _op_shift(wide, by_cl):
+    """Handler factory for the shift r/m, 1 / shift r/m, CL group."""
+    op2 = CL_OP if by_cl else IMM8_ONE
+    def handler(dec, inst, seg_override, opcode):
+        reg, rm, shift_op = dec._decode_modrm(wide, seg_override)
+        inst.mnemonic = SHIFT_NAMES[shift_op]
+        inst.op1 = rm
+        inst.op2 = op2
+    return handler
+
+
+def _op_ret_imm(mnem):
+    """Handler factory for RET/RETF imm16."""
+    def handler(dec, inst, seg_override, opcode):
+        inst.mnemonic = mnem
+        inst.op1 = Operand(type=OpType.IMM16, disp=dec._u16(), size=2)
+    return handler
+
+
+def _op_mov_rm_imm(wide):
+    """Handler factory for MOV r/m, imm."""
+    if wide:
+        def handler(dec, inst, seg_override, opcode):
+            _, rm, _ = dec._decode_modrm(True, seg_override)
+            inst.mnemonic = 'mov'
+            inst.op1 = rm
+            inst.op2 = Operand(type=OpType.IMM16, disp=dec._u16(), size=2)
+    else:
+        def handler(dec, inst, seg_override, opcode):
+            _, rm, _ = dec._decode_modrm(False, seg_override)
+            inst.mnemonic = 'mov'
+            inst.op1 = rm
+            inst.op2 = Operand(type=OpType.IMM8, disp=dec._u8(), size=1)
+    return handler
+
+
+def _op_enter(dec, inst, seg_override, opcode):
+    # ENTER (80186+)
+    size = dec._u16()
+    level = dec._u8()
+    inst.mnemonic = 'enter'
+    inst.op1 = Operand(type=OpType.IMM16, disp=size, size=2)
+    inst.op2 = Operand(type=OpType.IMM8, disp=level, size=1)
+
+
+def _op_int3(dec, inst, seg_override, opcode):
+    inst.mnemonic = 'int'
+    inst.op1 = Operand(type=OpType.IMM8, disp=3, size=1)
+
+
+def _op_int(dec, inst, seg_override, opcode):
+    int_num = dec._u8()
+    inst.mnemonic = 'int'
+    inst.op1 = Operand(type=OpType.IMM8, disp=int_num, size=1)
+
+    # Special: MSC overlay call (INT 3Fh)
+    if int_num == 0x3F and dec.pos + 2 < dec.size:
+        inst.overlay_num = dec._u8()
+        inst.overlay_off = dec._u16()
+
+
+def _op_base_byte(mnem):
+    """Handler factory for AAM/AAD (opcode plus a base byte)."""
+    def handler(dec, inst, seg_override, opcode):
+        inst.mnemonic = mnem
+        dec._u8()  # base (usually 0x0A)
+    return handler
+
+
+def _op_esc(dec, inst, seg_override, opcode):
+    # ESC (FPU) - read ModR/M and skip
+    dec._decode_modrm(False, seg_override)
+    inst.mnemonic = ESC_NAMES[opcode - 0xD8]
+
+
+def _op_rel8(mnem):
+    """Handler factory for LOOPcc/JCXZ/JMP short."""
+    def handler(dec, inst, seg_override, opcode):
+        inst.mnemonic = mnem
+        rel = dec._s8()
+        target = dec.pos + rel
+        dec.branch_targets.add(target)
+        inst.op1 = Operand(type=OpType.REL8, disp=target, size=2)
+    return handler
+
+
+def _op_in(wide, from_dx):
+    """Handler factory for IN acc, imm8/DX."""
+    acc = AX_OP if wide else AL_OP
+    if from_dx:
+        def handler(dec, inst, seg_override, opcode):
+            inst.mnemonic = 'in'
+            inst.op1 = acc
+            inst.op2 = DX_OP
+    else:
+        def handler(dec, inst, seg_override, opcode):
+            inst.mnemonic = 'in'
+            inst.op1 = acc
+            inst.op2 = Operand(type=OpType.IMM8, disp=dec._u8(), size=1)
+    return handler
+
+
+def _op_out(wide, to_dx):
+    """Handler factory for OUT imm8/DX, acc."""
+    acc = AX_OP if wide else AL_OP
+    if to_dx:
+        def handler(dec, inst, seg_override, opcode):
+            inst.mnemonic = 'out'
+            inst.op1 = DX_OP
+            inst.op2 = acc
+    else:
+        def handler(dec, inst, seg_override, opcode):
+            inst.mnemonic = 'out'
+            inst.op1 = Operand(type=OpType.IMM8, disp=dec._u8(), size=1)
+            inst.op2 = acc
+    return handler
+
+
+def _op_rel16(mnem):
+    """Handler factory for CALL/JMP rel16."""
+    is_branch = mnem != 'call'  # call targets are not goto labels
+    def handler(dec, inst, seg_override, opcode):
+        rel = dec._s16()
+        target = dec.pos + rel  # offset relative to function start (no 16-bit mask)
+        if is_branch:
+            dec.branch_targets.add(target)
+        inst.mnemonic = mnem
+        inst.op1 = Operand(type=OpType.REL16, disp=target, size=2)
+    return handler
+
+
+def _op_grp3(wide):
+    """Handler factory for group 3 (TEST/NOT/NEG/MUL/IMUL/DIV/IDIV)."""
+    def handler(dec, inst, seg_override, opcode):
+        reg, rm, grp_op = dec._decode_modrm(wide, seg_override)
+        inst.mnemonic = GRP3_NAMES[grp_op]
+        inst.op1 = rm
+        if grp_op <= 1:  # TEST r/m, imm
+            if wide:
+                inst.op2 = Operand(type=OpType.IMM16, disp=dec._u16(), size=2)
+            else:
+                inst.op2 = Operand(type=OpType.IMM8, disp=dec._u8(), size=1)
+    return handler
+
+
+def _op_grp4(dec, inst, seg_override, opcode):
+    reg, rm, grp_op = dec._decode_modrm(False, seg_override)
+    inst.mnemonic = GRP4_NAMES[grp_op]
+    inst.op1 = rm
+
+
+def _op_grp5(dec, inst, seg_override, opcode):
+    reg, rm, grp_op = dec._decode_modrm(True, seg_override)
+    inst.mnemonic = GRP5_NAMES[grp_op]
+    inst.op1 = rm
+
+
+def _build_handlers():
+    """Build the 256-entry opcode dispatch table."""
+    h = [_op_db] * 256
+
+    # ALU block: subcodes 0-3 are the ModR/M forms (bit 0 = wide,
+    # bit 1 = reg-first), 4-5 the accumulator-immediate forms; 6-7
+    # belong to the interleaved PUSH/POP sreg and DAA/DAS/AAA/AAS
+    # opcodes below
+    for op in range(0x40):
+        sub = op & 7
+        if sub > 5:
+            continue
+        mnem = ALU_NAMES[op >> 3]
+        if sub <= 3:
+            h[op] = _op_rm_reg(mnem, bool(sub & 1), sub >= 2)
+        else:
+            h[op] = _op_acc_imm(mnem, sub == 5)
+    for op in (0x06, 0x0E, 0x16, 0x1E):
+        h[op] = _op_sreg('push')
+    for op in (0x07, 0x17, 0x1F):
+        h[op] = _op_sreg('pop')
+
+    for op, name in ((0x27, 'daa'), (0x2F, 'das'), (0x37, 'aaa'), (0x3F, 'aas'),
+                     (0x60, 'pusha'), (0x61, 'popa'),
+                     (0x90, 'nop'), (0x98, 'cbw'), (0x99, 'cwd'), (0x9B, 'wait'),
+                     (0x9C, 'pushf'), (0x9D, 'popf'), (0x9E, 'sahf'), (0x9F, 'lahf'),
+                     (0xA4, 'movsb'), (0xA5, 'movsw'),
+                     (0xA6, 'cmpsb'), (0xA7, 'cmpsw'),
+                     (0xAA, 'stosb'), (0xAB, 'stosw'),
+                     (0xAC, 'lodsb'), (0xAD, 'lodsw'),
+                     (0xAE, 'scasb'), (0xAF, 'scasw'),
+                     (0xC3, 'ret'), (0xC9, 'leave'), (0xCB, 'retf'),
+                     (0xCE, 'into'), (0xCF, 'iret'), (0xD7, 'xlat'),
+                     (0xF4, 'hlt'), (0xF5, 'cmc'),
+                     (0xF8, 'clc'), (0xF9, 'stc'), (0xFA, 'cli'), (0xFB, 'sti'),
+                     (0xFC, 'cld'), (0xFD, 'std')):
+        h[op] = _op_mnem(name)
+
+    for mnem, base in (('inc', 0x40), ('dec', 0x48), ('push', 0x50), ('pop', 0x58)):
+        handler = _op_reg16(mnem)
+        for op in range(base, base + 8):
+            h[op] = handler
+
+    h[0x68] = _op_push_imm(True)
+    h[0x69] = _op_imul_imm(True)
+    h[0x6A] = _op_push_imm(False)
+    h[0x6B] = _op_imul_imm(False)
+
+    for i, cc in enumerate(CC_NAMES):
+        h[0x70 + i] = _op_jcc_short(cc)
+    h[0x80] = _op_grp1(False, False)
+    h[0x81] = _op_grp1(True, False)
+    h[0x82] = _op_grp1(False, True)
+    h[0x83] = _op_grp1(True, True)
+
+    h[0x84] = _op_rm_reg('test', False, False)
+    h[0x85] = _op_rm_reg('test', True, False)
+    h[0x86] = _op_rm_reg('xchg', False, False)
+    h[0x87] = _op_rm_reg('xchg', True, False)
+    h[0x88] = _op_rm_reg('mov', False, False)
+    h[0x89] = _op_rm_reg('mov', True, False)
+    h[0x8A] = _op_rm_reg('mov', False, True)
+    h[0x8B] = _op_rm_reg('mov', True, True)
+    h[0x8C] = _op_mov_rm_sreg
+    h[0x8D] = _op_load('lea')
+    h[0x8E] = _op_mov_sreg_rm
+    h[0x8F] = _op_pop_rm
+
+    for op in range(0x91, 0x98):
+        h[op] = _op_xchg_ax_reg
+    h[0x9A] = _op_far('call')
+
+    h[0xA0] = _op_mov_moffs(False, False)
+    h[0xA1] = _op_mov_moffs(True, False)
+    h[0xA2] = _op_mov_moffs(False, True)
+    h[0xA3] = _op_mov_moffs(True, True)
+    h[0xA8] = _op_acc_imm('test', False)
+    h[0xA9] = _op_acc_imm('test', True)
+
+    for op in range(0xB0, 0xB8):
+        h[op] = _op_mov_reg8_imm
+    for op in range(0xB8, 0xC0):
+        h[op] = _op_mov_reg16_imm
+
+    h[0xC0] = _op_shift_imm(False)
+    h[0xC1] = _op_shift_imm(True)
+    h[0xC2] = _op_ret_imm('ret')
+    h[0xC4] = _op_load('les')
+    h[0xC5] = _op_load('lds')
+    h[0xC6] = _op_mov_rm_imm(False)
+    h[0xC7] = _op_mov_rm_imm(True)
+    h[0xC8] = _op_enter
+    h[0xCA] = _op_ret_imm('retf')
+    h[0xCC] = _op_int3
+    h[0xCD] = _op_int
+
+    h[0xD0] = _op_shift(False, False)
+    h[0xD1] = _op_shift(True, False)
+    h[0xD2] = _op_shift(False, True)
+    h[0xD3] = _op_shift(True, True)
+    h[0xD4] = _op_base_byte('aam')
+    h[0xD5] = _op_base_byte('aad')
+    for op in range(0xD8, 0xE0):
+        h[op] = _op_esc
+
+    h[0xE0] = _op_rel8('loopnz')
+    h[0xE1] = _op_rel8('loopz')
+    h[0xE2] = _op_rel8('loop')
+    h[0xE3] = _op_rel8('jcxz')
+    h[0xE4] = _op_in(False, False)
+    h[0xE5] = _op_in(True, False)
+    h[0xE6] = _op_out(False, False)
+    h[0xE7] = _op_out(True, False)
+    h[0xE8] = _op_rel16('call')
+    h[0xE9] = _op_rel16('jmp')
+    h[0xEA] = _op_far('jmp')
+    h[0xEB] = _op_rel8('jmp')
+    h[0xEC] = _op_in(False, True)
+    h[0xED] = _op_in(True, True)
+    h[0xEE] = _op_out(False, True)
+    h[0xEF] = _op_out(True, True)
+
+    h[0xF6] = _op_grp3(False)
+    h[0xF7] = _op_grp3(True)
+    h[0xFE] = _op_grp4
+    h[0xFF] = _op_grp5
+    return h
+
+
+_HANDLERS = _build_handlers()
+
+
 # ─── Decoder ─────────────────────────────────────────────────────
 
 class Decoder:
@@ -121,8 +813,19 @@ class Decoder:
 
     def __init__(self, data: bytes, base_offset: int = 0):
         self.data = data
+        self.size = len(data)
         self.base = base_offset
         self.pos = 0
+        # Buffer-relative targets of every rel8/rel16 jump decoded so
+        # far (jmp/jcc/loop/jcxz, not call). Filled as a side effect of
+        # decoding so the lifter gets its goto labels without a second
+        # pass over the instruction list.
+        self.branch_targets = set()
+        # 1-entry dispatch inline cache: real code repeats the same
+        # opcode in runs (mov/push/call blocks), so remembering the
+        # last opcode's handler skips the table lookup on a hit
+        self._last_opcode = -1
+        self._last_handler = None
 
     def _u8(self) -> int:
         b = self.data[self.pos]
@@ -135,647 +838,286 @@ class Decoder:
         return b if b < 128 else b - 256
 
     def _u16(self) -> int:
-        lo = self.data[self.pos]
-        hi = self.data[self.pos + 1]
+        v = _unpack_u16(self.data, self.pos)[0]
         self.pos += 2
-        return lo | (hi << 8)
+        return v
 
     def _s16(self) -> int:
-        v = self._u16()
-        return v if v < 32768 else v - 65536
-
-    def _decode_modrm(self, wide: bool, seg_override: str = '') -> tuple:
-        """Decode ModR/M byte. Returns (reg_operand, rm_operand)."""
-        modrm = self._u8()
+        v = _unpack_s16(self.data, self.pos)[0]
+        self.pos += 2
+        return v
+
+    def _decode_modrm(self, wide: bool, seg_override: str = '',
+                      _mem=_MODRM_MEM, _reg8=REG8_OPS, _reg16=REG16_OPS,
+                      _s16=_unpack_s16, _u16=_unpack_u16) -> tuple:
+        """Decode ModR/M byte. Returns (reg_operand, rm_operand).
+
+        The trailing defaults bind the lookup tables as locals at
+        definition time so the hot path runs on LOAD_FAST instead of
+        module-global lookups; callers never pass them.
+        """
+        # Work on locals; self.pos is written back exactly once
+        data = self.data
+        pos = self.pos
+        modrm = data[pos]
+        pos += 1
         mod = (modrm >> 6) & 3
         reg = (modrm >> 3) & 7
         rm  = modrm & 7
 
         if wide:
-            reg_op = Operand(type=OpType.REG16, reg=reg, size=2)
+            reg_op = _reg16[reg]
         else:
-            reg_op = Operand(type=OpType.REG8, reg=reg, size=1)
+            reg_op = _reg8[reg]
 
         if mod == 3:
             # Register direct
             if wide:
-                rm_op = Operand(type=OpType.REG16, reg=rm, size=2)
+                rm_op = _reg16[rm]
             else:
-                rm_op = Operand(type=OpType.REG8, reg=rm, size=1)
+                rm_op = _reg8[rm]
         else:
             # Memory
-            base_r, idx_r = EA_BASES[rm]
-            disp = 0
-            seg = seg_override
-
-            if mod == 0 and rm == 6:
-                # Special: [disp16]
-                disp = self._u16()
-                base_r = ''
-                idx_r = None
-                if not seg: seg = 'ds'
-            elif mod == 1:
-                disp = self._s8()
-            elif mod == 2:
-                disp = self._s16()
-
-            if not seg:
-                seg = EA_DEFAULT_SEG[rm] if not (mod == 0 and rm == 6) else 'ds'
+            base_r, idx_r, dseg, dw = _mem[mod * 8 + rm]
+            if dw == 0:
+                disp = 0
+            elif dw == 1:
+                disp = data[pos]
+                pos += 1
+                if disp >= 128:
+                    disp -= 256
+            elif dw == 2:
+                disp = _s16(data, pos)[0]
+                pos += 2
+            else:       # direct [disp16]
+                disp = _u16(data, pos)[0]
+                pos += 2
 
             rm_op = Operand(
                 type=OpType.MEM,
                 base=base_r,
-                index=idx_r or '',
+                index=idx_r,
                 disp=disp,
-                seg=seg,
+                seg=seg_override or dseg,
                 size=2 if wide else 1,
             )
 
+        self.pos = pos
         return reg_op, rm_op, reg
 
     def _safe(self, n: int = 1) -> bool:
         """Check if n bytes remain."""
-        return self.pos + n <= len(self.data)
-
-    def decode_one(self) -> Optional[Instruction]:
-        """Decode a single instruction at the current position."""
-        if self.pos >= len(self.data):
+        return self.pos + n <= self.size
+
+    def decode_one(self, _Instruction=Instruction,
+                   _prefix_table=PREFIX_TABLE,
+                   _handlers=_HANDLERS) -> Optional[Instruction]:
+        """Decode a single instruction at the current position.
+
+        As in _decode_modrm, the trailing defaults pre-bind the
+        dispatch tables as locals; callers never pass them.
+        """
+        # Alias the hot attributes to locals; self.pos is written back
+        # once before the handler runs
+        data = self.data
+        size = self.size
+        pos = self.pos
+        if pos >= size:
             return None
 
-        inst = Instruction()
-        inst.offset = self.base + self.pos
-        inst.address = self.pos
-        start = self.pos
+        inst = _Instruction()
+        inst.offset = self.base + pos
+        inst.address = pos
+        start = pos
 
         # Handle prefixes
         seg_override = ''
         rep_prefix = ''
-        while self.pos < len(self.data):
-            b = self.data[self.pos]
-            if b == 0x26:
-                seg_override = 'es'; self.pos += 1
-            elif b == 0x2E:
-                seg_override = 'cs'; self.pos += 1
-            elif b == 0x36:
-                seg_override = 'ss'; self.pos += 1
-            elif b == 0x3E:
-                seg_override = 'ds'; self.pos += 1
-            elif b == 0xF2:
-                rep_prefix = 'repnz'; self.pos += 1
-            elif b == 0xF3:
-                rep_prefix = 'rep'; self.pos += 1
-            elif b == 0xF0:
-                self.pos += 1  # LOCK prefix (ignore)
-            else:
+        while pos < size:
+            kind, name = _prefix_table[data[pos]]
+            if kind == 0:
                 break
+            if kind == 1:
+                seg_override = name
+            elif kind == 2:
+                rep_prefix = name
+            # kind 3 (LOCK) is consumed and ignored
+            pos += 1
 
         inst.seg_override = seg_override
         inst.prefix = rep_prefix
 
-        if self.pos >= len(self.data):
+        if pos >= size:
+            self.pos = pos
             return None
 
-        opcode = self._u8()
-
-        # ─── Main opcode decode ───
-
-        # ALU ops: ADD, OR, ADC, SBB, AND, SUB, XOR, CMP
-        # Pattern: 0x00-0x3F (groups of 8, 6 encodings each)
-        ALU_NAMES = ['add', 'or', 'adc', 'sbb', 'and', 'sub', 'xor', 'cmp']
-        alu_group = opcode >> 3
-        alu_sub = opcode & 7
-
-        if opcode <= 0x3F and alu_sub <= 5 and alu_group < 8:
-            mnem = ALU_NAMES[alu_group]
-            inst.mnemonic = mnem
-            if alu_sub == 0:    # r/m8, reg8
-                reg, rm, _ = self._decode_modrm(False, seg_override)
-                inst.op1 = rm; inst.op2 = reg
-            elif alu_sub == 1:  # r/m16, reg16
-                reg, rm, _ = self._decode_modrm(True, seg_override)
-                inst.op1 = rm; inst.op2 = reg
-            elif alu_sub == 2:  # reg8, r/m8
-                reg, rm, _ = self._decode_modrm(False, seg_override)
-                inst.op1 = reg; inst.op2 = rm
-            elif alu_sub == 3:  # reg16, r/m16
-                reg, rm, _ = self._decode_modrm(True, seg_override)
-                inst.op1 = reg; inst.op2 = rm
-            elif alu_sub == 4:  # AL, imm8
-                inst.op1 = Operand(type=OpType.REG8, reg=0, size=1)
-                inst.op2 = Operand(type=OpType.IMM8, disp=self._u8(), size=1)
-            elif alu_sub == 5:  # AX, imm16
-                inst.op1 = Operand(type=OpType.REG16, reg=0, size=2)
-                inst.op2 = Operand(type=OpType.IMM16, disp=self._u16(), size=2)
-
-        # PUSH/POP segment registers
-        elif opcode in (0x06, 0x0E, 0x16, 0x1E):
-            sreg = (opcode >> 3) & 3
-            inst.mnemonic = 'push'
-            inst.op1 = Operand(type=OpType.SREG, reg=sreg, size=2)
-        elif opcode in (0x07, 0x17, 0x1F):
-            sreg = (opcode >> 3) & 3
-            inst.mnemonic = 'pop'
-            inst.op1 = Operand(type=OpType.SREG, reg=sreg, size=2)
-
-        # DAA, DAS, AAA, AAS
-        elif opcode == 0x27: inst.mnemonic = 'daa'
-        elif opcode == 0x2F: inst.mnemonic = 'das'
-        elif opcode == 0x37: inst.mnemonic = 'aaa'
-        elif opcode == 0x3F: inst.mnemonic = 'aas'
-
-        # INC reg16 (0x40-0x47)
-        elif 0x40 <= opcode <= 0x47:
-            inst.mnemonic = 'inc'
-            inst.op1 = Operand(type=OpType.REG16, reg=opcode - 0x40, size=2)
-
-        # DEC reg16 (0x48-0x4F)
-        elif 0x48 <= opcode <= 0x4F:
-            inst.mnemonic = 'dec'
-            inst.op1 = Operand(type=OpType.REG16, reg=opcode - 0x48, size=2)
-
-        # PUSH reg16 (0x50-0x57)
-        elif 0x50 <= opcode <= 0x57:
-            inst.mnemonic = 'push'
-            inst.op1 = Operand(type=OpType.REG16, reg=opcode - 0x50, size=2)
-
-        # POP reg16 (0x58-0x5F)
-        elif 0x58 <= opcode <= 0x5F:
-            inst.mnemonic = 'pop'
-            inst.op1 = Operand(type=OpType.REG16, reg=opcode - 0x58, size=2)
-
-        # PUSHA/POPA (80186+)
-        elif opcode == 0x60: inst.mnemonic = 'pusha'
-        elif opcode == 0x61: inst.mnemonic = 'popa'
-
-        # PUSH imm16 (80186+)
-        elif opcode == 0x68:
-            inst.mnemonic = 'push'
-            inst.op1 = Operand(type=OpType.IMM16, disp=self._u16(), size=2)
-
-        # IMUL r16, r/m16, imm16 (80186+)
-        elif opcode == 0x69:
-            reg, rm, rn = self._decode_modrm(True, seg_override)
-            inst.mnemonic = 'imul'
-            inst.op1 = reg
-            inst.op2 = Operand(type=OpType.IMM16, disp=self._u16(), size=2)
-
-        # PUSH imm8 (sign-extended to 16) (80186+)
-        elif opcode == 0x6A:
-            inst.mnemonic = 'push'
-            inst.op1 = Operand(type=OpType.IMM8, disp=self._s8() & 0xFFFF, size=2)
-
-        # IMUL r16, r/m16, imm8 (80186+)
-        elif opcode == 0x6B:
-            reg, rm, rn = self._decode_modrm(True, seg_override)
-            inst.mnemonic = 'imul'
-            inst.op1 = reg
-            inst.op2 = Operand(type=OpType.IMM8, disp=self._s8() & 0xFFFF, size=2)
-
-        # Jcc short (0x70-0x7F)
-        elif 0x70 <= opcode <= 0x7F:
-            CC_NAMES = ['jo','jno','jb','jae','je','jne','jbe','ja',
-                        'js','jns','jp','jnp','jl','jge','jle','jg']
-            inst.mnemonic = CC_NAMES[opcode - 0x70]
-            rel = self._s8()
-            target = self.pos + rel
-            inst.op1 = Operand(type=OpType.REL8, disp=target, size=2)
-
-        # Group 1: ALU r/m, imm
-        elif opcode in (0x80, 0x81, 0x82, 0x83):
-            wide = opcode in (0x81, 0x83)
-            sign_ext = opcode in (0x82, 0x83)
-            reg, rm, alu_op = self._decode_modrm(wide, seg_override)
-            inst.mnemonic = ALU_NAMES[alu_op]
-            inst.op1 = rm
-            if sign_ext and wide:
-                inst.op2 = Operand(type=OpType.IMM8, disp=self._s8() & 0xFFFF, size=2)
-            elif wide:
-                inst.op2 = Operand(type=OpType.IMM16, disp=self._u16(), size=2)
-            else:
-                inst.op2 = Operand(type=OpType.IMM8, disp=self._u8(), size=1)
-
-        # TEST r/m, reg
-        elif opcode == 0x84:
-            reg, rm, _ = self._decode_modrm(False, seg_override)
-            inst.mnemonic = 'test'; inst.op1 = rm; inst.op2 = reg
-        elif opcode == 0x85:
-            reg, rm, _ = self._decode_modrm(True, seg_override)
-            inst.mnemonic = 'test'; inst.op1 = rm; inst.op2 = reg
-
-        # XCHG r/m, reg
-        elif opcode == 0x86:
-            reg, rm, _ = self._decode_modrm(False, seg_override)
-            inst.mnemonic = 'xchg'; inst.op1 = rm; inst.op2 = reg
-        elif opcode == 0x87:
-            reg, rm, _ = self._decode_modrm(True, seg_override)
-            inst.mnemonic = 'xchg'; inst.op1 = rm; inst.op2 = reg
-
-        # MOV r/m, reg and MOV reg, r/m
-        elif opcode == 0x88:
-            reg, rm, _ = self._decode_modrm(False, seg_override)
-            inst.mnemonic = 'mov'; inst.op1 = rm; inst.op2 = reg
-        elif opcode == 0x89:
-            reg, rm, _ = self._decode_modrm(True, seg_override)
-            inst.mnemonic = 'mov'; inst.op1 = rm; inst.op2 = reg
-        elif opcode == 0x8A:
-            reg, rm, _ = self._decode_modrm(False, seg_override)
-            inst.mnemonic = 'mov'; inst.op1 = reg; inst.op2 = rm
-        elif opcode == 0x8B:
-            reg, rm, _ = self._decode_modrm(True, seg_override)
-            inst.mnemonic = 'mov'; inst.op1 = reg; inst.op2 = rm
-
-        # MOV r/m16, sreg
-        elif opcode == 0x8C:
-            reg, rm, rn = self._decode_modrm(True, seg_override)
-            inst.mnemonic = 'mov'
-            inst.op1 = rm
-            inst.op2 = Operand(type=OpType.SREG, reg=rn & 3, size=2)
-
-        # LEA reg16, m
-        elif opcode == 0x8D:
-            reg, rm, _ = self._decode_modrm(True, seg_override)
-            inst.mnemonic = 'lea'; inst.op1 = reg; inst.op2 = rm
-
-        # MOV sreg, r/m16
-        elif opcode == 0x8E:
-            reg, rm, rn = self._decode_modrm(True, seg_override)
-            inst.mnemonic = 'mov'
-            inst.op1 = Operand(type=OpType.SREG, reg=rn & 3, size=2)
-            inst.op2 = rm
-
-        # POP r/m16
-        elif opcode == 0x8F:
-            _, rm, _ = self._decode_modrm(True, seg_override)
-            inst.mnemonic = 'pop'; inst.op1 = rm
-
-        # NOP (XCHG AX, AX)
-        elif opcode == 0x90:
-            inst.mnemonic = 'nop'
-
-        # XCHG AX, reg16
-        elif 0x91 <= opcode <= 0x97:
-            inst.mnemonic = 'xchg'
-            inst.op1 = Operand(type=OpType.REG16, reg=0, size=2)
-            inst.op2 = Operand(type=OpType.REG16, reg=opcode - 0x90, size=2)
-
-        # CBW, CWD
-        elif opcode == 0x98: inst.mnemonic = 'cbw'
-        elif opcode == 0x99: inst.mnemonic = 'cwd'
-
-        # CALL far ptr
-        elif opcode == 0x9A:
-            off = self._u16()
-            seg = self._u16()
-            inst.mnemonic = 'call'
-            inst.op1 = Operand(type=OpType.FAR, disp=off, far_seg=seg, size=4)
-
-        # PUSHF, POPF
-        elif opcode == 0x9C: inst.mnemonic = 'pushf'
-        elif opcode == 0x9D: inst.mnemonic = 'popf'
-
-        # SAHF, LAHF
-        elif opcode == 0x9E: inst.mnemonic = 'sahf'
-        elif opcode == 0x9F: inst.mnemonic = 'lahf'
-
-        # MOV AL/AX, moffs
-        elif opcode == 0xA0:
-            inst.mnemonic = 'mov'
-            inst.op1 = Operand(type=OpType.REG8, reg=0, size=1)
-            inst.op2 = Operand(type=OpType.MOFFS, disp=self._u16(), seg=seg_override or 'ds', size=1)
-        elif opcode == 0xA1:
-            inst.mnemonic = 'mov'
-            inst.op1 = Operand(type=OpType.REG16, reg=0, size=2)
-            inst.op2 = Operand(type=OpType.MOFFS, disp=self._u16(), seg=seg_override or 'ds', size=2)
-
-        # MOV moffs, AL/AX
-        elif opcode == 0xA2:
-            inst.mnemonic = 'mov'
-            inst.op1 = Operand(type=OpType.MOFFS, disp=self._u16(), seg=seg_override or 'ds', size=1)
-            inst.op2 = Operand(type=OpType.REG8, reg=0, size=1)
-        elif opcode == 0xA3:
-            inst.mnemonic = 'mov'
-            inst.op1 = Operand(type=OpType.MOFFS, disp=self._u16(), seg=seg_override or 'ds', size=2)
-            inst.op2 = Operand(type=OpType.REG16, reg=0, size=2)
-
-        # String ops
-        elif opcode == 0xA4: inst.mnemonic = 'movsb'
-        elif opcode == 0xA5: inst.mnemonic = 'movsw'
-        elif opcode == 0xA6: inst.mnemonic = 'cmpsb'
-        elif opcode == 0xA7: inst.mnemonic = 'cmpsw'
-
-        # TEST AL/AX, imm
-        elif opcode == 0xA8:
-            inst.mnemonic = 'test'
-            inst.op1 = Operand(type=OpType.REG8, reg=0, size=1)
-            inst.op2 = Operand(type=OpType.IMM8, disp=self._u8(), size=1)
-        elif opcode == 0xA9:
-            inst.mnemonic = 'test'
-            inst.op1 = Operand(type=OpType.REG16, reg=0, size=2)
-            inst.op2 = Operand(type=OpType.IMM16, disp=self._u16(), size=2)
-
-        # STOSB, STOSW, LODSB, LODSW, SCASB, SCASW
-        elif opcode == 0xAA: inst.mnemonic = 'stosb'
-        elif opcode == 0xAB: inst.mnemonic = 'stosw'
-        elif opcode == 0xAC: inst.mnemonic = 'lodsb'
-        elif opcode == 0xAD: inst.mnemonic = 'lodsw'
-        elif opcode == 0xAE: inst.mnemonic = 'scasb'
-        elif opcode == 0xAF: inst.mnemonic = 'scasw'
-
-        # MOV reg8, imm8 (0xB0-0xB7)
-        elif 0xB0 <= opcode <= 0xB7:
-            inst.mnemonic = 'mov'
-            inst.op1 = Operand(type=OpType.REG8, reg=opcode - 0xB0, size=1)
-            inst.op2 = Operand(type=OpType.IMM8, disp=self._u8(), size=1)
-
-        # MOV reg16, imm16 (0xB8-0xBF)
-        elif 0xB8 <= opcode <= 0xBF:
-            inst.mnemonic = 'mov'
-            inst.op1 = Operand(type=OpType.REG16, reg=opcode - 0xB8, size=2)
-            inst.op2 = Operand(type=OpType.IMM16, disp=self._u16(), size=2)
-
-        # Shift group (0xC0/0xC1 = shift r/m, imm8) (80186+)
-        elif opcode in (0xC0, 0xC1):
-            wide = opcode == 0xC1
-            reg, rm, shift_op = self._decode_modrm(wide, seg_override)
-            SHIFT_NAMES = ['rol','ror','rcl','rcr','shl','shr','sal','sar']
-            inst.mnemonic = SHIFT_NAMES[shift_op]
-            inst.op1 = rm
-            inst.op2 = Operand(type=OpType.IMM8, disp=self._u8(), size=1)
-
-        # RET near imm16
-        elif opcode == 0xC2:
-            inst.mnemonic = 'ret'
-            inst.op1 = Operand(type=OpType.IMM16, disp=self._u16(), size=2)
-
-        # RET near
-        elif opcode == 0xC3:
-            inst.mnemonic = 'ret'
-
-        # LES reg16, m
-        elif opcode == 0xC4:
-            reg, rm, _ = self._decode_modrm(True, seg_override)
-            inst.mnemonic = 'les'; inst.op1 = reg; inst.op2 = rm
-
-        # LDS reg16, m
-        elif opcode == 0xC5:
-            reg, rm, _ = self._decode_modrm(True, seg_override)
-            inst.mnemonic = 'lds'; inst.op1 = reg; inst.op2 = rm
-
-        # MOV r/m8, imm8
-        elif opcode == 0xC6:
-            _, rm, _ = self._decode_modrm(False, seg_override)
-            inst.mnemonic = 'mov'
-            inst.op1 = rm
-            inst.op2 = Operand(type=OpType.IMM8, disp=self._u8(), size=1)
-
-        # MOV r/m16, imm16
-        elif opcode == 0xC7:
-            _, rm, _ = self._decode_modrm(True, seg_override)
-            inst.mnemonic = 'mov'
-            inst.op1 = rm
-            inst.op2 = Operand(type=OpType.IMM16, disp=self._u16(), size=2)
-
-        # ENTER (80186+)
-        elif opcode == 0xC8:
-            size = self._u16()
-            level = self._u8()
-            inst.mnemonic = 'enter'
-            inst.op1 = Operand(type=OpType.IMM16, disp=size, size=2)
-            inst.op2 = Operand(type=OpType.IMM8, disp=level, size=1)
-
-        # LEAVE (80186+)
-        elif opcode == 0xC9:
-            inst.mnemonic = 'leave'
-
-        # RETF imm16
-        elif opcode == 0xCA:
-            inst.mnemonic = 'retf'
-            inst.op1 = Operand(type=OpType.IMM16, disp=self._u16(), size=2)
-
-        # RETF
-        elif opcode == 0xCB:
-            inst.mnemonic = 'retf'
-
-        # INT 3
-        elif opcode == 0xCC:
-            inst.mnemonic = 'int'
-            inst.op1 = Operand(type=OpType.IMM8, disp=3, size=1)
-
-        # INT imm8
-        elif opcode == 0xCD:
-            int_num = self._u8()
-            inst.mnemonic = 'int'
-            inst.op1 = Operand(type=OpType.IMM8, disp=int_num, size=1)
-
-            # Special: MSC overlay call (INT 3Fh)
-            if int_num == 0x3F and self.pos + 2 < len(self.data):
-                inst.overlay_num = self._u8()
-                inst.overlay_off = self._u16()
-
-        # INTO
-        elif opcode == 0xCE: inst.mnemonic = 'into'
-
-        # IRET
-        elif opcode == 0xCF: inst.mnemonic = 'iret'
-
-        # Shift group (0xD0-0xD3)
-        elif opcode in (0xD0, 0xD1, 0xD2, 0xD3):
-            wide = opcode in (0xD1, 0xD3)
-            by_cl = opcode in (0xD2, 0xD3)
-            reg, rm, shift_op = self._decode_modrm(wide, seg_override)
-            SHIFT_NAMES = ['rol','ror','rcl','rcr','shl','shr','sal','sar']
-            inst.mnemonic = SHIFT_NAMES[shift_op]
-            inst.op1 = rm
-            if by_cl:
-                inst.op2 = Operand(type=OpType.REG8, reg=1, size=1)  # CL
-            else:
-                inst.op2 = Operand(type=OpType.IMM8, disp=1, size=1)
-
-        # AAM, AAD
-        elif opcode == 0xD4:
-            inst.mnemonic = 'aam'
-            self._u8()  # base (usually 0x0A)
-        elif opcode == 0xD5:
-            inst.mnemonic = 'aad'
-            self._u8()  # base
-
-        # XLAT
-        elif opcode == 0xD7: inst.mnemonic = 'xlat'
-
-        # ESC (FPU) - 0xD8-0xDF - read ModR/M and skip
-        elif 0xD8 <= opcode <= 0xDF:
-            self._decode_modrm(False, seg_override)
-            inst.mnemonic = f'esc_{opcode - 0xD8}'
-
-        # LOOPNZ, LOOPZ, LOOP, JCXZ
-        elif opcode == 0xE0:
-            inst.mnemonic = 'loopnz'
-            rel = self._s8()
-            inst.op1 = Operand(type=OpType.REL8, disp=self.pos + rel, size=2)
-        elif opcode == 0xE1:
-            inst.mnemonic = 'loopz'
-            rel = self._s8()
-            inst.op1 = Operand(type=OpType.REL8, disp=self.pos + rel, size=2)
-        elif opcode == 0xE2:
-            inst.mnemonic = 'loop'
-            rel = self._s8()
-            inst.op1 = Operand(type=OpType.REL8, disp=self.pos + rel, size=2)
-        elif opcode == 0xE3:
-            inst.mnemonic = 'jcxz'
-            rel = self._s8()
-            inst.op1 = Operand(type=OpType.REL8, disp=self.pos + rel, size=2)
-
-        # IN AL/AX, imm8
-        elif opcode == 0xE4:
-            inst.mnemonic = 'in'
-            inst.op1 = Operand(type=OpType.REG8, reg=0, size=1)
-            inst.op2 = Operand(type=OpType.IMM8, disp=self._u8(), size=1)
-        elif opcode == 0xE5:
-            inst.mnemonic = 'in'
-            inst.op1 = Operand(type=OpType.REG16, reg=0, size=2)
-            inst.op2 = Operand(type=OpType.IMM8, disp=self._u8(), size=1)
-
-        # OUT imm8, AL/AX
-        elif opcode == 0xE6:
-            inst.mnemonic = 'out'
-            inst.op1 = Operand(type=OpType.IMM8, disp=self._u8(), size=1)
-            inst.op2 = Operand(type=OpType.REG8, reg=0, size=1)
-        elif opcode == 0xE7:
-            inst.mnemonic = 'out'
-            inst.op1 = Operand(type=OpType.IMM8, disp=self._u8(), size=1)
-            inst.op2 = Operand(type=OpType.REG16, reg=0, size=2)
-
-        # CALL rel16
-        elif opcode == 0xE8:
-            rel = self._s16()
-            target = self.pos + rel  # offset relative to function start (no 16-bit mask)
-            inst.mnemonic = 'call'
-            inst.op1 = Operand(type=OpType.REL16, disp=target, size=2)
-
-        # JMP rel16
-        elif opcode == 0xE9:
-            rel = self._s16()
-            target = self.pos + rel  # offset relative to function start (no 16-bit mask)
-            inst.mnemonic = 'jmp'
-            inst.op1 = Operand(type=OpType.REL16, disp=target, size=2)
-
-        # JMP far
-        elif opcode == 0xEA:
-            off = self._u16()
-            seg = self._u16()
-            inst.mnemonic = 'jmp'
-            inst.op1 = Operand(type=OpType.FAR, disp=off, far_seg=seg, size=4)
-
-        # JMP rel8
-        elif opcode == 0xEB:
-            rel = self._s8()
-            target = self.pos + rel
-            inst.mnemonic = 'jmp'
-            inst.op1 = Operand(type=OpType.REL8, disp=target, size=2)
-
-        # IN AL/AX, DX
-        elif opcode == 0xEC:
-            inst.mnemonic = 'in'
-            inst.op1 = Operand(type=OpType.REG8, reg=0, size=1)
-            inst.op2 = Operand(type=OpType.REG16, reg=2, size=2)
-        elif opcode == 0xED:
-            inst.mnemonic = 'in'
-            inst.op1 = Operand(type=OpType.REG16, reg=0, size=2)
-            inst.op2 = Operand(type=OpType.REG16, reg=2, size=2)
-
-        # OUT DX, AL/AX
-        elif opcode == 0xEE:
-            inst.mnemonic = 'out'
-            inst.op1 = Operand(type=OpType.REG16, reg=2, size=2)
-            inst.op2 = Operand(type=OpType.REG8, reg=0, size=1)
-        elif opcode == 0xEF:
-            inst.mnemonic = 'out'
-            inst.op1 = Operand(type=OpType.REG16, reg=2, size=2)
-            inst.op2 = Operand(type=OpType.REG16, reg=0, size=2)
-
-        # HLT
-        elif opcode == 0xF4: inst.mnemonic = 'hlt'
-
-        # CMC
-        elif opcode == 0xF5: inst.mnemonic = 'cmc'
-
-        # Group 3: TEST/NOT/NEG/MUL/IMUL/DIV/IDIV
-        elif opcode in (0xF6, 0xF7):
-            wide = opcode == 0xF7
-            reg, rm, grp_op = self._decode_modrm(wide, seg_override)
-            GRP3 = ['test', 'test', 'not', 'neg', 'mul', 'imul', 'div', 'idiv']
-            inst.mnemonic = GRP3[grp_op]
-            inst.op1 = rm
-            if grp_op <= 1:  # TEST r/m, imm
-                if wide:
-                    inst.op2 = Operand(type=OpType.IMM16, disp=self._u16(), size=2)
-                else:
-                    inst.op2 = Operand(type=OpType.IMM8, disp=self._u8(), size=1)
-
-        # CLC, STC, CLI, STI, CLD, STD
-        elif opcode == 0xF8: inst.mnemonic = 'clc'
-        elif opcode == 0xF9: inst.mnemonic = 'stc'
-        elif opcode == 0xFA: inst.mnemonic = 'cli'
-        elif opcode == 0xFB: inst.mnemonic = 'sti'
-        elif opcode == 0xFC: inst.mnemonic = 'cld'
-        elif opcode == 0xFD: inst.mnemonic = 'std'
-
-        # Group 4/5: INC/DEC/CALL/JMP/PUSH
-        elif opcode in (0xFE, 0xFF):
-            wide = opcode == 0xFF
-            reg, rm, grp_op = self._decode_modrm(wide, seg_override)
-            if opcode == 0xFE:
-                if grp_op == 0: inst.mnemonic = 'inc'
-                elif grp_op == 1: inst.mnemonic = 'dec'
-                else: inst.mnemonic = f'grp4_{grp_op}'
-                inst.op1 = rm
-            else:
-                GRP5 = ['inc', 'dec', 'call', 'call', 'jmp', 'jmp', 'push', '?']
-                inst.mnemonic = GRP5[grp_op]
-                inst.op1 = rm
-                if grp_op in (3, 5):  # FAR variants
-                    inst.mnemonic += ' far'
-
-        # WAIT
-        elif opcode == 0x9B: inst.mnemonic = 'wait'
-
+        opcode = data[pos]
+        self.pos = pos + 1
+        if opcode == self._last_opcode:
+            handler = self._last_handler
         else:
-            inst.mnemonic = 'db'
-            inst.op1 = Operand(type=OpType.IMM8, disp=opcode, size=1)
+            handler = _handlers[opcode]
+            self._last_opcode = opcode
+            self._last_handler = handler
+        handler(self, inst, seg_override, opcode)
 
         inst.length = self.pos - start
-        inst.raw = self.data[start:self.pos]
+        inst._data = data
+        inst._raw_start = start
+        inst._raw_end = self.pos
         return inst
 
-    def decode_range(self, start: int, end: int):
-        """Decode all instructions in [start, end)."""
+    def iter_range(self, start: int, end: int):
+        """Yield instructions in [start, end) one at a time.
+
+        Lazy counterpart of decode_range: consumers that make a single
+        pass never hold the whole instruction list in memory.
+        """
         self.pos = start
-        instructions = []
         while self.pos < end:
             saved_pos = self.pos
             try:
                 inst = self.decode_one()
-            except (IndexError, KeyError):
+            except (IndexError, KeyError, struct.error):
                 # Decoding failed (truncated instruction, etc.)
                 self.pos = saved_pos
                 inst = Instruction()
                 inst.offset = self.base + self.pos
                 inst.address = self.pos
                 inst.mnemonic = 'db'
-                b = self.data[self.pos] if self.pos < len(self.data) else 0
+                b = self.data[self.pos] if self.pos < self.size else 0
                 inst.op1 = Operand(type=OpType.IMM8, disp=b, size=1)
-                inst.raw = self.data[self.pos:self.pos+1]
+                inst._data = self.data
+                inst._raw_start = self.pos
+                inst._raw_end = self.pos + 1
                 inst.length = 1
                 self.pos += 1
             if inst is None:
                 break
-            instructions.append(inst)
-        return instructions
+            yield inst
+
+    def decode_range(self, start: int, end: int):
+        """Decode all instructions in [start, end)."""
+        return list(self.iter_range(start, end))
 
     def decode_all(self):
         """Decode the entire data buffer."""
         return self.decode_range(0, len(self.data))
 
+    def scan_range(self, start: int, end: int):
+        """Fast structure-of-arrays scan of [start, end).
+
+        Walks instruction boundaries using the precomputed shape tables
+        without building Instruction/Operand objects. Returns three
+        parallel arrays (offsets, opcodes, op_offs): the buffer offset
+        of each instruction, its opcode byte after any prefixes (-1 for
+        a raw data byte emitted by the truncation fallback), and the
+        offset of that opcode byte. Boundaries match decode_range
+        exactly, including the one-byte resync on truncated
+        instructions. Like decode_one, leaves self.pos at the end of
+        the last instruction scanned.
+        """
+        data = self.data
+        n = self.size
+        has_modrm = _HAS_MODRM
+        imm_bytes = _IMM_BYTES
+        prefixes = PREFIX_BYTES
+
+        # Typed arrays instead of lists of boxed ints: an 'i'/'h' entry
+        # is 4/2 bytes vs ~28 for a Python int object, and the result
+        # indexes and iterates the same way for callers.
+        offsets = array('i')
+        opcodes = array('h')
+        op_offs = array('i')
+        add_offset = offsets.append
+        add_opcode = opcodes.append
+        add_op_off = op_offs.append
+
+        pos = start
+        while pos < end:
+            ipos = pos
+            while pos < n and data[pos] in prefixes:
+                pos += 1
+            if pos >= n:
+                # decode_one returns None mid-prefix; decode_range
+                # stops, so the scan ends at the previous boundary
+                pos = ipos
+                break
+
+            opcode = data[pos]
+            opos = pos
+            p = pos + 1
+            ok = True
+
+            if has_modrm[opcode]:
+                if p < n:
+                    m = data[p]
+                    p += 1
+                    mod = m >> 6
+                    if mod == 1:
+                        p += 1
+                    elif mod == 2:
+                        p += 2
+                    elif mod == 0 and (m & 7) == 6:
+                        p += 2
+                    # Group 3: TEST r/m, imm carries an immediate
+                    if opcode == 0xF6 and ((m >> 3) & 7) <= 1:
+                        p += 1
+                    elif opcode == 0xF7 and ((m >> 3) & 7) <= 1:
+                        p += 2
+                else:
+                    ok = False
+
+            p += imm_bytes[opcode]
+
+            # INT imm8: the MSC overlay call (INT 3Fh) carries a 3-byte
+            # payload when enough bytes remain
+            if opcode == 0xCD and p <= n and data[opos + 1] == 0x3F \
+                    and opos + 4 < n:
+                p += 3
+
+            if ok and p <= n:
+                add_offset(ipos)
+                add_opcode(opcode)
+                add_op_off(opos)
+                pos = p
+            else:
+                # Truncated instruction: resync one byte, like decode_range
+                add_offset(ipos)
+                add_opcode(-1)
+                add_op_off(ipos)
+                pos = ipos + 1
+
+        self.pos = pos
+        return offsets, opcodes, op_offs
+
+    def scan_fast(self, start: int, end: int):
+        """scan_range plus per-instruction lengths, as numpy arrays.
+
+        Returns (offsets, lengths, opcodes) - int32/int16/int16 numpy
+        arrays when numpy is available, typed arrays otherwise.
+        Lengths are the gaps between consecutive boundaries (the final
+        instruction ends at the scan stop position), so callers can
+        locate e.g. every CALL or INT with one array comparison and
+        object-decode only those offsets.
+        """
+        offsets, opcodes, op_offs = self.scan_range(start, end)
+        if np is not None:
+            offs = np.asarray(offsets, dtype=np.int32)
+            ops = np.asarray(opcodes, dtype=np.int16)
+            lengths = np.empty(len(offs), dtype=np.int16)
+            if len(offs):
+                lengths[:-1] = offs[1:] - offs[:-1]
+                lengths[-1] = self.pos - offs[-1]
+            return offs, lengths, ops
+
+        lengths = array('h', bytes(2 * len(offsets)))
+        for k in range(len(offsets) - 1):
+            lengths[k] = offsets[k + 1] - offsets[k]
+        if offsets:
+            lengths[-1] = self.pos - offsets[-1]
+        return offsets, lengths, opcodes
+
 
 # ─── CLI for testing ─────────────────────────────────────────────
 
@@ -795,7 +1137,6 @@ def main():
 
     if '--resident' in sys.argv:
         # Skip MZ header (32 paragraphs = 512 bytes)
-        import struct
         hdr_paras = struct.unpack_from('<H', data, 8)[0]
         start = hdr_paras * 16
         # Calculate image size
@@ -807,13 +1148,22 @@ def main():
     elif '--overlay' in sys.argv:
         idx = sys.argv.index('--overlay')
         ovl_num = int(sys.argv[idx + 1])
-        import struct
         pages = struct.unpack_from('<H', data, 4)[0]
         last_page = struct.unpack_from('<H', data, 2)[0]
         img_size = (pages - 1) * 512 + last_page if last_page else pages * 512
         scan = (img_size + 0x1FF) & ~0x1FF
+        # Overlays always start on a 512-byte boundary, so only every
+        # 0x200th position can hold an MZ signature. With numpy, test
+        # them all in one strided compare and fall through to the
+        # header checks only at actual hits.
+        if np is not None and scan + 28 < len(data):
+            arr = np.frombuffer(data[:len(data) & ~1], dtype='<u2')
+            cand = np.flatnonzero(arr[scan // 2::0x100] == 0x5A4D) * 0x200 + scan
+            candidates = [int(c) for c in cand if c + 28 < len(data)]
+        else:
+            candidates = range(scan, len(data) - 28, 0x200)
         found = 0
-        while scan + 28 < len(data):
+        for scan in candidates:
             if data[scan] == 0x4D and data[scan+1] == 0x5A:
                 op = struct.unpack_from('<H', data, scan + 4)[0]
                 olp = struct.unpack_from('<H', data, scan + 2)[0]
@@ -828,7 +1178,6 @@ def main():
                         print(f"; Overlay {ovl_num}: file offset 0x{scan:X}, "
                               f"code at 0x{start:X}, {length} bytes")
                         break
-            scan += 0x200
         else:
             print(f"Error: overlay {ovl_num} not found")
             sys.exit(1)
@@ -839,16 +1188,19 @@ def main():
             length = int(sys.argv[3], 0)
 
     decoder = Decoder(data[start:start+length], base_offset=start)
-    instructions = decoder.decode_all()
 
-    for inst in instructions:
+    # Stream instructions as they decode instead of materializing the
+    # whole-range list up front
+    count = 0
+    for inst in decoder.iter_range(0, length):
         hex_str = ' '.join(f'{b:02X}' for b in inst.raw[:8])
         ovl_str = ''
         if inst.overlay_num >= 0:
             ovl_str = f'  ; OVL {inst.overlay_num:02X}:{inst.overlay_off:04X}'
         print(f'{inst.offset:06X}  {hex_str:<24s} {inst!r}{ovl_str}')
+        count += 1
 
-    print(f"\n; {len(instructions)} instructions decoded")
+    print(f"\n; {count} instructions decoded")
 
 
 if __name__ == '__main__':
@@ -16,30 +16,123 @@ Generated code style:
 Part of the Civ Recomp project (sp00nznet/civ)
 """
 
-from decode16 import Decoder, Instruction, OpType, Operand, REG8_NAMES, REG16_NAMES, SREG_NAMES
+import io
+import struct
+
+from decode16 import (Decoder, Instruction, OpType, Operand,
+                      REG8_NAMES, REG16_NAMES, SREG_NAMES,
+                      REG8_OPS, REG16_OPS, SREG_OPS, IMM8_ONE)
+
+
+# ─── Flag liveness tables ────────────────────────────────────────────
+#
+# Tracked arithmetic flags, one letter each: Carry, Overflow, Aux,
+# Sign, Zero, Parity. DF/IF/TF are left alone (only cld/std/cli/sti
+# touch them). Mnemonics absent from all three tables are treated as
+# barriers that may read anything.
+
+_FLAGS_ALL = frozenset('COASZP')
+
+_FLAG_READS = {
+    'jo': 'O', 'jno': 'O', 'jb': 'C', 'jae': 'C',
+    'je': 'Z', 'jne': 'Z', 'jbe': 'CZ', 'ja': 'CZ',
+    'js': 'S', 'jns': 'S', 'jp': 'P', 'jnp': 'P',
+    'jl': 'SO', 'jge': 'SO', 'jle': 'ZSO', 'jg': 'ZSO',
+    'adc': 'C', 'sbb': 'C', 'cmc': 'C', 'inc': 'C', 'dec': 'C',
+    'loopz': 'Z', 'loopnz': 'Z',
+    'lahf': 'CASZP', 'pushf': 'COASZP',
+    'aaa': 'A', 'aas': 'A', 'daa': 'CA', 'das': 'CA',
+}
+
+# Control transfers: the target's flag needs are unknown without full
+# dataflow, so these always reset liveness to "everything live"
+# (conditional jumps' own reads are subsumed by that).
+_FLAG_BARRIERS = frozenset((
+    'jmp', 'call', 'ret', 'retf', 'iret', 'int', 'hlt',
+    'loop', 'loopz', 'loopnz', 'jcxz',
+    'jo', 'jno', 'jb', 'jae', 'je', 'jne', 'jbe', 'ja',
+    'js', 'jns', 'jp', 'jnp', 'jl', 'jge', 'jle', 'jg',
+))
+
+_FLAG_WRITES = {
+    'add': 'COASZP', 'sub': 'COASZP', 'cmp': 'COASZP',
+    'adc': 'COASZP', 'sbb': 'COASZP', 'neg': 'COASZP',
+    'cmpsb': 'COASZP', 'cmpsw': 'COASZP', 'scasb': 'COASZP', 'scasw': 'COASZP',
+    'and': 'COSZP', 'or': 'COSZP', 'xor': 'COSZP', 'test': 'COSZP',
+    'shl': 'CSZP', 'sal': 'CSZP', 'shr': 'CSZP', 'sar': 'CSZP',
+    'inc': 'OASZP', 'dec': 'OASZP',
+    'mul': 'CO', 'imul': 'CO',
+    'clc': 'C', 'stc': 'C', 'cmc': 'C',
+    'sahf': 'CASZP', 'popf': 'COASZP',
+}
+
+# Instructions that neither read nor write the tracked flags
+_FLAG_NEUTRAL = frozenset((
+    'mov', 'xchg', 'lea', 'lds', 'les', 'cbw', 'cwd',
+    'push', 'pop', 'pusha', 'popa',
+    'movsb', 'movsw', 'stosb', 'stosw', 'lodsb', 'lodsw',
+    'nop', 'xlat', 'in', 'out', 'enter', 'leave', 'wait',
+    'cld', 'std', 'cli', 'sti',
+    'not', 'div', 'idiv',
+))
+
+_FLAG_READS = {k: frozenset(v) for k, v in _FLAG_READS.items()}
+_FLAG_WRITES = {k: frozenset(v) for k, v in _FLAG_WRITES.items()}
+
+# Condition-code jump mnemonics -> runtime predicate names.
+_CC_MAP = {
+    'jo': 'cc_o', 'jno': 'cc_no', 'jb': 'cc_b', 'jae': 'cc_ae',
+    'je': 'cc_e', 'jne': 'cc_ne', 'jbe': 'cc_be', 'ja': 'cc_a',
+    'js': 'cc_s', 'jns': 'cc_ns', 'jp': 'cc_p', 'jnp': 'cc_np',
+    'jl': 'cc_l', 'jge': 'cc_ge', 'jle': 'cc_le', 'jg': 'cc_g',
+}
+
+
+# Register operands are interned singletons (decode16 hands out one
+# shared Operand per register), so their read expressions and write
+# prefixes can be precomputed once and fetched by identity instead of
+# re-formatted for every instruction.
+_CPU_ = 'cpu->'
+_REG8_C = tuple(_CPU_ + _n for _n in REG8_NAMES)
+_REG16_C = tuple(_CPU_ + _n for _n in REG16_NAMES)
+_SREG_C = tuple(_CPU_ + _n for _n in SREG_NAMES)
+
+_READ_CACHE = {}   # operand -> C read expression
+_WRITE_OPEN = {}   # operand -> 'cpu->xx = (uintN_t)(' write prefix
+for _i, _op in enumerate(REG8_OPS):
+    _READ_CACHE[_op] = _REG8_C[_i]
+    _WRITE_OPEN[_op] = _REG8_C[_i] + ' = (uint8_t)('
+for _i, _op in enumerate(REG16_OPS):
+    _READ_CACHE[_op] = _REG16_C[_i]
+    _WRITE_OPEN[_op] = _REG16_C[_i] + ' = (uint16_t)('
+for _i, _op in enumerate(SREG_OPS):
+    _READ_CACHE[_op] = _SREG_C[_i]
+    _WRITE_OPEN[_op] = _SREG_C[_i] + ' = (uint16_t)('
+_READ_CACHE[IMM8_ONE] = '0x1'
+del _i, _op
 
 
 def _reg8(op: Operand) -> str:
     """Generate C expression for 8-bit register access."""
-    return f'cpu->{REG8_NAMES[op.reg]}'
+    return _REG8_C[op.reg]
 
 def _reg16(op: Operand) -> str:
     """Generate C expression for 16-bit register access."""
-    return f'cpu->{REG16_NAMES[op.reg]}'
+    return _REG16_C[op.reg]
 
 def _sreg(op: Operand) -> str:
     """Generate C expression for segment register access."""
-    return f'cpu->{SREG_NAMES[op.reg]}'
+    return _SREG_C[op.reg]
 
 def _mem_addr(op: Operand) -> tuple:
     """Generate (seg_expr, off_expr) for memory operand."""
-    seg = f'cpu->{op.seg}' if op.seg else 'cpu->ds'
+    seg = _CPU_ + op.seg if op.seg else 'cpu->ds'
 
     parts = []
     if op.base:
-        parts.append(f'cpu->{op.base}')
+        parts.append(_CPU_ + op.base)
     if op.index:
-        parts.append(f'cpu->{op.index}')
+        parts.append(_CPU_ + op.index)
 
     if op.disp:
         if op.disp < 0:
@@ -60,8 +153,15 @@ def _mem_addr(op: Operand) -> tuple:
 
     return seg, off
 
+def _width(op: Operand) -> str:
+    """C size suffix ('8' or '16') for an operand."""
+    return '8' if op.size == 1 or op.type == OpType.REG8 else '16'
+
 def _read(op: Operand) -> str:
     """Generate C expression to read an operand value."""
+    expr = _READ_CACHE.get(op)
+    if expr is not None:
+        return expr
     if op.type == OpType.REG8:
         return _reg8(op)
     elif op.type == OpType.REG16:
@@ -80,6 +180,9 @@ def _read(op: Operand) -> str:
 
 def _write(op: Operand, val: str) -> str:
     """Generate C statement to write a value to an operand."""
+    pre = _WRITE_OPEN.get(op)
+    if pre is not None:
+        return pre + val + ');'
     if op.type == OpType.REG8:
         return f'{_reg8(op)} = (uint8_t)({val});'
     elif op.type == OpType.REG16:
@@ -94,6 +197,10 @@ def _write(op: Operand, val: str) -> str:
             return f'mem_write16(cpu, {seg}, {off}, (uint16_t)({val}));'
     return f'/* write ??? = {val} */;'
 
+# Indent strings indexed by nesting level (rep loops only go one deep,
+# but leave headroom).
+_PADS = tuple('    ' * _i for _i in range(8))
+
 def _label(addr: int, prefix: str = '') -> str:
     """Generate a label name for an address."""
     if prefix:
@@ -101,11 +208,656 @@ def _label(addr: int, prefix: str = '') -> str:
     return f'L_{addr:06X}'
 
 
+# ───────────────────────── Instruction handlers ──────────────────────
+#
+# lift_instruction dispatches through _LIFT_HANDLERS, a mnemonic ->
+# handler dict built once at import time (same scheme as the opcode
+# handler table in decode16.py). Handlers take (lifter, inst, orig,
+# func_start); families that differ only by a name or an operator are
+# produced by small factories so each body exists once.
+
+def _lift_fixed(code):
+    """Factory for instructions whose C body is a fixed string."""
+    def handler(self, inst, orig, func_start):
+        self._emit(code, orig)
+    return handler
+
+# ─── Data movement ───
+
+# Fully-instantiated statements for register-to-register mov, the most
+# common instruction in MSC output. Keyed by the interned operand pair,
+# so the hot path is one dict probe instead of two helper calls plus a
+# string join. Register<->segment movs are included; everything else
+# (memory, immediates) falls through to the generic path.
+_MOV_STMTS = {}
+for _dst in REG16_OPS + SREG_OPS:
+    for _src in REG16_OPS + SREG_OPS:
+        _MOV_STMTS[(_dst, _src)] = _WRITE_OPEN[_dst] + _READ_CACHE[_src] + ');'
+for _dst in REG8_OPS:
+    for _src in REG8_OPS:
+        _MOV_STMTS[(_dst, _src)] = _WRITE_OPEN[_dst] + _READ_CACHE[_src] + ');'
+del _dst, _src
+
+def _lift_mov(self, inst, orig, func_start):
+    stmt = _MOV_STMTS.get((inst.op1, inst.op2))
+    if stmt is None:
+        stmt = _write(inst.op1, _read(inst.op2))
+    self._emit(stmt, orig)
+
+def _lift_xchg(self, inst, orig, func_start):
+    op1, op2 = inst.op1, inst.op2
+    self._emit(f'{{ uint16_t _t = {_read(op1)}; '
+               f'{_write(op1, _read(op2))} '
+               f'{_write(op2, "_t")} }}', orig)
+
+def _lift_lea(self, inst, orig, func_start):
+    # LEA computes effective address without memory access
+    _, off = _mem_addr(inst.op2)
+    self._emit(_write(inst.op1, off), orig)
+
+def _lift_lseg(sreg):
+    """Factory for lds/les: load reg16 and a segment register."""
+    def handler(self, inst, orig, func_start):
+        seg, off = _mem_addr(inst.op2)
+        self._emit(f'{_reg16(inst.op1)} = mem_read16(cpu, {seg}, {off});', orig)
+        self._emit(f'cpu->{sreg} = mem_read16(cpu, {seg}, (uint16_t)({off} + 2));')
+    return handler
+
+# ─── Stack ───
+
+def _lift_push(self, inst, orig, func_start):
+    self._emit(f'push16(cpu, {_read(inst.op1)});', orig)
+
+def _lift_pop(self, inst, orig, func_start):
+    self._emit(_write(inst.op1, 'pop16(cpu)'), orig)
+
+# ─── Arithmetic ───
+
+# Flag constants after `xor reg,reg` / `sub reg,reg`: result 0, so
+# ZF=1, PF=1 (even parity), SF=CF=OF=0; sub additionally clears AF.
+_ZERO_FLAGS_XOR = (' cpu->flags = (cpu->flags & '
+                   '~(FLAG_CF|FLAG_OF|FLAG_SF)) | FLAG_ZF | FLAG_PF;')
+_ZERO_FLAGS_SUB = (' cpu->flags = (cpu->flags & '
+                   '~(FLAG_CF|FLAG_OF|FLAG_AF|FLAG_SF)) | FLAG_ZF | FLAG_PF;')
+
+def _lift_addsub(fn, carry=''):
+    """Factory for add/adc/sub/sbb: flags helper computes the result."""
+    zero_self = fn == 'sub' and not carry
+    sign = '+' if fn == 'add' else '-'
+    def handler(self, inst, orig, func_start):
+        op1, op2 = inst.op1, inst.op2
+        dead = inst.address in self._flags_dead
+        if zero_self and op1 is op2:
+            # sub reg,reg zeroing idiom (register operands are interned,
+            # so identity means same register): constant result & flags
+            tail = '' if dead else _ZERO_FLAGS_SUB
+            self._emit(_write(op1, '0') + tail, orig)
+            return
+        if dead:
+            # The carry term belongs to the second operand, as in the
+            # live path's helper call: sbb is a - (b + cf), not
+            # (a - b) + cf
+            rhs = f'({_read(op2)}{carry})' if carry else _read(op2)
+            self._emit(_write(op1, f'{_read(op1)} {sign} {rhs}'), orig)
+            return
+        sz = _width(op1)
+        self._emit(_write(op1,
+            f'flags_{fn}{sz}(cpu, {_read(op1)}, {_read(op2)}{carry})'), orig)
+    return handler
+
+def _lift_cmp(self, inst, orig, func_start):
+    op1, op2 = inst.op1, inst.op2
+    if inst.address in self._flags_dead:
+        self._emit(f'/* cmp {_read(op1)}, {_read(op2)} - flags never read */',
+                   orig)
+        return
+    self._emit(f'flags_cmp{_width(op1)}(cpu, {_read(op1)}, {_read(op2)});', orig)
+
+def _lift_incdec(fn):
+    """Factory for inc/dec: flags_inc/dec helpers preserve CF internally."""
+    sign = '+' if fn == 'inc' else '-'
+    def handler(self, inst, orig, func_start):
+        op1 = inst.op1
+        if inst.address in self._flags_dead:
+            # No flag consumer, so skip the helper entirely
+            self._emit(_write(op1, f'{_read(op1)} {sign} 1'), orig)
+            return
+        self._emit(_write(op1, f'flags_{fn}{_width(op1)}(cpu, {_read(op1)})'),
+                   orig)
+    return handler
+
+def _lift_neg(self, inst, orig, func_start):
+    op1 = inst.op1
+    if inst.address in self._flags_dead:
+        self._emit(_write(op1, f'0 - {_read(op1)}'), orig)
+        return
+    self._emit(_write(op1, f'flags_sub{_width(op1)}(cpu, 0, {_read(op1)})'), orig)
+
+def _lift_mul(self, inst, orig, func_start):
+    op1 = inst.op1
+    if op1.size == 1 or op1.type == OpType.REG8:
+        self._emit(f'{{ uint16_t _r = (uint16_t)cpu->al * {_read(op1)}; '
+                   f'cpu->ax = _r; '
+                   f'cpu->flags = (cpu->flags & ~(FLAG_CF|FLAG_OF)) | '
+                   f'(_r > 0xFF ? FLAG_CF|FLAG_OF : 0); }}', orig)
+    else:
+        self._emit(f'{{ uint32_t _r = (uint32_t)cpu->ax * {_read(op1)}; '
+                   f'cpu->ax = (uint16_t)_r; cpu->dx = (uint16_t)(_r >> 16); '
+                   f'cpu->flags = (cpu->flags & ~(FLAG_CF|FLAG_OF)) | '
+                   f'(cpu->dx ? FLAG_CF|FLAG_OF : 0); }}', orig)
+
+def _lift_imul(self, inst, orig, func_start):
+    op1 = inst.op1
+    if op1.size == 1 or op1.type == OpType.REG8:
+        self._emit(f'{{ int16_t _r = (int16_t)(int8_t)cpu->al * '
+                   f'(int8_t){_read(op1)}; '
+                   f'cpu->ax = (uint16_t)_r; '
+                   f'cpu->flags = (cpu->flags & ~(FLAG_CF|FLAG_OF)) | '
+                   f'((uint16_t)_r != (uint16_t)(int16_t)(int8_t)_r ? '
+                   f'FLAG_CF|FLAG_OF : 0); }}', orig)
+    else:
+        self._emit(f'{{ int32_t _r = (int32_t)(int16_t)cpu->ax * '
+                   f'(int16_t){_read(op1)}; '
+                   f'cpu->ax = (uint16_t)_r; '
+                   f'cpu->dx = (uint16_t)((uint32_t)_r >> 16); '
+                   f'cpu->flags = (cpu->flags & ~(FLAG_CF|FLAG_OF)) | '
+                   f'((uint32_t)_r != (uint32_t)(int32_t)(int16_t)_r ? '
+                   f'FLAG_CF|FLAG_OF : 0); }}', orig)
+
+def _lift_div(self, inst, orig, func_start):
+    op1 = inst.op1
+    if op1.size == 1 or op1.type == OpType.REG8:
+        self._emit(f'{{ uint16_t _n = cpu->ax; uint8_t _d = {_read(op1)}; '
+                   f'cpu->al = (uint8_t)(_n / _d); '
+                   f'cpu->ah = (uint8_t)(_n % _d); }}', orig)
+    else:
+        self._emit(f'{{ uint32_t _n = ((uint32_t)cpu->dx << 16) | cpu->ax; '
+                   f'uint16_t _d = {_read(op1)}; '
+                   f'cpu->ax = (uint16_t)(_n / _d); '
+                   f'cpu->dx = (uint16_t)(_n % _d); }}', orig)
+
+def _lift_idiv(self, inst, orig, func_start):
+    op1 = inst.op1
+    if op1.size == 1 or op1.type == OpType.REG8:
+        self._emit(f'{{ int16_t _n = (int16_t)cpu->ax; '
+                   f'int8_t _d = (int8_t){_read(op1)}; '
+                   f'cpu->al = (uint8_t)(int8_t)(_n / _d); '
+                   f'cpu->ah = (uint8_t)(int8_t)(_n % _d); }}', orig)
+    else:
+        self._emit(f'{{ int32_t _n = (int32_t)(((uint32_t)cpu->dx << 16) '
+                   f'| cpu->ax); int16_t _d = (int16_t){_read(op1)}; '
+                   f'cpu->ax = (uint16_t)(int16_t)(_n / _d); '
+                   f'cpu->dx = (uint16_t)(int16_t)(_n % _d); }}', orig)
+
+# ─── Logic ───
+
+def _lift_logic(cop):
+    """Factory for and/or/xor: result written back, logic flags set."""
+    zero_self = cop == '^'
+    def handler(self, inst, orig, func_start):
+        op1, op2 = inst.op1, inst.op2
+        dead = inst.address in self._flags_dead
+        if zero_self and op1 is op2:
+            # xor reg,reg zeroing idiom: constant result & flags
+            tail = '' if dead else _ZERO_FLAGS_XOR
+            self._emit(_write(op1, '0') + tail, orig)
+            return
+        val = f'{_read(op1)} {cop} {_read(op2)}'
+        if dead:
+            self._emit(_write(op1, val), orig)
+            return
+        sz = _width(op1)
+        self._emit(f'{{ uint{sz}_t _r = {val}; '
+                   f'flags_logic{sz}(cpu, _r); '
+                   f'{_write(op1, "_r")} }}', orig)
+    return handler
+
+def _lift_test(self, inst, orig, func_start):
+    op1, op2 = inst.op1, inst.op2
+    val = f'{_read(op1)} & {_read(op2)}'
+    if inst.address in self._flags_dead:
+        self._emit(f'/* test {val} - flags never read */', orig)
+        return
+    self._emit(f'flags_logic{_width(op1)}(cpu, {val});', orig)
+
+def _lift_not(self, inst, orig, func_start):
+    self._emit(_write(inst.op1, f'~{_read(inst.op1)}'), orig)
+
+# ─── Shifts ───
+
+def _lift_shl(self, inst, orig, func_start):
+    op1 = inst.op1
+    r = _read(op1)
+    cnt = _read(inst.op2)
+    if inst.address in self._flags_dead:
+        self._emit(_write(op1, f'{r} << {cnt}'), orig)
+        return
+    sz = _width(op1)
+    self._emit(f'{{ uint{sz}_t _v = {r}; uint8_t _c = {cnt}; '
+               f'uint{sz}_t _r = _v << _c; '
+               f'cpu->flags = (cpu->flags & ~FLAG_CF) | '
+               f'((_v >> ({sz} - _c)) & 1 ? FLAG_CF : 0); '
+               f'flags_shift{sz}(cpu, _r); '
+               f'{_write(op1, "_r")} }}', orig)
+
+def _lift_shr(self, inst, orig, func_start):
+    op1 = inst.op1
+    r = _read(op1)
+    cnt = _read(inst.op2)
+    if inst.address in self._flags_dead:
+        self._emit(_write(op1, f'{r} >> {cnt}'), orig)
+        return
+    sz = _width(op1)
+    self._emit(f'{{ uint{sz}_t _v = {r}; uint8_t _c = {cnt}; '
+               f'uint{sz}_t _r = _v >> _c; '
+               f'cpu->flags = (cpu->flags & ~FLAG_CF) | '
+               f'((_v >> (_c - 1)) & 1 ? FLAG_CF : 0); '
+               f'flags_shift{sz}(cpu, _r); '
+               f'{_write(op1, "_r")} }}', orig)
+
+def _lift_sar(self, inst, orig, func_start):
+    op1 = inst.op1
+    r = _read(op1)
+    cnt = _read(inst.op2)
+    sz = _width(op1)
+    stype = 'int8_t' if sz == '8' else 'int16_t'
+    if inst.address in self._flags_dead:
+        self._emit(_write(op1, f'({stype}){r} >> {cnt}'), orig)
+        return
+    self._emit(f'{{ {stype} _v = ({stype}){r}; uint8_t _c = {cnt}; '
+               f'{stype} _r = _v >> _c; '
+               f'cpu->flags = (cpu->flags & ~FLAG_CF) | '
+               f'((_v >> (_c - 1)) & 1 ? FLAG_CF : 0); '
+               f'flags_shift{sz}(cpu, (uint{sz}_t)_r); '
+               f'{_write(op1, f"(uint{sz}_t)_r")} }}', orig)
+
+def _lift_rotate(self, inst, orig, func_start):
+    # Rotate instructions - emit as helper call
+    r = _read(inst.op1)
+    cnt = _read(inst.op2)
+    self._emit(f'/* TODO: {inst.mnemonic} {r}, {cnt} */', orig)
+
+# ─── Control flow ───
+
+def _lift_jmp(self, inst, orig, func_start):
+    op1 = inst.op1
+    if op1 and op1.type in (OpType.REL8, OpType.REL16):
+        target = op1.disp
+        if target in self.valid_addrs:
+            target = self._jmp_threads.get(target, target)
+            self.labels_needed.add(target)
+            self._emit(f'goto {_label(target, self.func_name)};', orig)
+        elif target < 0:
+            # Negative target = jump to shared epilogue before function start.
+            # MSC 5.x shared epilogues do: mov sp,bp; pop bp; ret/retf
+            # The mov sp,bp unwinds all local vars and pushed regs.
+            ret_sz = 4 if self.is_far else 2
+            self._emit(f'cpu->sp = (uint16_t)(cpu->bp); cpu->bp = (uint16_t)(pop16(cpu)); cpu->sp += {ret_sz}; return;',
+                       f'shared epilogue ({orig})')
+        else:
+            self._emit(f'/* jmp out of function to 0x{target:06X} */', orig)
+    elif op1 and op1.type == OpType.MEM:
+        table = self._jump_tables.get(inst.address)
+        if table is not None:
+            idx, targets = table
+            self._emit(f'switch ((uint16_t)({idx}) >> 1) {{', orig)
+            for i, t in enumerate(targets):
+                self._emit(f'case {i}: goto {_label(t, self.func_name)};')
+            self._emit('default: break; /* index beyond recovered table */')
+            self._emit('}')
+        else:
+            self._emit(f'/* indirect jmp via {_read(op1)} - needs dispatch */', orig)
+    else:
+        self._emit(f'/* jmp {repr(op1)} */', orig)
+
+def _lift_jcc(m):
+    """Factory for the conditional-jump family."""
+    cc = _CC_MAP[m]
+    def handler(self, inst, orig, func_start):
+        target = inst.op1.disp
+        if target in self.valid_addrs:
+            target = self._jmp_threads.get(target, target)
+            self.labels_needed.add(target)
+            self._emit(f'if ({cc}(cpu)) goto {_label(target, self.func_name)};', orig)
+        else:
+            self._emit(f'/* {m} out of function to 0x{target:06X} */', orig)
+    return handler
+
+def _lift_loop(m, test):
+    """Factory for loop/loopz/loopnz/jcxz: `test` guards the goto."""
+    def handler(self, inst, orig, func_start):
+        target = inst.op1.disp
+        if target in self.valid_addrs:
+            target = self._jmp_threads.get(target, target)
+            self.labels_needed.add(target)
+            self._emit(f'{test}goto {_label(target, self.func_name)};', orig)
+        else:
+            self._emit(f'/* {m} out of function to 0x{target:06X} */', orig)
+    return handler
+
+# Interned synthetic function names. The same call targets recur
+# constantly (runtime helpers especially), so the %06X/%04X formatting
+# is done once per distinct target and the cached str object is reused
+# — set insertion into func_calls then hits by identity.
+_NEAR_NAMES = {}   # file offset -> 'res_XXXXXX'
+_FAR_NAMES = {}    # (seg, off)  -> 'far_SSSS_OOOO'
+_OVL_NAMES = {}    # (num, abs)  -> 'ovlNN_XXXXXX'
+_OVL_RAW_NAMES = {}  # (num, off) -> 'ovlNN_OOOO' (base unknown)
+
+def _near_name(target):
+    name = _NEAR_NAMES.get(target)
+    if name is None:
+        name = _NEAR_NAMES[target] = f'res_{target:06X}'
+    return name
+
+def _far_name(seg, off):
+    key = (seg, off)
+    name = _FAR_NAMES.get(key)
+    if name is None:
+        name = _FAR_NAMES[key] = f'far_{seg:04X}_{off:04X}'
+    return name
+
+def _ovl_name(num, abs_addr):
+    key = (num, abs_addr)
+    name = _OVL_NAMES.get(key)
+    if name is None:
+        name = _OVL_NAMES[key] = f'ovl{num:02d}_{abs_addr:06X}'
+    return name
+
+def _ovl_raw_name(num, off):
+    key = (num, off)
+    name = _OVL_RAW_NAMES.get(key)
+    if name is None:
+        name = _OVL_RAW_NAMES[key] = f'ovl{num:02d}_{off:04X}'
+    return name
+
+def _lift_call(self, inst, orig, func_start):
+    op1 = inst.op1
+    if op1 and op1.type == OpType.REL16:
+        target = func_start + op1.disp
+        # Look up known function name at this address
+        if target in self.known_funcs:
+            func_name = self.known_funcs[target]
+        else:
+            func_name = _near_name(target)
+        self.func_calls.add(func_name)
+        # Simulate NEAR CALL: push 2-byte return IP on CPU stack
+        self._emit(f'push16(cpu, 0);', f'near call return addr')
+        self._emit(f'{func_name}(cpu);', orig)
+    elif op1 and op1.type == OpType.FAR:
+        # Resolve far call segment:offset to a known function.
+        # CIV.EXE has NO MZ relocations - the MSC overlay manager
+        # patches segment values at runtime. The linker-assigned
+        # segments need a correction to map to file offsets:
+        #   file_off = seg*16 + off - 0x14  (most segments)
+        #   file_off = seg*16 + off - 0x1A  (segment 0x205A)
+        # We try both corrected and uncorrected formulas.
+        func_name = None
+        seg = op1.far_seg
+        off = op1.disp
+        # Try corrected formula (seg-specific adjustment)
+        corr = 0x1A if seg == 0x205A else 0x14
+        far_file_off = seg * 16 + off - corr
+        if far_file_off in self.known_funcs:
+            func_name = self.known_funcs[far_file_off]
+        else:
+            # Try original formula (hdr_size + seg*16 + off)
+            far_file_off2 = self.hdr_size + seg * 16 + off
+            if far_file_off2 in self.known_funcs:
+                func_name = self.known_funcs[far_file_off2]
+        if not func_name:
+            func_name = _far_name(seg, off)
+        self.func_calls.add(func_name)
+        # Simulate FAR CALL: push 4-byte return CS:IP on CPU stack
+        self._emit(f'push16(cpu, cpu->cs); push16(cpu, 0);', f'far call return addr')
+        self._emit(f'{func_name}(cpu);', orig)
+    elif op1 and op1.type == OpType.MEM and inst.address in self._jump_tables:
+        idx, names = self._jump_tables[inst.address]
+        self._emit(f'switch ((uint16_t)({idx}) >> 1) {{', orig)
+        for i, callee in enumerate(names):
+            self.func_calls.add(callee)
+            self._emit(f'case {i}: push16(cpu, 0); {callee}(cpu); break;')
+        self._emit('default: break; /* index beyond recovered table */')
+        self._emit('}')
+    else:
+        self._emit(f'/* indirect call {repr(op1)} - needs dispatch */', orig)
+
+def _lift_ret(base):
+    """Factory for ret/retf: `base` is the return-address size popped."""
+    def handler(self, inst, orig, func_start):
+        op1 = inst.op1
+        if op1:
+            total = op1.disp + base
+            self._emit(f'cpu->sp += 0x{total:X}; return;', orig)
+        else:
+            self._emit(f'cpu->sp += {base}; return;', orig)
+    return handler
+
+# Interrupts with dedicated HAL handlers in dos_compat.c; everything
+# else goes through the generic int_handler.
+_INT_TABLE = {
+    0x21: 'dos_int21(cpu);',
+    0x10: 'bios_int10(cpu);',
+    0x16: 'bios_int16(cpu);',
+    0x33: 'mouse_int33(cpu);',
+}
+
+def _lift_int(self, inst, orig, func_start):
+    int_num = inst.op1.disp
+    if int_num == 0x3F and inst.overlay_num >= 0:
+        # Overlay call - resolved to direct function call (far call semantics)
+        # Compute absolute file offset from overlay base + relative offset
+        ovl_num = inst.overlay_num
+        ovl_off = inst.overlay_off
+        if ovl_num in self.overlay_bases:
+            abs_addr = self.overlay_bases[ovl_num] + ovl_off
+            func_name = _ovl_name(ovl_num, abs_addr)
+        else:
+            func_name = _ovl_raw_name(ovl_num, ovl_off)
+        self.ovl_calls.add(func_name)
+        # Simulate FAR CALL for overlay dispatch
+        self._emit(f'push16(cpu, cpu->cs); push16(cpu, 0);',
+                   f'overlay far call return addr')
+        self._emit(f'{func_name}(cpu);',
+                   f'INT 3Fh -> OVL {ovl_num:02X}:{ovl_off:04X}')
+    else:
+        call = _INT_TABLE.get(int_num)
+        if call is None:
+            call = f'int_handler(cpu, 0x{int_num:02X});'
+        self._emit(call, orig)
+
+# ─── Misc ───
+
+def _lift_iret(self, inst, orig, func_start):
+    self._emit('/* iret - return from interrupt */', orig)
+    self._emit('return;')
+
+def _lift_enter(self, inst, orig, func_start):
+    size_val = inst.op1.disp
+    self._emit(f'push16(cpu, cpu->bp); cpu->bp = cpu->sp; '
+               f'cpu->sp -= 0x{size_val:X};', orig)
+
+def _lift_in(self, inst, orig, func_start):
+    op1, op2 = inst.op1, inst.op2
+    if op2 and op2.type == OpType.IMM8:
+        port_expr = f'0x{op2.disp & 0xFF:02X}'
+    else:
+        port_expr = _read(op2) if op2 else 'cpu->dx'
+    self._emit(_write(op1, f'port_in8(cpu, {port_expr})'), orig)
+
+def _lift_out(self, inst, orig, func_start):
+    op1, op2 = inst.op1, inst.op2
+    if op1 and op1.type == OpType.IMM8:
+        port_expr = f'0x{op1.disp & 0xFF:02X}'
+    else:
+        port_expr = _read(op1) if op1 else 'cpu->dx'
+    val_expr = _read(op2) if op2 else 'cpu->al'
+    self._emit(f'port_out8(cpu, {port_expr}, {val_expr});', orig)
+
+# The next three embed the disassembly in the emitted code itself (the
+# placeholder is all there is), so they format it even when the
+# comment columns are switched off. All are cold paths.
+
+def _lift_esc(self, inst, orig, func_start):
+    self._emit(f'/* FPU: {orig or repr(inst)} */', orig)
+
+def _lift_db(self, inst, orig, func_start):
+    self._emit(f'/* data byte: 0x{inst.op1.disp:02X} */', orig)
+
+def _lift_bcd(self, inst, orig, func_start):
+    self._emit(f'/* BCD: {orig or repr(inst)} - stub */', orig)
+
+def _lift_unhandled(self, inst, orig, func_start):
+    self._emit(f'/* UNHANDLED: {orig or repr(inst)} */', orig)
+
+
+def _build_lift_handlers():
+    """Build the mnemonic -> handler dispatch table (once per import)."""
+    h = {}
+
+    # Data movement
+    h['mov'] = _lift_mov
+    h['xchg'] = _lift_xchg
+    h['lea'] = _lift_lea
+    h['lds'] = _lift_lseg('ds')
+    h['les'] = _lift_lseg('es')
+    h['cbw'] = _lift_fixed('cpu->ax = (uint16_t)(int16_t)(int8_t)cpu->al;')
+    h['cwd'] = _lift_fixed('cpu->dx = (cpu->ax & 0x8000) ? 0xFFFF : 0x0000;')
+
+    # Stack
+    h['push'] = _lift_push
+    h['pop'] = _lift_pop
+    h['pushf'] = _lift_fixed('push16(cpu, cpu->flags);')
+    h['popf'] = _lift_fixed('cpu->flags = pop16(cpu);')
+    h['pusha'] = _lift_fixed('{ uint16_t _sp = cpu->sp; '
+                             'push16(cpu, cpu->ax); push16(cpu, cpu->cx); '
+                             'push16(cpu, cpu->dx); push16(cpu, cpu->bx); '
+                             'push16(cpu, _sp); push16(cpu, cpu->bp); '
+                             'push16(cpu, cpu->si); push16(cpu, cpu->di); }')
+    h['popa'] = _lift_fixed('cpu->di = pop16(cpu); cpu->si = pop16(cpu); '
+                            'cpu->bp = pop16(cpu); (void)pop16(cpu); /* skip SP */ '
+                            'cpu->bx = pop16(cpu); cpu->dx = pop16(cpu); '
+                            'cpu->cx = pop16(cpu); cpu->ax = pop16(cpu);')
+
+    # Arithmetic
+    h['add'] = _lift_addsub('add')
+    h['adc'] = _lift_addsub('add', ' + cf(cpu)')
+    h['sub'] = _lift_addsub('sub')
+    h['sbb'] = _lift_addsub('sub', ' + cf(cpu)')
+    h['cmp'] = _lift_cmp
+    h['inc'] = _lift_incdec('inc')
+    h['dec'] = _lift_incdec('dec')
+    h['neg'] = _lift_neg
+    h['mul'] = _lift_mul
+    h['imul'] = _lift_imul
+    h['div'] = _lift_div
+    h['idiv'] = _lift_idiv
+
+    # Logic
+    h['and'] = _lift_logic('&')
+    h['or'] = _lift_logic('|')
+    h['xor'] = _lift_logic('^')
+    h['test'] = _lift_test
+    h['not'] = _lift_not
+
+    # Shifts
+    h['shl'] = h['sal'] = _lift_shl
+    h['shr'] = _lift_shr
+    h['sar'] = _lift_sar
+    for mn in ('rol', 'ror', 'rcl', 'rcr'):
+        h[mn] = _lift_rotate
+
+    # Control flow
+    h['jmp'] = _lift_jmp
+    for mn in _CC_MAP:
+        h[mn] = _lift_jcc(mn)
+    h['loop'] = _lift_loop('loop', 'cpu->cx--; if (cpu->cx != 0) ')
+    h['loopz'] = _lift_loop('loopz', 'cpu->cx--; if (cpu->cx != 0 && zf(cpu)) ')
+    h['loopnz'] = _lift_loop('loopnz', 'cpu->cx--; if (cpu->cx != 0 && !zf(cpu)) ')
+    h['jcxz'] = _lift_loop('jcxz', 'if (cpu->cx == 0) ')
+    h['call'] = _lift_call
+    h['ret'] = _lift_ret(2)
+    h['retf'] = _lift_ret(4)
+    h['int'] = _lift_int
+
+    # String ops
+    h['movsb'] = _lift_fixed('mem_write8(cpu, cpu->es, cpu->di, '
+                             'mem_read8(cpu, cpu->ds, cpu->si)); '
+                             'cpu->si += df(cpu) ? -1 : 1; '
+                             'cpu->di += df(cpu) ? -1 : 1;')
+    h['movsw'] = _lift_fixed('mem_write16(cpu, cpu->es, cpu->di, '
+                             'mem_read16(cpu, cpu->ds, cpu->si)); '
+                             'cpu->si += df(cpu) ? -2 : 2; '
+                             'cpu->di += df(cpu) ? -2 : 2;')
+    h['stosb'] = _lift_fixed('mem_write8(cpu, cpu->es, cpu->di, cpu->al); '
+                             'cpu->di += df(cpu) ? -1 : 1;')
+    h['stosw'] = _lift_fixed('mem_write16(cpu, cpu->es, cpu->di, cpu->ax); '
+                             'cpu->di += df(cpu) ? -2 : 2;')
+    h['lodsb'] = _lift_fixed('cpu->al = mem_read8(cpu, cpu->ds, cpu->si); '
+                             'cpu->si += df(cpu) ? -1 : 1;')
+    h['lodsw'] = _lift_fixed('cpu->ax = mem_read16(cpu, cpu->ds, cpu->si); '
+                             'cpu->si += df(cpu) ? -2 : 2;')
+    h['scasb'] = _lift_fixed('flags_cmp8(cpu, cpu->al, mem_read8(cpu, cpu->es, cpu->di)); '
+                             'cpu->di += df(cpu) ? -1 : 1;')
+    h['scasw'] = _lift_fixed('flags_cmp16(cpu, cpu->ax, mem_read16(cpu, cpu->es, cpu->di)); '
+                             'cpu->di += df(cpu) ? -2 : 2;')
+    h['cmpsb'] = _lift_fixed('flags_cmp8(cpu, mem_read8(cpu, cpu->ds, cpu->si), '
+                             'mem_read8(cpu, cpu->es, cpu->di)); '
+                             'cpu->si += df(cpu) ? -1 : 1; '
+                             'cpu->di += df(cpu) ? -1 : 1;')
+    h['cmpsw'] = _lift_fixed('flags_cmp16(cpu, mem_read16(cpu, cpu->ds, cpu->si), '
+                             'mem_read16(cpu, cpu->es, cpu->di)); '
+                             'cpu->si += df(cpu) ? -2 : 2; '
+                             'cpu->di += df(cpu) ? -2 : 2;')
+
+    # Flags
+    h['clc'] = _lift_fixed('cpu->flags &= ~FLAG_CF;')
+    h['stc'] = _lift_fixed('cpu->flags |= FLAG_CF;')
+    h['cmc'] = _lift_fixed('cpu->flags ^= FLAG_CF;')
+    h['cld'] = _lift_fixed('cpu->flags &= ~FLAG_DF;')
+    h['std'] = _lift_fixed('cpu->flags |= FLAG_DF;')
+    h['cli'] = _lift_fixed('cpu->flags &= ~FLAG_IF;')
+    h['sti'] = _lift_fixed('cpu->flags |= FLAG_IF;')
+    h['sahf'] = _lift_fixed('cpu->flags = (cpu->flags & 0xFF00) | cpu->ah;')
+    h['lahf'] = _lift_fixed('cpu->ah = (uint8_t)(cpu->flags & 0xFF);')
+
+    # Misc
+    h['nop'] = _lift_fixed('/* nop */')
+    h['xlat'] = _lift_fixed('cpu->al = mem_read8(cpu, cpu->ds, '
+                            '(uint16_t)(cpu->bx + cpu->al));')
+    h['hlt'] = _lift_fixed('cpu->halted = 1; return;')
+    h['iret'] = _lift_iret
+    h['enter'] = _lift_enter
+    h['leave'] = _lift_fixed('cpu->sp = cpu->bp; cpu->bp = pop16(cpu);')
+    h['in'] = _lift_in
+    h['out'] = _lift_out
+    h['wait'] = _lift_fixed('/* wait */')
+    for i in range(8):
+        h[f'esc_{i}'] = _lift_esc
+    h['db'] = _lift_db
+    for mn in ('daa', 'das', 'aaa', 'aas', 'aam', 'aad'):
+        h[mn] = _lift_bcd
+
+    return h
+
+_LIFT_HANDLERS = _build_lift_handlers()
+
+
 class Lifter:
     """Lifts x86-16 instructions to C code."""
 
-    def __init__(self, overlay_bases=None, hdr_size=0x200, known_funcs=None):
-        self.output = []
+    # Fixed attribute layout: faster lookups in the per-instruction hot
+    # path and a requirement for ahead-of-time compilers (mypyc/Cython)
+    # should the module ever be compiled. Instruction/Operand in
+    # decode16 are laid out the same way.
+    __slots__ = ('_buf', 'indent', 'labels_needed', 'func_calls',
+                 'ovl_calls', 'func_name', 'valid_addrs', 'overlay_bases',
+                 'hdr_size', 'known_funcs', 'data', '_jump_tables',
+                 '_flags_dead', '_jmp_threads', 'is_far', 'emit_comments')
+
+    def __init__(self, overlay_bases=None, hdr_size=0x200, known_funcs=None,
+                 data=None, emit_comments=True):
+        self._buf = io.StringIO()
         self.indent = 1
         self.labels_needed = set()
         self.func_calls = set()     # Near call targets in this function
@@ -118,578 +870,285 @@ class Lifter:
         self.hdr_size = hdr_size
         # Set of known function file offsets (for resolving far calls)
         self.known_funcs = known_funcs or set()
+        # Full EXE image, used to recover switch jump tables behind
+        # indirect jmp/call (optional - without it they stay comments)
+        self.data = data
+        # inst.address -> (index_reg_expr, targets) for recovered tables
+        self._jump_tables = {}
+        # Addresses whose flag results are provably never read
+        self._flags_dead = frozenset()
+        # Branch target -> final target after chasing jmp->jmp chains
+        self._jmp_threads = {}
+        # When False, the /* original instruction */ comments (and the
+        # repr() calls that build them) are skipped entirely
+        self.emit_comments = emit_comments
 
     def _emit(self, code: str, comment: str = ''):
         """Emit a line of C code with optional comment."""
-        pad = '    ' * self.indent
-        if comment:
+        buf = self._buf
+        if comment and self.emit_comments:
             # Align comments
-            line = f'{pad}{code}'
-            if len(line) < 44:
-                line += ' ' * (44 - len(line))
-            line += f' /* {comment} */'
+            buf.write((_PADS[self.indent] + code).ljust(44))
+            buf.write(' /* ')
+            buf.write(comment)
+            buf.write(' */\n')
         else:
-            line = f'{pad}{code}'
-        self.output.append(line)
+            buf.write(_PADS[self.indent])
+            buf.write(code)
+            buf.write('\n')
 
     def _emit_label(self, addr: int):
         """Emit a label if it's referenced."""
         if addr in self.labels_needed:
-            self.output.append(f'{_label(addr, self.func_name)}:;')
-
-    def lift_instruction(self, inst: Instruction, func_start: int):
-        """Lift a single instruction to C code."""
-        m = inst.mnemonic
-        op1 = inst.op1
-        op2 = inst.op2
-
-        # Emit label if this address is a jump target
-        self._emit_label(inst.address)
-
-        # Format original instruction as comment
-        raw_hex = ' '.join(f'{b:02X}' for b in inst.raw[:6])
-        orig = repr(inst)
-
-        # ─── Data movement ───
-
-        if m == 'mov':
-            self._emit(_write(op1, _read(op2)), orig)
-
-        elif m == 'xchg':
-            self._emit(f'{{ uint16_t _t = {_read(op1)}; '
-                       f'{_write(op1, _read(op2))} '
-                       f'{_write(op2, "_t")} }}', orig)
-
-        elif m == 'lea':
-            # LEA computes effective address without memory access
-            _, off = _mem_addr(op2)
-            self._emit(_write(op1, off), orig)
-
-        elif m == 'lds':
-            seg, off = _mem_addr(op2)
-            self._emit(f'{_reg16(op1)} = mem_read16(cpu, {seg}, {off});', orig)
-            self._emit(f'cpu->ds = mem_read16(cpu, {seg}, (uint16_t)({off} + 2));')
-
-        elif m == 'les':
-            seg, off = _mem_addr(op2)
-            self._emit(f'{_reg16(op1)} = mem_read16(cpu, {seg}, {off});', orig)
-            self._emit(f'cpu->es = mem_read16(cpu, {seg}, (uint16_t)({off} + 2));')
-
-        elif m == 'cbw':
-            self._emit('cpu->ax = (uint16_t)(int16_t)(int8_t)cpu->al;', orig)
-
-        elif m == 'cwd':
-            self._emit('cpu->dx = (cpu->ax & 0x8000) ? 0xFFFF : 0x0000;', orig)
-
-        # ─── Stack ───
-
-        elif m == 'push':
-            self._emit(f'push16(cpu, {_read(op1)});', orig)
-
-        elif m == 'pop':
-            self._emit(_write(op1, 'pop16(cpu)'), orig)
-
-        elif m == 'pushf':
-            self._emit('push16(cpu, cpu->flags);', orig)
-
-        elif m == 'popf':
-            self._emit('cpu->flags = pop16(cpu);', orig)
-
-        elif m == 'pusha':
-            self._emit('{ uint16_t _sp = cpu->sp; '
-                       'push16(cpu, cpu->ax); push16(cpu, cpu->cx); '
-                       'push16(cpu, cpu->dx); push16(cpu, cpu->bx); '
-                       'push16(cpu, _sp); push16(cpu, cpu->bp); '
-                       'push16(cpu, cpu->si); push16(cpu, cpu->di); }', orig)
-
-        elif m == 'popa':
-            self._emit('cpu->di = pop16(cpu); cpu->si = pop16(cpu); '
-                       'cpu->bp = pop16(cpu); (void)pop16(cpu); /* skip SP */ '
-                       'cpu->bx = pop16(cpu); cpu->dx = pop16(cpu); '
-                       'cpu->cx = pop16(cpu); cpu->ax = pop16(cpu);', orig)
-
-        # ─── Arithmetic ───
-
-        elif m == 'add':
-            if op1.size == 1 or op1.type == OpType.REG8:
-                self._emit(_write(op1,
-                    f'flags_add8(cpu, {_read(op1)}, {_read(op2)})'), orig)
-            else:
-                self._emit(_write(op1,
-                    f'flags_add16(cpu, {_read(op1)}, {_read(op2)})'), orig)
-
-        elif m == 'adc':
-            if op1.size == 1 or op1.type == OpType.REG8:
-                self._emit(_write(op1,
-                    f'flags_add8(cpu, {_read(op1)}, {_read(op2)} + cf(cpu))'), orig)
-            else:
-                self._emit(_write(op1,
-                    f'flags_add16(cpu, {_read(op1)}, {_read(op2)} + cf(cpu))'), orig)
-
-        elif m == 'sub':
-            if op1.size == 1 or op1.type == OpType.REG8:
-                self._emit(_write(op1,
-                    f'flags_sub8(cpu, {_read(op1)}, {_read(op2)})'), orig)
-            else:
-                self._emit(_write(op1,
-                    f'flags_sub16(cpu, {_read(op1)}, {_read(op2)})'), orig)
-
-        elif m == 'sbb':
-            if op1.size == 1 or op1.type == OpType.REG8:
-                self._emit(_write(op1,
-                    f'flags_sub8(cpu, {_read(op1)}, {_read(op2)} + cf(cpu))'), orig)
-            else:
-                self._emit(_write(op1,
-                    f'flags_sub16(cpu, {_read(op1)}, {_read(op2)} + cf(cpu))'), orig)
-
-        elif m == 'cmp':
-            if op1.size == 1 or op1.type == OpType.REG8:
-                self._emit(f'flags_cmp8(cpu, {_read(op1)}, {_read(op2)});', orig)
-            else:
-                self._emit(f'flags_cmp16(cpu, {_read(op1)}, {_read(op2)});', orig)
-
-        elif m == 'inc':
-            if op1.size == 1 or op1.type == OpType.REG8:
-                self._emit(f'{{ int _cf = cf(cpu); '
-                           f'{_write(op1, f"flags_add8(cpu, {_read(op1)}, 1)")} '
-                           f'if (_cf) cpu->flags |= FLAG_CF; '
-                           f'else cpu->flags &= ~FLAG_CF; }}', orig)
-            else:
-                self._emit(f'{{ int _cf = cf(cpu); '
-                           f'{_write(op1, f"flags_add16(cpu, {_read(op1)}, 1)")} '
-                           f'if (_cf) cpu->flags |= FLAG_CF; '
-                           f'else cpu->flags &= ~FLAG_CF; }}', orig)
-
-        elif m == 'dec':
-            if op1.size == 1 or op1.type == OpType.REG8:
-                self._emit(f'{{ int _cf = cf(cpu); '
-                           f'{_write(op1, f"flags_sub8(cpu, {_read(op1)}, 1)")} '
-                           f'if (_cf) cpu->flags |= FLAG_CF; '
-                           f'else cpu->flags &= ~FLAG_CF; }}', orig)
-            else:
-                self._emit(f'{{ int _cf = cf(cpu); '
-                           f'{_write(op1, f"flags_sub16(cpu, {_read(op1)}, 1)")} '
-                           f'if (_cf) cpu->flags |= FLAG_CF; '
-                           f'else cpu->flags &= ~FLAG_CF; }}', orig)
-
-        elif m == 'neg':
-            if op1.size == 1 or op1.type == OpType.REG8:
-                self._emit(_write(op1, f'flags_sub8(cpu, 0, {_read(op1)})'), orig)
-            else:
-                self._emit(_write(op1, f'flags_sub16(cpu, 0, {_read(op1)})'), orig)
-
-        elif m == 'mul':
-            if op1.size == 1 or op1.type == OpType.REG8:
-                self._emit(f'{{ uint16_t _r = (uint16_t)cpu->al * {_read(op1)}; '
-                           f'cpu->ax = _r; '
-                           f'cpu->flags = (cpu->flags & ~(FLAG_CF|FLAG_OF)) | '
-                           f'(_r > 0xFF ? FLAG_CF|FLAG_OF : 0); }}', orig)
-            else:
-                self._emit(f'{{ uint32_t _r = (uint32_t)cpu->ax * {_read(op1)}; '
-                           f'cpu->ax = (uint16_t)_r; cpu->dx = (uint16_t)(_r >> 16); '
-                           f'cpu->flags = (cpu->flags & ~(FLAG_CF|FLAG_OF)) | '
-                           f'(cpu->dx ? FLAG_CF|FLAG_OF : 0); }}', orig)
-
-        elif m == 'imul':
-            if op1.size == 1 or op1.type == OpType.REG8:
-                self._emit(f'{{ int16_t _r = (int16_t)(int8_t)cpu->al * '
-                           f'(int8_t){_read(op1)}; '
-                           f'cpu->ax = (uint16_t)_r; '
-                           f'cpu->flags = (cpu->flags & ~(FLAG_CF|FLAG_OF)) | '
-                           f'((uint16_t)_r != (uint16_t)(int16_t)(int8_t)_r ? '
-                           f'FLAG_CF|FLAG_OF : 0); }}', orig)
-            else:
-                self._emit(f'{{ int32_t _r = (int32_t)(int16_t)cpu->ax * '
-                           f'(int16_t){_read(op1)}; '
-                           f'cpu->ax = (uint16_t)_r; '
-                           f'cpu->dx = (uint16_t)((uint32_t)_r >> 16); '
-                           f'cpu->flags = (cpu->flags & ~(FLAG_CF|FLAG_OF)) | '
-                           f'((uint32_t)_r != (uint32_t)(int32_t)(int16_t)_r ? '
-                           f'FLAG_CF|FLAG_OF : 0); }}', orig)
-
-        elif m == 'div':
-            if op1.size == 1 or op1.type == OpType.REG8:
-                self._emit(f'{{ uint16_t _n = cpu->ax; uint8_t _d = {_read(op1)}; '
-                           f'cpu->al = (uint8_t)(_n / _d); '
-                           f'cpu->ah = (uint8_t)(_n % _d); }}', orig)
-            else:
-                self._emit(f'{{ uint32_t _n = ((uint32_t)cpu->dx << 16) | cpu->ax; '
-                           f'uint16_t _d = {_read(op1)}; '
-                           f'cpu->ax = (uint16_t)(_n / _d); '
-                           f'cpu->dx = (uint16_t)(_n % _d); }}', orig)
-
-        elif m == 'idiv':
-            if op1.size == 1 or op1.type == OpType.REG8:
-                self._emit(f'{{ int16_t _n = (int16_t)cpu->ax; '
-                           f'int8_t _d = (int8_t){_read(op1)}; '
-                           f'cpu->al = (uint8_t)(int8_t)(_n / _d); '
-                           f'cpu->ah = (uint8_t)(int8_t)(_n % _d); }}', orig)
-            else:
-                self._emit(f'{{ int32_t _n = (int32_t)(((uint32_t)cpu->dx << 16) '
-                           f'| cpu->ax); int16_t _d = (int16_t){_read(op1)}; '
-                           f'cpu->ax = (uint16_t)(int16_t)(_n / _d); '
-                           f'cpu->dx = (uint16_t)(int16_t)(_n % _d); }}', orig)
-
-        # ─── Logic ───
-
-        elif m == 'and':
-            val = f'{_read(op1)} & {_read(op2)}'
-            sz = '8' if (op1.size == 1 or op1.type == OpType.REG8) else '16'
-            self._emit(f'{{ uint{sz}_t _r = {val}; '
-                       f'flags_logic{sz}(cpu, _r); '
-                       f'{_write(op1, "_r")} }}', orig)
-
-        elif m == 'or':
-            val = f'{_read(op1)} | {_read(op2)}'
-            sz = '8' if (op1.size == 1 or op1.type == OpType.REG8) else '16'
-            self._emit(f'{{ uint{sz}_t _r = {val}; '
-                       f'flags_logic{sz}(cpu, _r); '
-                       f'{_write(op1, "_r")} }}', orig)
-
-        elif m == 'xor':
-            val = f'{_read(op1)} ^ {_read(op2)}'
-            sz = '8' if (op1.size == 1 or op1.type == OpType.REG8) else '16'
-            self._emit(f'{{ uint{sz}_t _r = {val}; '
-                       f'flags_logic{sz}(cpu, _r); '
-                       f'{_write(op1, "_r")} }}', orig)
-
-        elif m == 'test':
-            val = f'{_read(op1)} & {_read(op2)}'
-            sz = '8' if (op1.size == 1 or op1.type == OpType.REG8) else '16'
-            self._emit(f'flags_logic{sz}(cpu, {val});', orig)
-
-        elif m == 'not':
-            self._emit(_write(op1, f'~{_read(op1)}'), orig)
-
-        # ─── Shifts ───
-
-        elif m in ('shl', 'sal'):
-            r = _read(op1)
-            cnt = _read(op2)
-            sz = '8' if (op1.size == 1 or op1.type == OpType.REG8) else '16'
-            bits = 8 if sz == '8' else 16
-            self._emit(f'{{ uint{sz}_t _v = {r}; uint8_t _c = {cnt}; '
-                       f'uint{sz}_t _r = _v << _c; '
-                       f'cpu->flags = (cpu->flags & ~FLAG_CF) | '
-                       f'((_v >> ({bits} - _c)) & 1 ? FLAG_CF : 0); '
-                       f'flags_shift{sz}(cpu, _r); '
-                       f'{_write(op1, "_r")} }}', orig)
-
-        elif m == 'shr':
-            r = _read(op1)
-            cnt = _read(op2)
-            sz = '8' if (op1.size == 1 or op1.type == OpType.REG8) else '16'
-            self._emit(f'{{ uint{sz}_t _v = {r}; uint8_t _c = {cnt}; '
-                       f'uint{sz}_t _r = _v >> _c; '
-                       f'cpu->flags = (cpu->flags & ~FLAG_CF) | '
-                       f'((_v >> (_c - 1)) & 1 ? FLAG_CF : 0); '
-                       f'flags_shift{sz}(cpu, _r); '
-                       f'{_write(op1, "_r")} }}', orig)
-
-        elif m == 'sar':
-            r = _read(op1)
-            cnt = _read(op2)
-            sz = '8' if (op1.size == 1 or op1.type == OpType.REG8) else '16'
-            stype = 'int8_t' if sz == '8' else 'int16_t'
-            self._emit(f'{{ {stype} _v = ({stype}){r}; uint8_t _c = {cnt}; '
-                       f'{stype} _r = _v >> _c; '
-                       f'cpu->flags = (cpu->flags & ~FLAG_CF) | '
-                       f'((_v >> (_c - 1)) & 1 ? FLAG_CF : 0); '
-                       f'flags_shift{sz}(cpu, (uint{sz}_t)_r); '
-                       f'{_write(op1, f"(uint{sz}_t)_r")} }}', orig)
-
-        elif m in ('rol', 'ror', 'rcl', 'rcr'):
-            # Rotate instructions - emit as helper call
-            r = _read(op1)
-            cnt = _read(op2)
-            sz = '8' if (op1.size == 1 or op1.type == OpType.REG8) else '16'
-            self._emit(f'/* TODO: {m} {r}, {cnt} */', orig)
-
-        # ─── Control flow ───
-
-        elif m == 'jmp':
-            if op1 and op1.type in (OpType.REL8, OpType.REL16):
-                target = op1.disp
-                if target in self.valid_addrs:
-                    self.labels_needed.add(target)
-                    self._emit(f'goto {_label(target, self.func_name)};', orig)
-                elif target < 0:
-                    # Negative target = jump to shared epilogue before function start.
-                    # MSC 5.x shared epilogues do: mov sp,bp; pop bp; ret/retf
-                    # The mov sp,bp unwinds all local vars and pushed regs.
-                    ret_sz = 4 if self.is_far else 2
-                    self._emit(f'cpu->sp = (uint16_t)(cpu->bp); cpu->bp = (uint16_t)(pop16(cpu)); cpu->sp += {ret_sz}; return;',
-                               f'shared epilogue ({orig})')
-                else:
-                    self._emit(f'/* jmp out of function to 0x{target:06X} */', orig)
-            elif op1 and op1.type == OpType.MEM:
-                self._emit(f'/* indirect jmp via {_read(op1)} - needs dispatch */', orig)
-            else:
-                self._emit(f'/* jmp {repr(op1)} */', orig)
-
-        elif m in ('jo','jno','jb','jae','je','jne','jbe','ja',
-                    'js','jns','jp','jnp','jl','jge','jle','jg'):
-            CC_MAP = {
-                'jo': 'cc_o', 'jno': 'cc_no', 'jb': 'cc_b', 'jae': 'cc_ae',
-                'je': 'cc_e', 'jne': 'cc_ne', 'jbe': 'cc_be', 'ja': 'cc_a',
-                'js': 'cc_s', 'jns': 'cc_ns', 'jp': 'cc_p', 'jnp': 'cc_np',
-                'jl': 'cc_l', 'jge': 'cc_ge', 'jle': 'cc_le', 'jg': 'cc_g',
-            }
-            target = op1.disp
-            cc = CC_MAP[m]
-            if target in self.valid_addrs:
-                self.labels_needed.add(target)
-                self._emit(f'if ({cc}(cpu)) goto {_label(target, self.func_name)};', orig)
-            else:
-                self._emit(f'/* {m} out of function to 0x{target:06X} */', orig)
-
-        elif m == 'loop':
-            target = op1.disp
-            if target in self.valid_addrs:
-                self.labels_needed.add(target)
-                self._emit(f'cpu->cx--; if (cpu->cx != 0) goto {_label(target, self.func_name)};', orig)
-            else:
-                self._emit(f'/* loop out of function to 0x{target:06X} */', orig)
-
-        elif m == 'loopz':
-            target = op1.disp
-            if target in self.valid_addrs:
-                self.labels_needed.add(target)
-                self._emit(f'cpu->cx--; if (cpu->cx != 0 && zf(cpu)) '
-                           f'goto {_label(target, self.func_name)};', orig)
-            else:
-                self._emit(f'/* loopz out of function to 0x{target:06X} */', orig)
-
-        elif m == 'loopnz':
-            target = op1.disp
-            if target in self.valid_addrs:
-                self.labels_needed.add(target)
-                self._emit(f'cpu->cx--; if (cpu->cx != 0 && !zf(cpu)) '
-                           f'goto {_label(target, self.func_name)};', orig)
-            else:
-                self._emit(f'/* loopnz out of function to 0x{target:06X} */', orig)
-
-        elif m == 'jcxz':
-            target = op1.disp
-            if target in self.valid_addrs:
-                self.labels_needed.add(target)
-                self._emit(f'if (cpu->cx == 0) goto {_label(target, self.func_name)};', orig)
-            else:
-                self._emit(f'/* jcxz out of function to 0x{target:06X} */', orig)
-
-        elif m == 'call':
-            if op1 and op1.type == OpType.REL16:
-                target = func_start + op1.disp
-                # Look up known function name at this address
-                if target in self.known_funcs:
-                    func_name = self.known_funcs[target]
-                else:
-                    func_name = f'res_{target:06X}'
-                self.func_calls.add(func_name)
-                # Simulate NEAR CALL: push 2-byte return IP on CPU stack
-                self._emit(f'push16(cpu, 0);', f'near call return addr')
-                self._emit(f'{func_name}(cpu);', orig)
-            elif op1 and op1.type == OpType.FAR:
-                # Resolve far call segment:offset to a known function.
-                # CIV.EXE has NO MZ relocations - the MSC overlay manager
-                # patches segment values at runtime. The linker-assigned
-                # segments need a correction to map to file offsets:
-                #   file_off = seg*16 + off - 0x14  (most segments)
-                #   file_off = seg*16 + off - 0x1A  (segment 0x205A)
-                # We try both corrected and uncorrected formulas.
-                func_name = None
-                seg = op1.far_seg
-                off = op1.disp
-                # Try corrected formula (seg-specific adjustment)
-                corr = 0x1A if seg == 0x205A else 0x14
-                far_file_off = seg * 16 + off - corr
-                if far_file_off in self.known_funcs:
-                    func_name = self.known_funcs[far_file_off]
+            self._buf.write(_label(addr, self.func_name))
+            self._buf.write(':;\n')
+
+    def _peephole(self, instructions):
+        """Drop no-op sequences before emission.
+
+        Handled patterns: `push X; pop X` over the same non-SP register
+        (stack-neutral), `mov r,r` onto itself (no flags written), and
+        back-to-back cld/std repeats. An instruction whose address is a
+        jump target is never dropped - its label must survive. The
+        xor/sub self-zeroing idioms are rewritten in their emitters
+        instead, since those stay one instruction.
+        """
+        out = []
+        labels = self.labels_needed
+        i = 0
+        n = len(instructions)
+        while i < n:
+            inst = instructions[i]
+            m = inst.mnemonic
+            if not inst.prefix:
+                # push X; pop X -> nothing
+                if m == 'push' and i + 1 < n:
+                    nxt = instructions[i + 1]
+                    if (nxt.mnemonic == 'pop' and nxt.op1 is inst.op1
+                            and inst.op1 is not None
+                            and inst.op1.type == OpType.REG16
+                            and inst.op1.reg != 4      # never touch sp
+                            and inst.address not in labels
+                            and nxt.address not in labels):
+                        i += 2
+                        continue
+                # mov r, r -> nothing (mov writes no flags)
+                if (m == 'mov' and inst.op1 is inst.op2
+                        and inst.op1 is not None
+                        and inst.op1.type in (OpType.REG8, OpType.REG16)
+                        and inst.address not in labels):
+                    i += 1
+                    continue
+                # cld; cld (or std; std) -> keep the first only
+                if (m in ('cld', 'std') and out
+                        and out[-1].mnemonic == m and not out[-1].prefix
+                        and inst.address not in labels):
+                    i += 1
+                    continue
+            out.append(inst)
+            i += 1
+        return out
+
+    def _compute_flag_liveness(self, instructions):
+        """Backward liveness over the tracked arithmetic flags.
+
+        Returns the set of addresses whose written flags are all
+        overwritten before any possible read. The scan is linear and
+        conservative: branches, calls, interrupts, returns, prefixed
+        instructions and anything not in the flag tables act as
+        barriers where every flag is assumed live (a branch target's
+        needs are unknown without full dataflow, so control transfers
+        never carry a dead set across).
+        """
+        dead = set()
+        live = _FLAGS_ALL
+        for inst in reversed(instructions):
+            m = inst.mnemonic
+            if inst.prefix or m in _FLAG_BARRIERS:
+                live = _FLAGS_ALL
+                continue
+            if m in _FLAG_NEUTRAL:
+                continue
+            writes = _FLAG_WRITES.get(m)
+            reads = _FLAG_READS.get(m)
+            if writes is None and reads is None:
+                live = _FLAGS_ALL        # unknown effect: barrier
+                continue
+            if writes:
+                if not (live & writes):
+                    dead.add(inst.address)
+                live = live - writes
+            if reads:
+                live = live | reads
+        return dead
+
+    def _find_jump_table(self, op, func_start, is_call):
+        """Recover an MSC switch table behind `jmp/call word cs:[reg+disp]`.
+
+        The compiler lowers switch statements to an indexed jump through
+        a word table of code offsets in CS. The original CS base is not
+        tracked here, so a few candidate file offsets are tried and a
+        table is accepted only when at least two consecutive entries
+        resolve - to decoded instruction starts for jmp, to known
+        function starts for call. Returns (index_expr, targets) or None.
+        """
+        data = self.data
+        if data is None or op.size != 2 or op.seg != 'cs':
+            return None
+        if is_call and not hasattr(self.known_funcs, 'get'):
+            return None
+        # Exactly one index register plus a constant displacement
+        reg = op.base or op.index
+        if not reg or (op.base and op.index) or not op.disp:
+            return None
+
+        # Candidate CS bases: function start, the overlay module's code
+        # start for overlay functions, and the resident image start
+        cands = [func_start]
+        if self.func_name.startswith('ovl'):
+            try:
+                num = int(self.func_name[3:5])
+            except ValueError:
+                num = -1
+            if num in self.overlay_bases:
+                cands.append(self.overlay_bases[num])
+        cands.append(self.hdr_size)
+
+        disp = op.disp & 0xFFFF
+        for base in cands:
+            toff = base + disp
+            targets = []
+            while len(targets) < 100 and toff + 2 <= len(data):
+                entry = struct.unpack_from('<H', data, toff)[0]
+                if is_call:
+                    callee = self.known_funcs.get(base + entry)
+                    if callee is None:
+                        break
+                    targets.append(callee)
                 else:
-                    # Try original formula (hdr_size + seg*16 + off)
-                    far_file_off2 = self.hdr_size + seg * 16 + off
-                    if far_file_off2 in self.known_funcs:
-                        func_name = self.known_funcs[far_file_off2]
-                if not func_name:
-                    func_name = f'far_{seg:04X}_{off:04X}'
-                self.func_calls.add(func_name)
-                # Simulate FAR CALL: push 4-byte return CS:IP on CPU stack
-                self._emit(f'push16(cpu, cpu->cs); push16(cpu, 0);', f'far call return addr')
-                self._emit(f'{func_name}(cpu);', orig)
-            else:
-                self._emit(f'/* indirect call {repr(op1)} - needs dispatch */', orig)
-
-        elif m == 'ret':
-            # Simulate NEAR RET: pop 2-byte return IP + optional extra bytes
-            if op1:
-                total = op1.disp + 2
-                self._emit(f'cpu->sp += 0x{total:X}; return;', orig)
-            else:
-                self._emit('cpu->sp += 2; return;', orig)
+                    addr = base + entry - func_start
+                    if addr not in self.valid_addrs:
+                        break
+                    targets.append(addr)
+                toff += 2
+            if len(targets) >= 2:
+                return f'cpu->{reg}', targets
+        return None
+
+    # ─── Pre-emission pass pipeline ───
+    #
+    # The decoded Instruction list doubles as the IR: each node carries
+    # its operands plus the flag def/use metadata in the module tables,
+    # so passes either rewrite the list (peephole) or annotate the
+    # lifter (labels, liveness, jump tables). Only the final emission
+    # pass produces C text; no pass manipulates strings.
+
+    def _pass_labels(self, instructions, branch_targets):
+        """Collect intra-function branch targets into labels_needed."""
+        if branch_targets is not None:
+            # Labels were collected by the decoder as it went
+            self.labels_needed = self.valid_addrs & branch_targets
+            return
+        self.labels_needed = set()
+        for inst in instructions:
+            m = inst.mnemonic
+            if m in ('jmp', 'jo','jno','jb','jae','je','jne','jbe','ja',
+                     'js','jns','jp','jnp','jl','jge','jle','jg',
+                     'loop', 'loopz', 'loopnz', 'jcxz'):
+                if inst.op1 and inst.op1.type in (OpType.REL8, OpType.REL16):
+                    target = inst.op1.disp
+                    if target in self.valid_addrs:
+                        self.labels_needed.add(target)
 
-        elif m == 'retf':
-            # Simulate FAR RETF: pop 4-byte return CS:IP + optional extra bytes
-            if op1:
-                total = op1.disp + 4
-                self._emit(f'cpu->sp += 0x{total:X}; return;', orig)
-            else:
-                self._emit('cpu->sp += 4; return;', orig)
-
-        elif m == 'int':
-            int_num = op1.disp
-            if int_num == 0x3F and inst.overlay_num >= 0:
-                # Overlay call - resolved to direct function call (far call semantics)
-                # Compute absolute file offset from overlay base + relative offset
-                ovl_num = inst.overlay_num
-                ovl_off = inst.overlay_off
-                if ovl_num in self.overlay_bases:
-                    abs_addr = self.overlay_bases[ovl_num] + ovl_off
-                    func_name = f'ovl{ovl_num:02d}_{abs_addr:06X}'
-                else:
-                    func_name = f'ovl{ovl_num:02d}_{ovl_off:04X}'
-                self.ovl_calls.add(func_name)
-                # Simulate FAR CALL for overlay dispatch
-                self._emit(f'push16(cpu, cpu->cs); push16(cpu, 0);',
-                           f'overlay far call return addr')
-                self._emit(f'{func_name}(cpu);',
-                           f'INT 3Fh -> OVL {ovl_num:02X}:{ovl_off:04X}')
-            elif int_num == 0x21:
-                self._emit(f'dos_int21(cpu);', orig)
-            elif int_num == 0x10:
-                self._emit(f'bios_int10(cpu);', orig)
-            elif int_num == 0x16:
-                self._emit(f'bios_int16(cpu);', orig)
-            elif int_num == 0x33:
-                self._emit(f'mouse_int33(cpu);', orig)
-            else:
-                self._emit(f'int_handler(cpu, 0x{int_num:02X});', orig)
-
-        # ─── String ops ───
-
-        elif m == 'movsb':
-            self._emit(f'mem_write8(cpu, cpu->es, cpu->di, '
-                       f'mem_read8(cpu, cpu->ds, cpu->si)); '
-                       f'cpu->si += df(cpu) ? -1 : 1; '
-                       f'cpu->di += df(cpu) ? -1 : 1;', orig)
-
-        elif m == 'movsw':
-            self._emit(f'mem_write16(cpu, cpu->es, cpu->di, '
-                       f'mem_read16(cpu, cpu->ds, cpu->si)); '
-                       f'cpu->si += df(cpu) ? -2 : 2; '
-                       f'cpu->di += df(cpu) ? -2 : 2;', orig)
-
-        elif m == 'stosb':
-            self._emit(f'mem_write8(cpu, cpu->es, cpu->di, cpu->al); '
-                       f'cpu->di += df(cpu) ? -1 : 1;', orig)
-
-        elif m == 'stosw':
-            self._emit(f'mem_write16(cpu, cpu->es, cpu->di, cpu->ax); '
-                       f'cpu->di += df(cpu) ? -2 : 2;', orig)
-
-        elif m == 'lodsb':
-            self._emit(f'cpu->al = mem_read8(cpu, cpu->ds, cpu->si); '
-                       f'cpu->si += df(cpu) ? -1 : 1;', orig)
-
-        elif m == 'lodsw':
-            self._emit(f'cpu->ax = mem_read16(cpu, cpu->ds, cpu->si); '
-                       f'cpu->si += df(cpu) ? -2 : 2;', orig)
-
-        elif m == 'scasb':
-            self._emit(f'flags_cmp8(cpu, cpu->al, mem_read8(cpu, cpu->es, cpu->di)); '
-                       f'cpu->di += df(cpu) ? -1 : 1;', orig)
-
-        elif m == 'scasw':
-            self._emit(f'flags_cmp16(cpu, cpu->ax, mem_read16(cpu, cpu->es, cpu->di)); '
-                       f'cpu->di += df(cpu) ? -2 : 2;', orig)
-
-        elif m == 'cmpsb':
-            self._emit(f'flags_cmp8(cpu, mem_read8(cpu, cpu->ds, cpu->si), '
-                       f'mem_read8(cpu, cpu->es, cpu->di)); '
-                       f'cpu->si += df(cpu) ? -1 : 1; '
-                       f'cpu->di += df(cpu) ? -1 : 1;', orig)
-
-        elif m == 'cmpsw':
-            self._emit(f'flags_cmp16(cpu, mem_read16(cpu, cpu->ds, cpu->si), '
-                       f'mem_read16(cpu, cpu->es, cpu->di)); '
-                       f'cpu->si += df(cpu) ? -2 : 2; '
-                       f'cpu->di += df(cpu) ? -2 : 2;', orig)
-
-        # ─── Flags ───
-
-        elif m == 'clc': self._emit('cpu->flags &= ~FLAG_CF;', orig)
-        elif m == 'stc': self._emit('cpu->flags |= FLAG_CF;', orig)
-        elif m == 'cmc': self._emit('cpu->flags ^= FLAG_CF;', orig)
-        elif m == 'cld': self._emit('cpu->flags &= ~FLAG_DF;', orig)
-        elif m == 'std': self._emit('cpu->flags |= FLAG_DF;', orig)
-        elif m == 'cli': self._emit('cpu->flags &= ~FLAG_IF;', orig)
-        elif m == 'sti': self._emit('cpu->flags |= FLAG_IF;', orig)
-
-        elif m == 'sahf':
-            self._emit('cpu->flags = (cpu->flags & 0xFF00) | cpu->ah;', orig)
-        elif m == 'lahf':
-            self._emit('cpu->ah = (uint8_t)(cpu->flags & 0xFF);', orig)
-
-        # ─── Misc ───
-
-        elif m == 'nop':
-            self._emit('/* nop */', orig)
-
-        elif m == 'xlat':
-            self._emit('cpu->al = mem_read8(cpu, cpu->ds, '
-                       '(uint16_t)(cpu->bx + cpu->al));', orig)
-
-        elif m == 'hlt':
-            self._emit('cpu->halted = 1; return;', orig)
-
-        elif m == 'iret':
-            self._emit('/* iret - return from interrupt */', orig)
-            self._emit('return;')
-
-        elif m == 'enter':
-            size_val = op1.disp
-            self._emit(f'push16(cpu, cpu->bp); cpu->bp = cpu->sp; '
-                       f'cpu->sp -= 0x{size_val:X};', orig)
-
-        elif m == 'leave':
-            self._emit('cpu->sp = cpu->bp; cpu->bp = pop16(cpu);', orig)
-
-        elif m == 'in':
-            if op2 and op2.type == OpType.IMM8:
-                port_expr = f'0x{op2.disp & 0xFF:02X}'
-            else:
-                port_expr = _read(op2) if op2 else 'cpu->dx'
-            self._emit(_write(op1, f'port_in8(cpu, {port_expr})'), orig)
+    def _pass_jump_tables(self, instructions, func_start):
+        """Recover switch jump tables behind indirect jmp/call.
 
-        elif m == 'out':
-            if op1 and op1.type == OpType.IMM8:
-                port_expr = f'0x{op1.disp & 0xFF:02X}'
+        Runs before emission so the case labels of backward targets
+        exist by the time the emitter reaches them.
+        """
+        self._jump_tables = {}
+        if self.data is None:
+            return
+        for inst in instructions:
+            m = inst.mnemonic
+            if m in ('jmp', 'call') and inst.op1 is not None \
+                    and inst.op1.type == OpType.MEM:
+                table = self._find_jump_table(inst.op1, func_start,
+                                              m == 'call')
+                if table is not None:
+                    self._jump_tables[inst.address] = table
+                    if m == 'jmp':
+                        self.labels_needed.update(table[1])
+
+    def _pass_thread_jumps(self, instructions):
+        """Jump threading: chase chains of unconditional jumps.
+
+        A branch to an address holding a plain `jmp` can go straight to
+        that jump's destination — the intermediate jmp has no side
+        effects. Builds _jmp_threads mapping each such destination to
+        its final target; the branch emitters consult it. Chains ending
+        in a cycle (an intentional infinite loop) are left alone.
+        """
+        chain = {}
+        for inst in instructions:
+            if inst.mnemonic == 'jmp' and not inst.prefix \
+                    and inst.op1 is not None \
+                    and inst.op1.type in (OpType.REL8, OpType.REL16):
+                target = inst.op1.disp
+                if target in self.valid_addrs and target != inst.address:
+                    chain[inst.address] = target
+        threads = {}
+        for dest in chain:
+            seen = set()
+            final = dest
+            while final in chain:
+                if final in seen:
+                    break          # cycle: keep the original target
+                seen.add(final)
+                final = chain[final]
             else:
-                port_expr = _read(op1) if op1 else 'cpu->dx'
-            val_expr = _read(op2) if op2 else 'cpu->al'
-            self._emit(f'port_out8(cpu, {port_expr}, {val_expr});', orig)
+                if final != dest:
+                    threads[dest] = final
+        self._jmp_threads = threads
+
+    def _run_passes(self, instructions, func_start, branch_targets):
+        """Run the pass pipeline; returns the (possibly rewritten) list.
+
+        Order matters: labels and jump tables both run before the
+        peephole, because its deletions skip labeled addresses and a
+        recovered case target must keep its instruction (and label) or
+        the switch would goto a label that is never emitted. Liveness
+        runs after peephole (deleted instructions must not shadow flag
+        writes).
+        """
+        self._pass_labels(instructions, branch_targets)
+        self._pass_jump_tables(instructions, func_start)
+        instructions = self._peephole(instructions)
+        self._flags_dead = self._compute_flag_liveness(instructions)
+        self._pass_thread_jumps(instructions)
+        return instructions
 
-        elif m == 'wait':
-            self._emit('/* wait */', orig)
-
-        elif m.startswith('esc_'):
-            self._emit(f'/* FPU: {orig} */', orig)
-
-        elif m == 'db':
-            self._emit(f'/* data byte: 0x{op1.disp:02X} */', orig)
+    def lift_instruction(self, inst: Instruction, func_start: int):
+        """Lift a single instruction to C code."""
+        # Emit label if this address is a jump target
+        self._emit_label(inst.address)
 
-        elif m.startswith('daa') or m.startswith('das') or \
-             m.startswith('aaa') or m.startswith('aas') or \
-             m.startswith('aam') or m.startswith('aad'):
-            self._emit(f'/* BCD: {orig} - stub */', orig)
+        # Format original instruction as comment (repr is a large part
+        # of lift time, so skip it when comments are off)
+        orig = repr(inst) if self.emit_comments else ''
 
-        else:
-            self._emit(f'/* UNHANDLED: {orig} */', orig)
+        _LIFT_HANDLERS.get(inst.mnemonic, _lift_unhandled)(
+            self, inst, orig, func_start)
 
     def lift_function(self, name: str, instructions: list, func_start: int,
-                      is_far: bool = False) -> str:
-        """Lift an entire function to C code."""
-        self.output = []
-        self.labels_needed = set()
+                      is_far: bool = False, branch_targets=None) -> str:
+        """Lift an entire function to C code.
+
+        branch_targets, when given, is the Decoder.branch_targets set
+        collected while decoding this function; it replaces the label
+        collection pass over the instruction list.
+        """
+        self._buf = io.StringIO()
         self.func_calls = set()
         self.ovl_calls = set()
         self.func_name = name
@@ -699,43 +1158,27 @@ class Lifter:
         # Build set of valid instruction addresses for this function
         self.valid_addrs = set(inst.address for inst in instructions)
 
-        # First pass: collect jump targets for labels (only within function)
-        for inst in instructions:
-            m = inst.mnemonic
-            if m in ('jmp', 'jo','jno','jb','jae','je','jne','jbe','ja',
-                     'js','jns','jp','jnp','jl','jge','jle','jg',
-                     'loop', 'loopz', 'loopnz', 'jcxz'):
-                if inst.op1 and inst.op1.type in (OpType.REL8, OpType.REL16):
-                    target = inst.op1.disp
-                    if target in self.valid_addrs:
-                        self.labels_needed.add(target)
+        instructions = self._run_passes(instructions, func_start,
+                                        branch_targets)
 
-        # Second pass: generate C code
-        self.output.append(f'void {name}(CPU *cpu)')
-        self.output.append('{')
+        # Final pass: generate C code
+        self._buf.write(f'void {name}(CPU *cpu)\n{{\n')
 
         for inst in instructions:
             if inst.prefix == 'rep' and inst.mnemonic in ('movsb','movsw','stosb','stosw'):
                 self._emit_label(inst.address)
-                self._emit(f'while (cpu->cx != 0) {{ cpu->cx--;', f'rep {inst.mnemonic}')
-                self.indent += 1
-                # Emit the string op body (set address to -1 to avoid duplicate label)
-                stripped = Instruction()
-                stripped.__dict__.update(inst.__dict__)
-                stripped.prefix = ''
-                stripped.address = -1
-                self.lift_instruction(stripped, func_start)
-                self.indent -= 1
-                self._emit('}')
+                # Block-copy helper: memcpy/memset fast path in cpu.h
+                self._emit(f'rep_{inst.mnemonic}(cpu);', f'rep {inst.mnemonic}')
             elif inst.prefix == 'rep' and inst.mnemonic in ('scasb','scasw','cmpsb','cmpsw'):
                 self._emit_label(inst.address)
                 self._emit(f'while (cpu->cx != 0) {{ cpu->cx--;', f'repz {inst.mnemonic}')
                 self.indent += 1
-                stripped = Instruction()
-                stripped.__dict__.update(inst.__dict__)
-                stripped.prefix = ''
-                stripped.address = -1
-                self.lift_instruction(stripped, func_start)
+                # Strip the prefix in place for the body lift (address
+                # -1 suppresses the label); nothing retains the
+                # instruction, so restore instead of copying.
+                inst.prefix, inst.address, saved = '', -1, inst.address
+                self.lift_instruction(inst, func_start)
+                inst.prefix, inst.address = 'rep', saved
                 self._emit('if (!zf(cpu)) break;')
                 self.indent -= 1
                 self._emit('}')
@@ -743,17 +1186,16 @@ class Lifter:
                 self._emit_label(inst.address)
                 self._emit(f'while (cpu->cx != 0) {{ cpu->cx--;', f'repnz {inst.mnemonic}')
                 self.indent += 1
-                stripped = Instruction()
-                stripped.__dict__.update(inst.__dict__)
-                stripped.prefix = ''
-                stripped.address = -1
-                self.lift_instruction(stripped, func_start)
+                inst.prefix, inst.address, saved = '', -1, inst.address
+                self.lift_instruction(inst, func_start)
+                inst.prefix, inst.address = 'repnz', saved
                 self._emit('if (zf(cpu)) break;')
                 self.indent -= 1
                 self._emit('}')
             else:
                 self.lift_instruction(inst, func_start)
 
-        self.output.append('}')
+        # No trailing newline: callers append their own separators.
+        self._buf.write('}')
 
-        return '\n'.join(self.output)
+        return self._buf.getvalue()
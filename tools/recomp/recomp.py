@@ -13,6 +13,7 @@ Part of the Civ Recomp project (sp00nznet/civ)
 import os
 import sys
 import struct
+from concurrent.futures import ProcessPoolExecutor
 from decode16 import Decoder
 from analyze import Analyzer
 from lift import Lifter
@@ -47,7 +48,38 @@ extern uint8_t port_in8(CPU *cpu, uint16_t port);
 """
 
 
-def recompile(exe_path: str, output_dir: str, funcs_per_file: int = 50):
+# Shared per-process lift context, set once by the pool initializer so
+# the EXE image and lookup maps are not re-pickled for every function.
+_LIFT_CTX = None
+
+def _lift_init(data, overlay_bases, hdr_size, known_funcs, emit_comments):
+    global _LIFT_CTX
+    _LIFT_CTX = (data, overlay_bases, hdr_size, known_funcs, emit_comments)
+
+def _lift_one(work):
+    """Decode and lift one function. Worker for the process pool.
+
+    Returns (c_code, error, func_calls, ovl_calls); error is None on
+    success, and c_code is None on failure.
+    """
+    name, start, end, is_far = work
+    data, overlay_bases, hdr_size, known_funcs, emit_comments = _LIFT_CTX
+    code = data[start:end]
+    decoder = Decoder(code, base_offset=start)
+    instructions = decoder.decode_range(0, len(code))
+    lifter = Lifter(overlay_bases=overlay_bases, hdr_size=hdr_size,
+                    known_funcs=known_funcs, data=data,
+                    emit_comments=emit_comments)
+    try:
+        c_code = lifter.lift_function(name, instructions, start, is_far,
+                                      branch_targets=decoder.branch_targets)
+    except Exception as e:
+        return None, str(e), None, None
+    return c_code, None, lifter.func_calls, lifter.ovl_calls
+
+
+def recompile(exe_path: str, output_dir: str, funcs_per_file: int = 50,
+              emit_comments: bool = True):
     """Run the full recompilation pipeline."""
 
     print("=" * 60)
@@ -89,23 +121,34 @@ def recompile(exe_path: str, output_dir: str, funcs_per_file: int = 50):
     all_names = set()
     errors = 0
 
-    for func in sorted(analyzer.functions, key=lambda f: f.start):
-        # Decode instructions for this function
-        code = data[func.start:func.end]
-        decoder = Decoder(code, base_offset=func.start)
-        instructions = decoder.decode_range(0, len(code))
-
-        # Lift
-        lifter = Lifter(overlay_bases=overlay_bases, hdr_size=hdr_size,
-                         known_funcs=known_funcs)
+    # Functions are independent, so decode+lift runs across a process
+    # pool (same scheme as overlay analysis in analyze.py). pool.map
+    # preserves input order, keeping the output files deterministic;
+    # falls back to a serial loop if the pool cannot be created.
+    funcs = sorted(analyzer.functions, key=lambda f: f.start)
+    work = [(f.name, f.start, f.end, f.is_far) for f in funcs]
+    ctx = (data, overlay_bases, hdr_size, known_funcs, emit_comments)
+    results = None
+    workers = min(len(work), os.cpu_count() or 1)
+    if workers > 1:
         try:
-            c_code = lifter.lift_function(
-                func.name, instructions, func.start, func.is_far)
-            all_lifted.append((func, c_code, lifter.func_calls, lifter.ovl_calls))
-            all_names.add(func.name)
-        except Exception as e:
-            print(f"  Error lifting {func.name}: {e}")
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=_lift_init,
+                                     initargs=ctx) as pool:
+                results = list(pool.map(_lift_one, work, chunksize=16))
+        except OSError:
+            results = None
+    if results is None:
+        _lift_init(*ctx)
+        results = [_lift_one(w) for w in work]
+
+    for func, (c_code, err, func_calls, ovl_calls) in zip(funcs, results):
+        if err is not None:
+            print(f"  Error lifting {func.name}: {err}")
             errors += 1
+            continue
+        all_lifted.append((func, c_code, func_calls, ovl_calls))
+        all_names.add(func.name)
 
     print(f"Lifted {len(all_lifted)} functions ({errors} errors)")
 
@@ -278,16 +321,22 @@ def recompile(exe_path: str, output_dir: str, funcs_per_file: int = 50):
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: recomp.py <civ.exe> [output_dir] [funcs_per_file]")
+        print("Usage: recomp.py <civ.exe> [output_dir] [funcs_per_file] [--no-comments]")
         print("\nFull static recompilation pipeline.")
         print("Outputs compilable C code from CIV.EXE.")
+        print("--no-comments skips the /* original instruction */ columns")
+        print("(smaller output, faster bulk runs).")
         sys.exit(1)
 
-    exe_path = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) >= 3 else 'RecompiledFuncs'
-    funcs_per_file = int(sys.argv[3]) if len(sys.argv) >= 4 else 50
+    args = [a for a in sys.argv[1:] if a != '--no-comments']
+    emit_comments = '--no-comments' not in sys.argv
+
+    exe_path = args[0]
+    output_dir = args[1] if len(args) >= 2 else 'RecompiledFuncs'
+    funcs_per_file = int(args[2]) if len(args) >= 3 else 50
 
-    recompile(exe_path, output_dir, funcs_per_file)
+    recompile(exe_path, output_dir, funcs_per_file,
+              emit_comments=emit_comments)
 
 
 if __name__ == '__main__':
@@ -9,16 +9,52 @@ and byte patterns.
 Part of the Civ Recomp project (sp00nznet/civ)
 """
 
+import bisect
+import functools
+import mmap
 import struct
 import sys
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 
-LOAD_SEG = 0x0100  # DOS load segment
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
+LOAD_SEG = 0x0100  # DOS load segment
 
+# String-signature scan: the C library keywords that mark a nearby
+# printable run as interesting. The lookahead wrapper reports every
+# offset where a keyword starts (overlapping hits included), so one
+# pass over the whole image yields a complete hit index that the
+# report queries per stub - the dictionary-automaton approach, run
+# inside the regex engine.
+_LIB_KW_ALL_RE = re.compile(
+    rb'(?=(alloc|free|print|str|mem|file|open|close|read|write|exit|'
+    rb'abort|math|sqrt|rand|atoi|itoa|sprintf|sscanf|errno|div|'
+    rb'overflow|stack|error|null|heap))', re.IGNORECASE)
+
+# Declaration/definition lines in the generated C sources
+_STUB_RE = re.compile(r'^void ((?:far|res|ovl)\S+)\(CPU \*cpu\)', re.MULTILINE)
+_FUNC_RE = re.compile(
+    r'^void (?P<name>(?:res_|ovl\d+_)(?P<hex>[0-9A-Fa-f]+))\(CPU \*cpu\);',
+    re.MULTILINE)
+# Stub name shapes: far_SSSS_XXXX carries seg:off (groups 1/2), while
+# res_XXXXXX and ovlNN_XXXXXX carry a file offset directly (group 3)
+_NAME_RE = re.compile(
+    r'far_([0-9A-Fa-f]+)_([0-9A-Fa-f]+)$'
+    r'|(?:res_|ovl\d+_)([0-9A-Fa-f]+)$')
+
+
+@functools.lru_cache(maxsize=None)
 def compute_file_offset(seg, off, hdr_size=0x200):
-    """Convert segment:offset to file offset."""
+    """Convert segment:offset to file offset.
+
+    Pure function of its arguments; cached since the same (seg, off)
+    pairs come up in both the resolve loop and the signature report.
+    """
     mem_addr = (seg + LOAD_SEG) * 16 + off
     file_off = mem_addr - (LOAD_SEG * 16) + hdr_size
     return file_off
@@ -26,32 +62,19 @@ def compute_file_offset(seg, off, hdr_size=0x200):
 
 def parse_stub_names(stubs_path):
     """Extract function names from civ_stubs.c."""
-    names = []
     with open(stubs_path, 'r') as f:
-        for line in f:
-            m = re.match(r'^void ((?:far|res|ovl)\S+)\(CPU \*cpu\)', line)
-            if m:
-                names.append(m.group(1))
-    return names
+        return _STUB_RE.findall(f.read())
 
 
 def parse_function_names(header_path):
-    """Extract all known function names from civ_recomp.h."""
-    names = {}
+    """Extract all known function names from civ_recomp.h.
+
+    The pattern captures the hex address alongside the name, so each
+    match is one int() and one dict store - no prefix branching.
+    """
     with open(header_path, 'r') as f:
-        for line in f:
-            m = re.match(r'^void ((?:res|ovl)\w+)\(CPU \*cpu\);', line)
-            if m:
-                name = m.group(1)
-                # Extract address from name
-                if name.startswith('res_'):
-                    addr = int(name[4:], 16)
-                    names[addr] = name
-                elif name.startswith('ovl'):
-                    parts = name.split('_', 1)
-                    addr = int(parts[1], 16)
-                    names[addr] = name
-    return names
+        content = f.read()
+    return {int(m['hex'], 16): m['name'] for m in _FUNC_RE.finditer(content)}
 
 
 def identify_msc_library(data, file_offset):
@@ -87,6 +110,121 @@ def identify_msc_library(data, file_offset):
     return None
 
 
+def build_msc_classifier(data):
+    """Per-offset MSC library classifier over `data`.
+
+    With numpy, the fixed byte-equality patterns are evaluated for the
+    whole file in a few vector compares up front and each lookup is
+    four mask indexings; otherwise falls back to the scalar
+    identify_msc_library per call.
+    """
+    if np is None:
+        return lambda off: identify_msc_library(data, off)
+
+    arr = np.frombuffer(data, dtype=np.uint8)
+    n = len(arr)
+    retf = arr == 0xCB
+    ret = arr == 0xC3
+    farjmp = arr == 0xEA
+    const_acc = (arr[:-3] == 0xB8) & (retf[3:] | ret[3:])
+
+    def classify(off):
+        if off < 0 or off + 16 > n:
+            return None
+        if retf[off]:
+            return "retf_thunk"
+        if ret[off]:
+            return "ret_thunk"
+        if farjmp[off]:
+            return "far_jmp_thunk"
+        if const_acc[off]:
+            return "const_accessor"
+        return None
+
+    return classify
+
+
+# Worker-side state for the per-offset resolve pass, populated by
+# _resolve_init in each pool worker (and in-process by the serial
+# path). Workers re-open the EXE by path rather than pickling it.
+_RESOLVE_STATE = None
+
+
+def _resolve_init(exe_path, known_items):
+    global _RESOLVE_STATE
+    with open(exe_path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    known_funcs = dict(known_items)
+    _RESOLVE_STATE = (data,
+                      known_funcs,
+                      sorted(known_funcs),
+                      {addr >> 6 for addr in known_funcs},
+                      build_msc_classifier(data))
+
+
+def _resolve_off(file_off):
+    """Classify one unique file offset.
+
+    Returns (file_off, kind, payload) where kind/payload is
+    ('exact'|'near', known address), ('lib', lib_id) or ('unres', None).
+    """
+    data, known_funcs, sorted_addrs, page_set, classify_msc = _RESOLVE_STATE
+
+    if file_off in known_funcs:
+        return file_off, 'exact', file_off
+
+    # Near match (within 16 bytes - might be a mid-function entry).
+    # The ±16 window spans at most two 64-byte pages, so two set
+    # probes reject most misses before the bisect; on a possible hit,
+    # one bisect finds the lowest known address in the window — the
+    # same answer the old -16..+16 probe loop returned first.
+    if ((file_off - 16) >> 6 in page_set
+            or (file_off + 16) >> 6 in page_set):
+        i = bisect.bisect_left(sorted_addrs, file_off - 16)
+        if i < len(sorted_addrs) and sorted_addrs[i] <= file_off + 16:
+            return file_off, 'near', sorted_addrs[i]
+
+    # In the code range at all?
+    if 0 < file_off < len(data):
+        return file_off, 'lib', classify_msc(file_off) or "unknown"
+    return file_off, 'unres', None
+
+
+def _resolve_all(offs, known_funcs, data):
+    """Vectorized counterpart of _resolve_off over all unique offsets.
+
+    One np.searchsorted answers every near-match window query at
+    once; the remaining per-offset work is dict/mask lookups.
+    """
+    size = len(data)
+    classify_msc = build_msc_classifier(data)
+    offs_arr = np.array(offs, dtype=np.int64)
+    known_arr = np.array(sorted(known_funcs), dtype=np.int64)
+    if len(known_arr):
+        # Lowest known address >= off-16; a near match if it is also
+        # <= off+16 (same answer the bisect in _resolve_off returns)
+        idx = np.searchsorted(known_arr, offs_arr - 16)
+        idx_c = np.minimum(idx, len(known_arr) - 1)
+        near = np.where((idx < len(known_arr))
+                        & (known_arr[idx_c] <= offs_arr + 16),
+                        known_arr[idx_c], -1).tolist()
+    else:
+        near = [-1] * len(offs)
+
+    outcomes = []
+    for file_off, addr in zip(offs, near):
+        if file_off in known_funcs:
+            outcomes.append((file_off, 'exact', file_off))
+        elif addr >= 0:
+            outcomes.append((file_off, 'near', addr))
+        elif 0 < file_off < size:
+            outcomes.append((file_off, 'lib',
+                             classify_msc(file_off) or "unknown"))
+        else:
+            outcomes.append((file_off, 'unres', None))
+    return outcomes
+
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: resolve_stubs.py <civ.exe> [RecompiledFuncs/]")
@@ -95,8 +233,10 @@ def main():
     exe_path = sys.argv[1]
     output_dir = sys.argv[2] if len(sys.argv) >= 3 else 'RecompiledFuncs'
 
+    # Map the EXE read-only instead of copying it into a bytes object;
+    # struct.unpack_from and slicing work on the mapping directly.
     with open(exe_path, 'rb') as f:
-        data = f.read()
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
     hdr_size = struct.unpack_from('<H', data, 8)[0] * 16
 
@@ -110,9 +250,11 @@ def main():
     stub_names = parse_stub_names(stubs_path)
     print(f"Stub functions: {len(stub_names)}")
 
-    # Categorize and resolve
-    resolved = {}      # stub_name -> existing_func_name
-    aliases = {}       # stub_name -> file_offset (close match)
+    # Categorize and resolve. Stub names are unique, so these are
+    # plain lists in stub order; the report sorts them in place once
+    # instead of materializing sorted dict-item lists.
+    resolved = []      # (stub_name, existing_func_name)
+    aliases = []       # (stub_name, target_func_name, delta)
     c_library = {}     # stub_name -> likely C function
     unresolvable = []  # truly unknown
 
@@ -120,55 +262,71 @@ def main():
     # These are typical offsets for MSC 5.x library in a medium/large model program
     msc_lib_funcs = {}
 
+    # First pass: group stubs by computed file offset, so stubs that
+    # alias the same target resolve once per unique offset
+    by_off = {}
+    stub_offs = {}   # stub_name -> file_off, reused by the report below
+    name_match = _NAME_RE.match          # pre-bound for the hot loop
+    group_for_off = by_off.setdefault
     for name in stub_names:
-        file_off = None
-
-        if name.startswith('far_'):
-            # Parse far_SSSS_XXXX
-            parts = name.split('_')
-            seg = int(parts[1], 16)
-            off = int(parts[2], 16)
-            file_off = compute_file_offset(seg, off, hdr_size)
-
-        elif name.startswith('res_'):
-            # Parse res_XXXXXX - this IS the file offset already
-            file_off = int(name[4:], 16)
-
-        elif name.startswith('ovl'):
-            # Parse ovlNN_XXXXXX
-            parts = name.split('_', 1)
-            file_off = int(parts[1], 16)
-
-        if file_off is None:
+        m = name_match(name)
+        if m is None:
             unresolvable.append(name)
             continue
 
-        # Check for exact match
-        if file_off in known_funcs:
-            resolved[name] = known_funcs[file_off]
-            continue
-
-        # Check for near match (within 16 bytes - might be a mid-function entry)
-        found_near = False
-        for delta in range(-16, 17):
-            addr = file_off + delta
-            if addr in known_funcs:
-                aliases[name] = (known_funcs[addr], delta)
-                found_near = True
-                break
-
-        if found_near:
-            continue
-
-        # Check if it's in the code range at all
-        if 0 < file_off < len(data):
-            lib_id = identify_msc_library(data, file_off)
-            if lib_id:
-                c_library[name] = (file_off, lib_id)
-            else:
-                c_library[name] = (file_off, "unknown")
+        seg = m.group(1)
+        if seg is not None:
+            # far_SSSS_XXXX: seg:off pair
+            file_off = compute_file_offset(int(seg, 16),
+                                           int(m.group(2), 16), hdr_size)
         else:
-            unresolvable.append(name)
+            # res_XXXXXX / ovlNN_XXXXXX: IS the file offset already
+            file_off = int(m.group(3), 16)
+        stub_offs[name] = file_off
+        group_for_off(file_off, []).append(name)
+
+    # Second pass: classify each unique offset. With numpy, one
+    # vectorized pass handles every offset; otherwise the offsets are
+    # independent, so large batches are spread across a process pool
+    # (workers re-open the EXE by path in _resolve_init) and small
+    # batches run serially.
+    offs = list(by_off)
+    ctx = (exe_path, tuple(known_funcs.items()))
+    workers = os.cpu_count() or 1
+    if np is not None:
+        outcomes = _resolve_all(offs, known_funcs, data)
+    elif workers > 1 and len(offs) >= workers * 64:
+        try:
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=_resolve_init,
+                                     initargs=ctx) as pool:
+                outcomes = list(pool.map(_resolve_off, offs, chunksize=256))
+        except OSError:
+            _resolve_init(*ctx)
+            outcomes = [_resolve_off(off) for off in offs]
+    else:
+        _resolve_init(*ctx)
+        outcomes = [_resolve_off(off) for off in offs]
+
+    # Fan each outcome out to every stub that shares the offset
+    for file_off, kind, payload in outcomes:
+        group = by_off[file_off]
+        if kind == 'exact':
+            target = known_funcs[payload]
+            resolved.extend((name, target) for name in group)
+        elif kind == 'near':
+            target, delta = known_funcs[payload], payload - file_off
+            aliases.extend((name, target, delta) for name in group)
+        elif kind == 'lib':
+            for name in group:
+                c_library[name] = (file_off, payload)
+        else:
+            unresolvable.extend(group)
+
+    # One in-place sort each; the report loops and the alias-file
+    # writer below all iterate these same lists
+    resolved.sort()
+    aliases.sort()
 
     # Report
     print(f"\n{'='*60}")
@@ -181,12 +339,12 @@ def main():
 
     if resolved:
         print(f"\n--- Exact Matches (generate #define aliases) ---")
-        for stub, target in sorted(resolved.items()):
+        for stub, target in resolved:
             print(f"  {stub} -> {target}")
 
     if aliases:
         print(f"\n--- Near Matches (mid-function entries) ---")
-        for stub, (target, delta) in sorted(aliases.items()):
+        for stub, target, delta in aliases:
             sign = '+' if delta > 0 else ''
             print(f"  {stub} -> {target}{sign}{delta}")
 
@@ -194,18 +352,20 @@ def main():
     alias_header = os.path.join(output_dir, 'civ_aliases.h')
     alias_impl = os.path.join(output_dir, 'civ_aliases.c')
 
-    # Write resolved aliases as wrapper functions
+    # Write resolved aliases as wrapper functions: assemble the whole
+    # file in memory and emit it with one write
+    parts = ['/*\n * civ_aliases.c - Resolved function aliases\n'
+             ' * AUTO-GENERATED by resolve_stubs.py\n'
+             ' *\n * These functions were called by name but actually map\n'
+             ' * to existing recompiled functions.\n */\n\n'
+             '#include "recomp/cpu.h"\n\n']
+    parts.extend(f'extern void {target}(CPU *cpu);\n'
+                 for _, target in resolved)
+    parts.append('\n')
+    parts.extend(f'void {stub}(CPU *cpu) {{ {target}(cpu); }}\n'
+                 for stub, target in resolved)
     with open(alias_impl, 'w') as f:
-        f.write('/*\n * civ_aliases.c - Resolved function aliases\n')
-        f.write(' * AUTO-GENERATED by resolve_stubs.py\n')
-        f.write(' *\n * These functions were called by name but actually map\n')
-        f.write(' * to existing recompiled functions.\n */\n\n')
-        f.write('#include "recomp/cpu.h"\n\n')
-        for stub, target in sorted(resolved.items()):
-            f.write(f'extern void {target}(CPU *cpu);\n')
-        f.write('\n')
-        for stub, target in sorted(resolved.items()):
-            f.write(f'void {stub}(CPU *cpu) {{ {target}(cpu); }}\n')
+        f.write(''.join(parts))
 
     print(f"\nWrote {len(resolved)} aliases to {alias_impl}")
 
@@ -217,30 +377,40 @@ def main():
     print(f"  Remaining:       {remaining}")
     print(f"  Near matches:    {len(aliases)} (mid-function entries, need analysis)")
 
-    # Scan for string references near C library functions
+    # Scan for string references near C library functions: one linear
+    # pass over the whole image builds the keyword hit index, then
+    # each stub bisects its window into the index instead of
+    # re-scanning the window bytes.
     print(f"\n--- String Signatures Near far_0000_* Functions ---")
+    kw_hits = [(m.start(), m.end(1)) for m in _LIB_KW_ALL_RE.finditer(data)]
+    kw_starts = [start for start, _ in kw_hits]
+    size = len(data)
     for name in sorted(stub_names):
         if not name.startswith('far_0000_'):
             continue
-        parts = name.split('_')
-        off = int(parts[2], 16)
-        file_off = compute_file_offset(0, off, hdr_size)
-        if 0 < file_off < len(data):
-            # Look for nearby ASCII strings
-            for scan in range(max(0, file_off - 64), min(len(data) - 4, file_off + 128)):
-                chunk = data[scan:scan+32]
-                try:
-                    s = chunk.split(b'\x00')[0].decode('ascii')
-                    if len(s) >= 4 and s.isprintable():
-                        if any(kw in s.lower() for kw in ['alloc', 'free', 'print',
-                              'str', 'mem', 'file', 'open', 'close', 'read', 'write',
-                              'exit', 'abort', 'math', 'sqrt', 'rand', 'atoi', 'itoa',
-                              'sprintf', 'sscanf', 'errno', 'div', 'overflow', 'stack',
-                              'error', 'null', 'heap']):
-                            print(f"  {name} (0x{file_off:06X}): nearby string '{s}'")
-                            break
-                except:
-                    pass
+        file_off = stub_offs[name]
+        if not 0 < file_off < size:
+            continue
+        # Same window the per-stub scan used: -64..+160 around the
+        # stub offset, with keywords truncated at the edges ignored
+        lo, hi = max(0, file_off - 64), min(file_off + 160, size)
+        for i in range(bisect.bisect_left(kw_starts, lo), len(kw_hits)):
+            start, end = kw_hits[i]
+            if start >= hi:
+                break
+            if end > hi:
+                continue
+            # Expand the hit to its printable ASCII run, clamped to
+            # the window; runs shorter than 4 bytes don't qualify
+            run_lo, run_hi = start, end
+            while run_lo > lo and 0x20 <= data[run_lo - 1] <= 0x7e:
+                run_lo -= 1
+            while run_hi < hi and 0x20 <= data[run_hi] <= 0x7e:
+                run_hi += 1
+            if run_hi - run_lo >= 4:
+                s = data[run_lo:min(run_lo + 32, run_hi)].decode('ascii')
+                print(f"  {name} (0x{file_off:06X}): nearby string '{s}'")
+                break
 
 
 if __name__ == '__main__':